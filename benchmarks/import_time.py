@@ -0,0 +1,93 @@
+"""Measures how long ``import graphs`` takes in a fresh interpreter, and exits
+with an error if the median is over budget or the import loads a module that
+should only load on first use, such as matplotlib.
+
+Run with ``python -m benchmarks.import_time --runs 10 --budget 0.4``
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import List, Set, Tuple
+
+# Seconds the median import may take
+DEFAULT_BUDGET = 0.4
+# Modules only plotting needs, which importing graphs must not load
+LAZY_MODULES = ("matplotlib",)
+
+MEASURE_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import graphs
+print(time.perf_counter() - start)
+print(",".join(sys.modules))
+"""
+
+
+def measure(runs: int) -> Tuple[List[float], Set[str]]:
+    """Returns the seconds each import took and the modules the last one loaded"""
+    seconds, modules = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE_SCRIPT],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        seconds.append(float(output[0]))
+        modules = set(output[1].split(","))
+    return seconds, modules
+
+
+def get_slowest_imports(count: int) -> List[Tuple[int, str]]:
+    """(microseconds, module) of the imports taking longest, counting the
+    modules they import, from one run of python -X importtime"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import graphs"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times.append((int(cumulative), name.strip()))
+    return sorted(times, reverse=True)[:count]
+
+
+def get_lazy_modules_loaded(modules: Set[str]) -> List[str]:
+    return sorted(
+        i for i in modules if any(i == j or i.startswith(f"{j}.") for j in LAZY_MODULES)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    seconds, modules = measure(args.runs)
+    median = statistics.median(seconds)
+    print(
+        f"import graphs: median {median:.3f}s, min {min(seconds):.3f}s over "
+        f"{args.runs} runs, budget {args.budget:.3f}s"
+    )
+    for microseconds, name in get_slowest_imports(args.top):
+        print(f"{microseconds / 1e6:>10.3f}s {name}")
+    failures = []
+    if median > args.budget:
+        failures.append(f"median import time {median:.3f}s is over budget")
+    lazy_loaded = get_lazy_modules_loaded(modules)
+    if lazy_loaded:
+        failures.append(f"import loaded {', '.join(lazy_loaded[:5])}")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
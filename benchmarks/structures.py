@@ -0,0 +1,67 @@
+"""Compares memory and set lookup speed of Node/Link against LeanNode/LeanLink.
+
+Run with ``python -m benchmarks.structures --edges 100000``
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from graphs.data_structures.basic_structures import Node, Link, LeanNode, LeanLink
+
+
+def build_links(node_class, link_class, n_nodes, n_edges, seed):
+    rng = random.Random(seed)
+    nodes = [node_class(i) for i in range(n_nodes)]
+    return {
+        link_class(nodes[rng.randrange(n_nodes)], nodes[rng.randrange(n_nodes)])
+        for _ in range(n_edges)
+    }
+
+
+def measure(node_class, link_class, n_nodes, n_edges, n_lookups, seed):
+    tracemalloc.start()
+    links = build_links(node_class, link_class, n_nodes, n_edges, seed)
+    bytes_used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rng = random.Random(seed + 1)
+    probes = [
+        link_class(
+            node_class(rng.randrange(n_nodes)), node_class(rng.randrange(n_nodes))
+        )
+        for _ in range(n_lookups)
+    ]
+    start = time.perf_counter()
+    hits = sum(probe in links for probe in probes)
+    elapsed = time.perf_counter() - start
+    return {
+        "bytes_per_edge": bytes_used / len(links),
+        "lookups_per_second": n_lookups / elapsed,
+        "hits": hits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edges", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    n_nodes = max(2, args.edges // 10)
+    for name, node_class, link_class in [
+        ("Node/Link", Node, Link),
+        ("LeanNode/LeanLink", LeanNode, LeanLink),
+    ]:
+        result = measure(
+            node_class, link_class, n_nodes, args.edges, args.lookups, args.seed
+        )
+        print(
+            f"{name:<20} {result['bytes_per_edge']:>10.1f} bytes/edge "
+            f"{result['lookups_per_second']:>14,.0f} lookups/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
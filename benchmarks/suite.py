@@ -0,0 +1,317 @@
+"""Times common graph operations on generated graphs of increasing size, on each
+storage engine, and writes the results as JSON. Results can be compared with a
+stored baseline, exiting with an error if any benchmark got slower than the
+tolerance allows.
+
+Run with ``python -m benchmarks.suite --output results.json`` and compare with
+``python -m benchmarks.suite --baseline benchmarks/baseline.json``. Write a new
+baseline with ``--output benchmarks/baseline.json``.
+"""
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from graphs import Graph, Node
+from graphs import generators
+from graphs.data_structures.adjacency import AdjacencyIndex
+from graphs.data_structures.bitset import BitsetAdjacency
+from graphs.data_structures.csr import CSRAdjacency
+from graphs.data_structures.graphs import BaseGraph
+from graphs.graph_builder import GraphBuilder
+
+STORAGES = {
+    "index": AdjacencyIndex,
+    "csr": CSRAdjacency,
+    "bitset": BitsetAdjacency,
+}
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_STORAGES = ("index", "csr")
+# Graphs get_paths can enumerate every path of in reasonable time
+MAX_PATH_NODES = 100
+MAX_PATH_GRID_SIDE = 4
+# Longest paths enumerated shortest first in a large grid, and the bytes they use
+ENUMERATED_LENGTH = 12
+ENUMERATION_MEMORY = 1 << 28
+# Nodes whose neighbourhoods are looked up
+NEIGHBOURHOOD_LOOKUPS = 1000
+# Slowdown over the baseline, as a share, above which a benchmark has regressed
+DEFAULT_TOLERANCE = 0.5
+# Differences in seconds too small to count as regressions whatever the ratio
+MIN_REGRESSION_SECONDS = 0.005
+
+# Builds the graph for a size, given its storage class
+Generator = Callable[[int, type], BaseGraph]
+
+
+class Benchmark(NamedTuple):
+    name: str
+    generator: str
+    # Returns what run takes, built fresh for each repeat and not timed
+    setup: Callable[[int, type], Any]
+    run: Callable[[Any], Any]
+
+
+GENERATORS: Dict[str, Generator] = {
+    "erdos_renyi": lambda n, storage: generators.erdos_renyi_graph(
+        n, min(1.0, 8 / n), adjacency_class=storage
+    ),
+    "erdos_renyi_directed": lambda n, storage: generators.erdos_renyi_graph(
+        n, min(1.0, 4 / n), is_directed=True, adjacency_class=storage
+    ),
+    "barabasi_albert": lambda n, storage: generators.barabasi_albert_graph(
+        n, 4, adjacency_class=storage
+    ),
+    "grid": lambda n, storage: generators.grid_graph(
+        int(math.sqrt(n)), int(math.sqrt(n)), adjacency_class=storage
+    ),
+    "random_dag": lambda n, storage: generators.random_dag(
+        n, min(1.0, 8 / n), adjacency_class=storage
+    ),
+    "complete": lambda n, storage: generators.complete_graph(
+        int(math.sqrt(8 * n)), adjacency_class=storage
+    ),
+    "path": lambda n, storage: generators.path_graph(
+        min(n, MAX_PATH_NODES), adjacency_class=storage
+    ),
+    "small_grid": lambda n, storage: generators.grid_graph(
+        min(int(math.sqrt(n)), MAX_PATH_GRID_SIDE),
+        min(int(math.sqrt(n)), MAX_PATH_GRID_SIDE),
+        adjacency_class=storage,
+    ),
+}
+
+
+def setup_graph(generator: str) -> Callable[[int, type], Graph]:
+    return lambda n, storage: Graph.from_base_graph(
+        _get_base_graph(generator, n, storage)
+    )
+
+
+def setup_construction(n: int, storage: type) -> Tuple[type, Any]:
+    """The links of a graph as arrays for CSR storage, or as a graph dictionary"""
+    graph = _get_base_graph("erdos_renyi", n, CSRAdjacency)
+    sources, targets = graph.adjacency.edge_arrays()
+    if storage is CSRAdjacency:
+        return storage, (sources, targets, graph.adjacency.node_ids)
+    dictionary = {i: [] for i in graph.adjacency.node_ids.tolist()}
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        dictionary[source].append(target)
+    return storage, dictionary
+
+
+def run_construction(arguments: Tuple[type, Any]) -> BaseGraph:
+    storage, links = arguments
+    if storage is CSRAdjacency:
+        sources, targets, node_ids = links
+        return GraphBuilder.from_numpy(sources, targets, False, node_ids)
+    return GraphBuilder.from_graph_dictionary(links, False, storage)
+
+
+def setup_neighbourhoods(generator: str) -> Callable[[int, type], Any]:
+    def setup(n: int, storage: type) -> Tuple[Graph, List[Node]]:
+        graph = setup_graph(generator)(n, storage)
+        rng = np.random.default_rng(0)
+        ids = rng.integers(0, graph.order, NEIGHBOURHOOD_LOOKUPS).tolist()
+        return graph, [Node(i) for i in ids]
+
+    return setup
+
+
+def run_neighbourhoods(arguments: Tuple[Graph, List[Node]]):
+    graph, nodes = arguments
+    for node in nodes:
+        graph.get_neighbourhood(node)
+
+
+def run_get_paths(graph: Graph):
+    return graph.get_paths(Node(0), Node(graph.order - 1))
+
+
+def run_enumerate_paths(graph: Graph):
+    """The paths of up to ENUMERATED_LENGTH links between nodes a few rows and
+    columns apart in a grid, of which there are many"""
+    side = int(math.sqrt(graph.order))
+    offset = ENUMERATED_LENGTH // 4
+    return list(
+        graph.iter_paths(
+            Node(0),
+            Node(offset * side + offset),
+            max_length=ENUMERATED_LENGTH,
+            shortest_first=True,
+            max_memory=ENUMERATION_MEMORY,
+        )
+    )
+
+
+BENCHMARKS = [
+    Benchmark("construction", "erdos_renyi", setup_construction, run_construction),
+    *(
+        Benchmark("get_neighbourhood", i, setup_neighbourhoods(i), run_neighbourhoods)
+        for i in ["erdos_renyi", "barabasi_albert", "complete"]
+    ),
+    *(
+        Benchmark("degree_sequence", i, setup_graph(i), lambda g: g.degree_sequence)
+        for i in ["erdos_renyi", "barabasi_albert", "grid"]
+    ),
+    *(
+        Benchmark(
+            "connected_components",
+            i,
+            setup_graph(i),
+            lambda g: g.connected_components,
+        )
+        for i in ["erdos_renyi", "barabasi_albert", "grid"]
+    ),
+    *(
+        Benchmark("is_cyclic", i, setup_graph(i), lambda g: g.is_cyclic)
+        for i in ["erdos_renyi_directed", "random_dag"]
+    ),
+    Benchmark(
+        "dependency_chain",
+        "random_dag",
+        setup_graph("random_dag"),
+        lambda g: g.dependency_chain,
+    ),
+    *(
+        Benchmark("get_paths", i, setup_graph(i), run_get_paths)
+        for i in ["path", "small_grid"]
+    ),
+    Benchmark("enumerate_paths", "grid", setup_graph("grid"), run_enumerate_paths),
+]
+
+_base_graphs: Dict[Tuple[str, int, type], BaseGraph] = {}
+
+
+def _get_base_graph(generator: str, n: int, storage: type) -> BaseGraph:
+    """Generated graphs are kept, as they take longer to build than most
+    benchmarks take to run. Each repeat wraps a new Graph, so nothing cached by
+    a Graph carries over"""
+    key = (generator, n, storage)
+    if key not in _base_graphs:
+        _base_graphs[key] = GENERATORS[generator](n, storage)
+    return _base_graphs[key]
+
+
+def time_benchmark(
+    benchmark: Benchmark, size: int, storage: str, repeats: int
+) -> Dict[str, Any]:
+    seconds = []
+    for _ in range(repeats):
+        arguments = benchmark.setup(size, STORAGES[storage])
+        start = time.perf_counter()
+        benchmark.run(arguments)
+        seconds.append(time.perf_counter() - start)
+    return {
+        "benchmark": benchmark.name,
+        "generator": benchmark.generator,
+        "storage": storage,
+        "size": size,
+        "min_seconds": min(seconds),
+        "median_seconds": statistics.median(seconds),
+        "repeats": repeats,
+    }
+
+
+def run_suite(
+    sizes: List[int],
+    storages: List[str],
+    repeats: int,
+    names: Optional[List[str]] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    results = []
+    for size in sizes:
+        for storage in storages:
+            for benchmark in BENCHMARKS:
+                if names and benchmark.name not in names:
+                    continue
+                result = time_benchmark(benchmark, size, storage, repeats)
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+        _base_graphs.clear()
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[Dict[str, Any]]:
+    """Each benchmark in both, with its time as a ratio of the baseline's and
+    whether that is a regression"""
+    baseline_times = {_get_key(i): i["min_seconds"] for i in baseline["results"]}
+    comparisons = []
+    for result in results["results"]:
+        key = _get_key(result)
+        if key not in baseline_times:
+            continue
+        seconds, baseline_seconds = result["min_seconds"], baseline_times[key]
+        comparisons.append(
+            {
+                "key": key,
+                "seconds": seconds,
+                "baseline_seconds": baseline_seconds,
+                "ratio": seconds / max(baseline_seconds, 1e-9),
+                "is_regression": seconds > baseline_seconds * (1 + tolerance)
+                and seconds - baseline_seconds > MIN_REGRESSION_SECONDS,
+            }
+        )
+    return comparisons
+
+
+def _get_key(result: Dict[str, Any]) -> str:
+    return "/".join(
+        str(result[i]) for i in ["benchmark", "generator", "storage", "size"]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--storages", nargs="+", default=DEFAULT_STORAGES, choices=list(STORAGES)
+    )
+    parser.add_argument("--benchmarks", nargs="+", help="Names to run, default all")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Path to write the results JSON to")
+    parser.add_argument("--baseline", help="Path of results JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    results = run_suite(
+        args.sizes,
+        args.storages,
+        args.repeats,
+        args.benchmarks,
+        lambda i: print(f"{_get_key(i):<60} {i['min_seconds']:>10.4f}s"),
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if not args.baseline:
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    comparisons = compare(results, baseline, args.tolerance)
+    for comparison in comparisons:
+        flag = "  REGRESSION" if comparison["is_regression"] else ""
+        print(f"{comparison['key']:<60} {comparison['ratio']:>8.2f}x baseline{flag}")
+    regressions = [i for i in comparisons if i["is_regression"]]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
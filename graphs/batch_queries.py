@@ -0,0 +1,435 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from graphs.data_structures.basic_structures import Node
+from graphs.data_structures.csr import (
+    CSRAdjacency,
+    build_csr,
+    component_labels,
+    neighbour_rows,
+    row_positions,
+    search_sorted,
+)
+from graphs.data_structures.graphs import BaseGraph
+from graphs.graph_properties import ArrayGraphProperties, Nodes
+from graphs.instrumentation import record_size
+from graphs.parallel import get_chunks, run_chunks
+from graphs.shortest_paths import WeightedPathProperties, bucket_distances
+
+# Sources searched together by multi_source_bfs, and weighted searches per chunk
+MAX_SOURCES = 256
+WEIGHTED_CHUNK_SIZE = 8
+# (indptr, indices, reverse_indptr, reverse_indices) rows a search follows
+SearchRows = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class BatchQueryProperties(ArrayGraphProperties):
+    """Neighbourhood, degree, reachability and distance queries for many nodes
+    or pairs of nodes in one call, answered with vectorised operations over the
+    CSR arrays rather than a Python call per node.
+
+    Nodes can be given as Node objects or as an array of their ids. Results are
+    lined up with the nodes or pairs given, and nodes that are not in the graph
+    have no neighbours and reach nothing.
+    """
+
+    def __init__(self, graph: BaseGraph):
+        super().__init__(graph)
+        self.weighted_path_properties = WeightedPathProperties(graph)
+        self._arrays_csr: Optional[CSRAdjacency] = None
+        self._search_rows: Optional[SearchRows] = None
+        self._labels: Optional[np.ndarray] = None
+
+    def _refresh(self):
+        """Rebuilds the neighbour rows and link keys if the graph has changed"""
+        csr = self.csr
+        if csr is self._arrays_csr:
+            return
+        self.neighbour_indptr, self.neighbour_indices = neighbour_rows(csr)
+        sources, targets = csr.edge_arrays()
+        if csr.is_member is not None:
+            keep = csr.is_member[sources] & csr.is_member[targets]
+            sources, targets = sources[keep], targets[keep]
+        # Rows are sorted, so the keys of the links come out sorted too
+        self.link_keys = sources.astype(np.int64) * len(csr.node_ids) + targets
+        self._search_rows = self._labels = None
+        self._arrays_csr = csr
+
+    def are_neighbours(self, nodes_1: Nodes, nodes_2: Nodes) -> np.ndarray:
+        """Whether each of nodes_1 has a link to the node at the same place in
+        nodes_2, as a boolean array"""
+        self._refresh()
+        indices_1, indices_2 = self._get_indices(nodes_1), self._get_indices(nodes_2)
+        is_linked = self._has_keys(indices_1, indices_2)
+        if not self.is_directed:
+            is_linked |= self._has_keys(indices_2, indices_1)
+        return is_linked & (indices_1 >= 0) & (indices_2 >= 0)
+
+    def get_neighbourhoods(self, nodes: Nodes) -> List[Set[Node]]:
+        offsets, neighbours = self._get_neighbour_rows(nodes)
+        # Each neighbour becomes a Node once however many rows it is in
+        unique, inverse = np.unique(neighbours, return_inverse=True)
+        graph_nodes = [self.csr.node_at(i) for i in unique.tolist()]
+        offsets, inverse = offsets.tolist(), inverse.tolist()
+        return [
+            {graph_nodes[i] for i in inverse[start:end]}
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def get_neighbour_ids(self, nodes: Nodes) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (offsets, neighbour_ids), with the ids of the neighbours of
+        nodes[i] at neighbour_ids[offsets[i]:offsets[i + 1]]. Much faster than
+        get_neighbourhoods as no Node is built"""
+        offsets, neighbours = self._get_neighbour_rows(nodes)
+        return offsets, self.csr.node_ids[neighbours]
+
+    def _get_neighbour_rows(self, nodes: Nodes) -> Tuple[np.ndarray, np.ndarray]:
+        """Neighbour rows of the nodes, as offsets into the indices of them all"""
+        self._refresh()
+        indices = self._get_indices(nodes)
+        is_found = indices >= 0
+        degrees = np.zeros(len(indices), dtype=np.int64)
+        degrees[is_found] = np.diff(self.neighbour_indptr)[indices[is_found]]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=offsets[1:])
+        positions = row_positions(self.neighbour_indptr, indices[is_found])
+        return offsets, self.neighbour_indices[positions]
+
+    def get_degrees(self, nodes: Nodes) -> np.ndarray:
+        """Degree of each node as get_degree counts it, 0 for nodes not in the graph"""
+        self._refresh()
+        indices = self._get_indices(nodes)
+        degrees = np.diff(self.neighbour_indptr)[indices]
+        degrees[indices < 0] = 0
+        return degrees
+
+    def are_reachable(self, nodes_1: Nodes, nodes_2: Nodes) -> np.ndarray:
+        """Whether there is a path from each of nodes_1 to the node at the same
+        place in nodes_2, as a boolean array. A node reaches itself"""
+        self._refresh()
+        sources, targets = self._get_indices(nodes_1), self._get_indices(nodes_2)
+        is_reachable = (sources >= 0) & (targets >= 0)
+        # Only nodes in the same weakly connected component can reach each other
+        labels = self._get_labels()
+        is_reachable[is_reachable] = (
+            labels[sources[is_reachable]] == labels[targets[is_reachable]]
+        )
+        if self.is_directed:
+            pairs = np.flatnonzero(is_reachable)
+            levels = multi_source_bfs(
+                *self.get_search_rows(), sources[pairs], targets[pairs]
+            )
+            is_reachable[pairs] = np.isfinite(levels)
+        return is_reachable
+
+    def get_distances(
+        self, sources: Nodes, targets: Optional[Nodes] = None, workers: int = 1
+    ) -> np.ndarray:
+        """Matrix of the distance from each source, by row, to each target, by
+        column, with inf where there is no path. Targets default to every graph
+        node in the order of node_ids. Distances are total link weights in a
+        weighted graph and numbers of links otherwise. Sources are split between
+        workers processes, see graphs.parallel"""
+        csr = self.csr
+        source_indices = self._get_indices(sources)
+        if targets is None:
+            target_indices = (
+                np.arange(len(csr.node_ids))
+                if csr.is_member is None
+                else np.flatnonzero(csr.is_member)
+            )
+        else:
+            target_indices = self._get_indices(targets)
+        distances = np.full((len(source_indices), len(target_indices)), np.inf)
+        rows = np.flatnonzero(source_indices >= 0)
+        columns = np.flatnonzero(target_indices >= 0)
+        # Each distinct source is searched once, however often it is given
+        unique_sources, inverse = np.unique(source_indices[rows], return_inverse=True)
+        arrays = {
+            **self.get_search_inputs(),
+            "sources": unique_sources,
+            "targets": target_indices[columns],
+        }
+        outputs = {"distances": np.empty((len(unique_sources), len(columns)))}
+        chunk_size = WEIGHTED_CHUNK_SIZE if csr.is_weighted else MAX_SOURCES
+        run_chunks(
+            _distances_task,
+            arrays,
+            outputs,
+            get_chunks(len(unique_sources), chunk_size),
+            workers,
+        )
+        distances[np.ix_(rows, columns)] = outputs["distances"][inverse.reshape(-1)]
+        return distances
+
+    def get_search_rows(self) -> SearchRows:
+        """Neighbour rows, and the rows of the nodes each node is a neighbour of"""
+        self._refresh()
+        if self._search_rows is None:
+            indptr, indices = self.neighbour_indptr, self.neighbour_indices
+            if self.is_directed:
+                sources = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+                reverse_indptr, reverse_indices, _ = build_csr(
+                    indices, sources, len(indptr) - 1
+                )
+            else:
+                reverse_indptr, reverse_indices = indptr, indices
+            self._search_rows = indptr, indices, reverse_indptr, reverse_indices
+        return self._search_rows
+
+    def get_search_inputs(self) -> Dict[str, np.ndarray]:
+        """The arrays search_distances needs, weighted rows if the graph is
+        weighted and the search rows otherwise"""
+        if self.csr.is_weighted:
+            get_search_arrays = self.weighted_path_properties.get_search_arrays
+            indptr, indices, weights, _ = get_search_arrays(backwards=False)
+            return {"indptr": indptr, "indices": indices, "weights": weights}
+        names = ("indptr", "indices", "reverse_indptr", "reverse_indices")
+        return dict(zip(names, self.get_search_rows()))
+
+    def _get_labels(self) -> np.ndarray:
+        if self._labels is None:
+            indptr, indices = self.neighbour_indptr, self.neighbour_indices
+            sources = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+            self._labels = component_labels(sources, indices, len(indptr) - 1)
+        return self._labels
+
+    def _has_keys(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        keys = sources.astype(np.int64) * len(self.csr.node_ids) + targets
+        if not len(self.link_keys):
+            return np.zeros(len(keys), dtype=bool)
+        positions = search_sorted(self.link_keys, keys)
+        found = self.link_keys[np.minimum(positions, len(self.link_keys) - 1)]
+        return (positions < len(self.link_keys)) & (found == keys)
+
+
+def search_distances(
+    arrays: Dict[str, np.ndarray], sources: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """Distances from each of sources to each of targets over the arrays of
+    get_search_inputs, by delta stepping if weighted and by breadth first
+    search from all the sources at once if not"""
+    if "weights" in arrays:
+        indptr, indices, weights = (
+            arrays["indptr"],
+            arrays["indices"],
+            arrays["weights"],
+        )
+        return np.array(
+            [
+                bucket_distances(indptr, indices, weights, source)[targets]
+                for source in sources.tolist()
+            ]
+        ).reshape(len(sources), len(targets))
+    rows = (
+        arrays["indptr"],
+        arrays["indices"],
+        arrays["reverse_indptr"],
+        arrays["reverse_indices"],
+    )
+    levels = multi_source_bfs(
+        *rows, np.repeat(sources, len(targets)), np.tile(targets, len(sources))
+    )
+    return levels.reshape(len(sources), len(targets))
+
+
+def _distances_task(arrays: Dict[str, np.ndarray], index: int, start: int, end: int):
+    arrays["distances"][start:end] = search_distances(
+        arrays, arrays["sources"][start:end], arrays["targets"]
+    )
+
+
+def multi_source_bfs(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    reverse_indptr: np.ndarray,
+    reverse_indices: np.ndarray,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    max_sources: int = MAX_SOURCES,
+) -> np.ndarray:
+    """Number of links on a shortest path from each of sources to the index at
+    the same place in targets, inf where there is none. reverse_indptr and
+    reverse_indices are the rows of indptr and indices transposed.
+
+    Breadth first searches from up to max_sources distinct sources run together,
+    each node holding one bit per source that has reached it, so each level's
+    frontier is expanded once for all of them. The searches stop once every pair
+    is answered.
+    """
+    levels = np.full(len(sources), np.inf)
+    unique_sources, slots = np.unique(sources, return_inverse=True)
+    slots = slots.reshape(-1)
+    rows = (indptr, indices, reverse_indptr, reverse_indices)
+    for start in range(0, len(unique_sources), max_sources):
+        pairs = np.flatnonzero((slots >= start) & (slots < start + max_sources))
+        levels[pairs] = _bit_parallel_bfs(
+            rows,
+            unique_sources[start : start + max_sources],
+            slots[pairs] - start,
+            targets[pairs],
+        )
+    return levels
+
+
+def bfs_eccentricities(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    reverse_indptr: np.ndarray,
+    reverse_indices: np.ndarray,
+    sources: np.ndarray,
+    max_sources: int = MAX_SOURCES,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (eccentricities, reached), the number of links to the furthest
+    node each source reaches and the number of nodes it reaches, itself
+    included. Searches from max_sources sources at a time as multi_source_bfs"""
+    eccentricities = np.zeros(len(sources), dtype=np.int64)
+    reached = np.ones(len(sources), dtype=np.int64)
+    rows = (indptr, indices, reverse_indptr, reverse_indices)
+    for start in range(0, len(sources), max_sources):
+        chunk = np.asarray(sources[start : start + max_sources], dtype=np.int64)
+        # Searches from a repeated source are answered by its first copy
+        unique, first, inverse = np.unique(
+            chunk, return_index=True, return_inverse=True
+        )
+        frontier, masks, seen = _start_search(len(indptr) - 1, unique)
+        all_sources = np.bitwise_or.reduce(masks, axis=0)
+        k, level = len(unique), 0
+        chunk_eccentricities = np.zeros(k, dtype=np.int64)
+        chunk_reached = np.ones(k, dtype=np.int64)
+        while len(frontier):
+            frontier, masks = _expand(rows, frontier, masks, seen, all_sources)
+            level += 1
+            bits = np.unpackbits(
+                masks.astype("<u8").view(np.uint8), axis=1, bitorder="little"
+            )[:, :k]
+            new_counts = bits.sum(axis=0, dtype=np.int64)
+            chunk_reached += new_counts
+            chunk_eccentricities[new_counts > 0] = level
+        eccentricities[start : start + len(chunk)] = chunk_eccentricities[inverse]
+        reached[start : start + len(chunk)] = chunk_reached[inverse]
+    return eccentricities, reached
+
+
+def _bit_parallel_bfs(
+    rows: SearchRows, sources: np.ndarray, slots: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """Levels for pairs from sources[slots[i]] to targets[i], given distinct
+    sources, searching from all of them at once"""
+    n = len(rows[0]) - 1
+    levels = np.full(len(targets), np.inf)
+    # Pairs grouped by target, so the pairs ending at a node form one row
+    order = np.argsort(targets, kind="stable")
+    pair_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(targets, minlength=n), out=pair_indptr[1:])
+    pair_words, pair_bits = _source_bits(slots[order])
+    frontier, masks, seen = _start_search(n, sources)
+    all_sources = np.bitwise_or.reduce(masks, axis=0)
+    level, remaining = 0, len(targets)
+    while remaining and len(frontier):
+        positions = row_positions(pair_indptr, frontier)
+        counts = pair_indptr[frontier + 1] - pair_indptr[frontier]
+        pair_rows = np.repeat(np.arange(len(frontier)), counts)
+        is_reached = (
+            masks[pair_rows, pair_words[positions]] & pair_bits[positions]
+        ) != 0
+        levels[order[positions[is_reached]]] = level
+        remaining -= int(is_reached.sum())
+        frontier, masks = _expand(rows, frontier, masks, seen, all_sources)
+        level += 1
+    return levels
+
+
+def _start_search(
+    n: int, sources: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(frontier, masks, seen) with each distinct source holding its own bit"""
+    k = len(sources)
+    seen = np.zeros((n, (k + 63) // 64), dtype=np.uint64)
+    frontier = np.asarray(sources, dtype=np.int64)
+    words, bits = _source_bits(np.arange(k))
+    masks = np.zeros_like(seen[:k])
+    masks[np.arange(k), words] = bits
+    seen[frontier] = masks
+    return frontier, masks, seen
+
+
+def _expand(
+    rows: SearchRows,
+    frontier: np.ndarray,
+    masks: np.ndarray,
+    seen: np.ndarray,
+    all_sources: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """The next frontier and, for each of its nodes, the sources reaching it for
+    the first time, marking them as seen"""
+    record_size("multi_source_bfs.frontier", len(frontier))
+    indptr, indices, reverse_indptr, reverse_indices = rows
+    open_nodes = np.flatnonzero((seen != all_sources).any(axis=1))
+    push_links = (indptr[frontier + 1] - indptr[frontier]).sum()
+    pull_links = (reverse_indptr[open_nodes + 1] - reverse_indptr[open_nodes]).sum()
+    # Pulling needs no sort, so stays cheaper until it reads far more links
+    if pull_links < 4 * push_links:
+        return _pull(reverse_indptr, reverse_indices, frontier, masks, seen, open_nodes)
+    return _push(indptr, indices, frontier, masks, seen)
+
+
+def _push(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    frontier: np.ndarray,
+    masks: np.ndarray,
+    seen: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """_expand by sending the masks of the frontier along its links"""
+    positions = row_positions(indptr, frontier)
+    counts = indptr[frontier + 1] - indptr[frontier]
+    reached = indices[positions]
+    order = np.argsort(reached, kind="stable")
+    reached = reached[order].astype(np.int64)
+    if not len(reached):
+        return reached, masks[:0]
+    reached_masks = np.repeat(masks, counts, axis=0)[order]
+    starts = np.flatnonzero(np.diff(reached, prepend=-1))
+    return _mark_new(
+        reached[starts], np.bitwise_or.reduceat(reached_masks, starts, axis=0), seen
+    )
+
+
+def _pull(
+    reverse_indptr: np.ndarray,
+    reverse_indices: np.ndarray,
+    frontier: np.ndarray,
+    masks: np.ndarray,
+    seen: np.ndarray,
+    open_nodes: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """_expand by having each node not yet reached by every source gather the
+    masks of the frontier nodes linking to it"""
+    frontier_masks = np.zeros_like(seen)
+    frontier_masks[frontier] = masks
+    counts = reverse_indptr[open_nodes + 1] - reverse_indptr[open_nodes]
+    nodes, counts = open_nodes[counts > 0], counts[counts > 0]
+    if not len(nodes):
+        return nodes, masks[:0]
+    positions = row_positions(reverse_indptr, nodes)
+    gathered = frontier_masks[reverse_indices[positions]]
+    starts = np.cumsum(counts) - counts
+    return _mark_new(nodes, np.bitwise_or.reduceat(gathered, starts, axis=0), seen)
+
+
+def _mark_new(
+    nodes: np.ndarray, masks: np.ndarray, seen: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Keeps the sources reaching each node that had not reached it before"""
+    masks &= ~seen[nodes]
+    is_new = masks.any(axis=1)
+    nodes, masks = nodes[is_new], masks[is_new]
+    seen[nodes] |= masks
+    return nodes, masks
+
+
+def _source_bits(slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """The mask word and bit within it for each source slot"""
+    return slots // 64, np.left_shift(np.uint64(1), (slots % 64).astype(np.uint64))
@@ -0,0 +1,134 @@
+"""On disk format for CSR graphs, laid out so every array can be memory mapped.
+
+The file is a fixed size header followed by the node id table, the forward
+indptr and indices arrays, the reverse indptr and indices arrays, if some
+link endpoints are not graph nodes a membership mask and, if the graph is
+weighted, the forward and reverse float64 weights, NaN for unweighted links.
+All values are little endian and every array starts on an ALIGNMENT byte
+boundary. Opening a file maps these arrays read only, so nothing is copied and
+processes opening the same file share one page cached copy.
+"""
+
+import os
+from typing import Union
+
+import numpy as np
+
+from graphs.data_structures.adjacency import BaseAdjacency
+from graphs.data_structures.csr import CSRAdjacency, as_csr, index_dtype
+from graphs.exceptions import InvalidFileException, UnsupportedNodeIdsException
+
+MAGIC = b"GRAPHCSR"
+VERSION = 1
+ALIGNMENT = 64
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("is_directed", "u1"),
+        ("has_member_mask", "u1"),
+        ("has_weights", "u1"),
+        ("padding", "V1"),
+        ("order", "<u8"),
+        ("size", "<u8"),
+        ("id_dtype", "S16"),
+    ]
+)
+INDPTR_DTYPE = np.dtype("<i8")
+WEIGHTS_DTYPE = np.dtype("<f8")
+
+Path = Union[str, os.PathLike]
+
+
+def save(adjacency: BaseAdjacency, path: Path):
+    csr = as_csr(adjacency)
+    node_ids = _to_storable_ids(csr.node_ids)
+    indices_dtype = index_dtype(len(node_ids)).newbyteorder("<")
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["is_directed"] = csr.is_directed
+    header["has_member_mask"] = csr.is_member is not None
+    header["has_weights"] = csr.is_weighted
+    header["order"] = len(node_ids)
+    header["size"] = len(csr.indices)
+    header["id_dtype"] = node_ids.dtype.str.encode()
+    arrays = [
+        (node_ids, node_ids.dtype),
+        (csr.indptr, INDPTR_DTYPE),
+        (csr.indices, indices_dtype),
+        (csr.reverse_indptr, INDPTR_DTYPE),
+        (csr.reverse_indices, indices_dtype),
+    ]
+    if csr.is_member is not None:
+        arrays.append((csr.is_member, np.dtype(bool)))
+    if csr.is_weighted:
+        arrays.append((csr.weights, WEIGHTS_DTYPE))
+        arrays.append((csr.reverse_weights, WEIGHTS_DTYPE))
+    with open(path, "wb") as file:
+        header.tofile(file)
+        for array, dtype in arrays:
+            file.write(b"\0" * (-file.tell() % ALIGNMENT))
+            np.ascontiguousarray(array, dtype=dtype).tofile(file)
+
+
+def load(path: Path, mmap: bool = True) -> CSRAdjacency:
+    """Opens a saved graph, memory mapping its arrays unless mmap is False, in
+    which case they are read into memory"""
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header["magic"][0] != MAGIC:
+        raise InvalidFileException(f"{path} is not a saved graph")
+    if header["version"][0] != VERSION:
+        raise InvalidFileException(
+            f"{path} has format version {header['version'][0]}, expected {VERSION}"
+        )
+    order, size = int(header["order"][0]), int(header["size"][0])
+    indices_dtype = index_dtype(order).newbyteorder("<")
+    layout = [
+        (np.dtype(header["id_dtype"][0].decode()), order),
+        (INDPTR_DTYPE, order + 1),
+        (indices_dtype, size),
+        (INDPTR_DTYPE, order + 1),
+        (indices_dtype, size),
+    ]
+    if header["has_member_mask"][0]:
+        layout.append((np.dtype(bool), order))
+    if header["has_weights"][0]:
+        layout.extend([(WEIGHTS_DTYPE, size), (WEIGHTS_DTYPE, size)])
+    offset = HEADER_DTYPE.itemsize
+    arrays = []
+    for dtype, count in layout:
+        offset += -offset % ALIGNMENT
+        if count == 0:
+            array = np.zeros(0, dtype=dtype)
+        elif mmap:
+            array = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=count)
+        else:
+            array = np.fromfile(path, dtype=dtype, count=count, offset=offset)
+        arrays.append(array)
+        offset += dtype.itemsize * count
+    node_ids, indptr, indices, reverse_indptr, reverse_indices, *optional = arrays
+    is_member = optional.pop(0) if header["has_member_mask"][0] else None
+    weights, reverse_weights = optional if optional else (None, None)
+    return CSRAdjacency(
+        node_ids,
+        indptr,
+        indices,
+        reverse_indptr,
+        reverse_indices,
+        bool(header["is_directed"][0]),
+        is_member,
+        weights,
+        reverse_weights,
+    )
+
+
+def _to_storable_ids(node_ids: np.ndarray) -> np.ndarray:
+    if node_ids.dtype.kind in "iuU":
+        return node_ids.astype(node_ids.dtype.newbyteorder("<"))
+    values = node_ids.tolist()
+    if all(isinstance(i, str) for i in values):
+        return np.array(values, dtype="<U")
+    raise UnsupportedNodeIdsException(
+        "Only graphs whose node ids are all integers or all strings can be saved"
+    )
@@ -0,0 +1,71 @@
+import functools
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from graphs.data_structures.adjacency import BaseAdjacency
+from graphs.instrumentation import count
+
+# The parts of a graph a cached value can depend on, each versioned by its storage
+NODES = "node"
+LINKS = "link"
+
+
+class GraphCache:
+    """Memoises derived graph values, each stored with the versions of the parts
+    of the graph it depends on. A value is recomputed only once one of those
+    versions has moved on, so a mutation invalidates exactly the affected values.
+    Cached values are shared between callers, so should be treated as read only.
+    """
+
+    def __init__(self, adjacency: BaseAdjacency):
+        self.adjacency = adjacency
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Tuple[Tuple[str, ...], Tuple[int, ...], Any]] = {}
+
+    def get(self, name: str, depends_on: Tuple[str, ...], compute: Callable[[], Any]):
+        versions = self._get_versions(depends_on)
+        entry = self._entries.get(name)
+        if entry is not None and entry[1] == versions:
+            self.hits += 1
+            count("cache.hits")
+            return entry[2]
+        self.misses += 1
+        count("cache.misses")
+        value = compute()
+        self._entries[name] = (depends_on, versions, value)
+        return value
+
+    @property
+    def cached_names(self) -> Set[str]:
+        """Names of the values that are cached and still valid"""
+        return {
+            name
+            for name, (depends_on, versions, _) in self._entries.items()
+            if versions == self._get_versions(depends_on)
+        }
+
+    def clear(self, *names: str):
+        """Drops the given cached values, or all of them if none are given"""
+        if not names:
+            self._entries.clear()
+        for name in names:
+            self._entries.pop(name, None)
+
+    def _get_versions(self, depends_on: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(getattr(self.adjacency, f"{i}_version") for i in depends_on)
+
+
+def cached(*depends_on: str, copy: Optional[Callable[[Any], Any]] = None):
+    """Caches a Graph method taking no arguments in the graph's GraphCache, until
+    the nodes or links it depends on change. A mutable value is passed through
+    copy before it is returned, so callers can change what they are given"""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            value = self.cache.get(method.__name__, depends_on, lambda: method(self))
+            return value if copy is None else copy(value)
+
+        return wrapper
+
+    return decorator
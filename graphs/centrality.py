@@ -0,0 +1,134 @@
+from typing import Dict
+
+import numpy as np
+
+from graphs.batch_queries import (
+    MAX_SOURCES,
+    WEIGHTED_CHUNK_SIZE,
+    BatchQueryProperties,
+    bfs_eccentricities,
+)
+from graphs.data_structures.csr import row_positions
+from graphs.data_structures.graphs import BaseGraph
+from graphs.graph_properties import ArrayGraphProperties
+from graphs.parallel import get_chunks, run_chunks
+from graphs.shortest_paths import bucket_distances
+
+# Most memory, in float64 values, taken by the per chunk betweenness sums
+MAX_PARTIAL_VALUES = 2**25
+
+
+class CentralityProperties(ArrayGraphProperties):
+    """Measures taken from a search out of every node, which are independent so
+    can be split between worker processes, see graphs.parallel. Results are
+    lined up with node_ids.
+    """
+
+    def __init__(self, graph: BaseGraph):
+        super().__init__(graph)
+        self.batch_query_properties = BatchQueryProperties(graph)
+
+    def get_eccentricities(self, workers: int = 1) -> np.ndarray:
+        """Greatest distance from each node to any other, inf for nodes that
+        cannot reach every node. Distances are as in get_distances"""
+        csr = self.csr
+        sources = (
+            np.arange(len(csr.node_ids))
+            if csr.is_member is None
+            else np.flatnonzero(csr.is_member)
+        )
+        arrays = {**self.batch_query_properties.get_search_inputs(), "sources": sources}
+        outputs = {"eccentricities": np.empty(len(sources))}
+        chunk_size = WEIGHTED_CHUNK_SIZE if csr.is_weighted else MAX_SOURCES
+        chunks = get_chunks(len(sources), chunk_size)
+        run_chunks(_eccentricities_task, arrays, outputs, chunks, workers)
+        return outputs["eccentricities"]
+
+    def get_betweenness(self, workers: int = 1) -> np.ndarray:
+        """Number of shortest paths between other pairs of nodes that pass
+        through each node, with pairs reached by several shortest paths sharing
+        one between them (Brandes' algorithm). Paths are counted in links
+        whatever the link weights, and undirected pairs are counted once"""
+        indptr, indices, _, _ = self.batch_query_properties.get_search_rows()
+        csr = self.csr
+        n = len(csr.node_ids)
+        sources = (
+            np.arange(n) if csr.is_member is None else np.flatnonzero(csr.is_member)
+        )
+        # Each chunk sums into its own row, which are added up in order after
+        max_chunks = max(1, min(1024, MAX_PARTIAL_VALUES // max(n, 1)))
+        chunk_size = max(64, -(-len(sources) // max_chunks))
+        chunks = get_chunks(len(sources), chunk_size)
+        arrays = {"indptr": indptr, "indices": indices, "sources": sources}
+        outputs = {"betweenness": np.zeros((len(chunks), n))}
+        run_chunks(_betweenness_task, arrays, outputs, chunks, workers)
+        betweenness = outputs["betweenness"].sum(axis=0)
+        if not self.is_directed:
+            betweenness /= 2
+        return betweenness if csr.is_member is None else betweenness[sources]
+
+
+def brandes_dependencies(
+    indptr: np.ndarray, indices: np.ndarray, source: int
+) -> np.ndarray:
+    """Share of the shortest paths from source to every other node that pass
+    through each node, by one breadth first search counting the shortest paths
+    to each node and a pass back up its levels"""
+    n = len(indptr) - 1
+    levels = np.full(n, -1, dtype=np.int64)
+    levels[source] = 0
+    paths = np.zeros(n)
+    paths[source] = 1.0
+    frontier = np.array([source], dtype=np.int64)
+    steps = []
+    level = 0
+    while len(frontier):
+        counts = indptr[frontier + 1] - indptr[frontier]
+        tails = np.repeat(frontier, counts)
+        heads = indices[row_positions(indptr, frontier)].astype(np.int64)
+        levels[heads[levels[heads] < 0]] = level + 1
+        # Only links down to the next level lie on shortest paths
+        is_down = levels[heads] == level + 1
+        tails, heads = tails[is_down], heads[is_down]
+        frontier, inverse = np.unique(heads, return_inverse=True)
+        paths[frontier] = np.bincount(inverse, weights=paths[tails])
+        steps.append((tails, heads))
+        level += 1
+    dependencies = np.zeros(n)
+    for tails, heads in reversed(steps):
+        shares = paths[tails] / paths[heads] * (1 + dependencies[heads])
+        unique_tails, inverse = np.unique(tails, return_inverse=True)
+        dependencies[unique_tails] += np.bincount(inverse, weights=shares)
+    dependencies[source] = 0.0
+    return dependencies
+
+
+def _eccentricities_task(
+    arrays: Dict[str, np.ndarray], index: int, start: int, end: int
+):
+    sources = arrays["sources"]
+    chunk = sources[start:end]
+    if "weights" in arrays:
+        eccentricities = [
+            bucket_distances(
+                arrays["indptr"], arrays["indices"], arrays["weights"], source
+            )[sources].max()
+            for source in chunk.tolist()
+        ]
+    else:
+        levels, reached = bfs_eccentricities(
+            arrays["indptr"],
+            arrays["indices"],
+            arrays["reverse_indptr"],
+            arrays["reverse_indices"],
+            chunk,
+        )
+        eccentricities = np.where(reached == len(sources), levels, np.inf)
+    arrays["eccentricities"][start:end] = eccentricities
+
+
+def _betweenness_task(arrays: Dict[str, np.ndarray], index: int, start: int, end: int):
+    indptr, indices = arrays["indptr"], arrays["indices"]
+    betweenness = arrays["betweenness"][index]
+    for source in arrays["sources"][start:end].tolist():
+        betweenness += brandes_dependencies(indptr, indices, source)
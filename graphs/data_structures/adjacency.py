@@ -0,0 +1,246 @@
+import abc
+from typing import Dict, Iterable, Optional, Set
+
+from graphs.data_structures.basic_structures import Node, Link
+from graphs.exceptions import ImmutableGraphException, InvalidMutationException
+
+
+class BaseAdjacency(abc.ABC):
+    """Storage engine behind a graph, answering link and neighbour queries"""
+
+    is_directed: bool
+    # Incremented whenever the nodes or the links change, to invalidate caches
+    node_version: int = 0
+    link_version: int = 0
+
+    @classmethod
+    @abc.abstractmethod
+    def from_links(
+        cls, nodes: Iterable[Node], links: Iterable[Link], is_directed: bool
+    ) -> "BaseAdjacency":
+        pass
+
+    @property
+    @abc.abstractmethod
+    def nodes(self) -> Set[Node]:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def links(self) -> Set[Link]:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def order(self) -> int:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def size(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def __contains__(self, node: Node) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def find_link(self, node_1: Node, node_2: Node) -> Optional[Link]:
+        pass
+
+    @abc.abstractmethod
+    def get_neighbourhood(self, node: Node) -> Set[Node]:
+        pass
+
+    @abc.abstractmethod
+    def get_predecessors(self, node: Node) -> Set[Node]:
+        """Nodes with a link into node, the same as the neighbourhood if undirected"""
+        pass
+
+    @abc.abstractmethod
+    def get_incident_links(self, node: Node) -> Set[Link]:
+        """Links starting or ending at node"""
+        pass
+
+    def get_degree(self, node: Node) -> int:
+        return len(self.get_neighbourhood(node))
+
+    def check_link(self, link: Link):
+        """Raises InvalidMutationException if link does not fit the graph"""
+        if link.is_directed != self.is_directed:
+            raise InvalidMutationException(
+                f"Cannot add {link} to a graph with is_directed={self.is_directed}"
+            )
+
+    def add_node(self, node: Node):
+        self._raise_immutable()
+
+    def add_link(self, link: Link):
+        self._raise_immutable()
+
+    def remove_link(self, link: Link):
+        self._raise_immutable()
+
+    def remove_node(self, node: Node):
+        self._raise_immutable()
+
+    def _raise_immutable(self):
+        raise ImmutableGraphException(
+            f"{self.__class__.__name__} storage is read only, "
+            f"build the graph with AdjacencyIndex storage to modify it"
+        )
+
+
+class AdjacencyIndex(BaseAdjacency):
+    """Maps every node to its out (successors) and in (predecessors) neighbours,
+    keeping the link joining them, so link lookups never scan the graph"""
+
+    def __init__(self, nodes: Set[Node], links: Set[Link], is_directed: bool):
+        self._nodes = nodes
+        self._links = links
+        self.is_directed = is_directed
+        self.successors: Dict[Node, Dict[Node, Link]] = {node: {} for node in nodes}
+        self.predecessors: Dict[Node, Dict[Node, Link]] = {node: {} for node in nodes}
+        for link in links:
+            existing = self.successors.setdefault(link.node_1, {}).get(link.node_2)
+            if existing is not None and existing.cost <= link.cost:
+                continue
+            self.successors[link.node_1][link.node_2] = link
+            self.predecessors.setdefault(link.node_2, {})[link.node_1] = link
+        if sum(map(len, self.successors.values())) < len(links):
+            # Links of different weight between the same nodes keep the lightest
+            self._links = {i for row in self.successors.values() for i in row.values()}
+        # Counted on first use, then kept up to date by each mutation
+        self._degrees: Optional[Dict[Node, int]] = None
+
+    @classmethod
+    def from_links(
+        cls, nodes: Iterable[Node], links: Iterable[Link], is_directed: bool
+    ) -> "AdjacencyIndex":
+        return cls(set(nodes), set(links), is_directed)
+
+    @property
+    def nodes(self) -> Set[Node]:
+        return self._nodes
+
+    @property
+    def links(self) -> Set[Link]:
+        return self._links
+
+    @property
+    def order(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def size(self) -> int:
+        return len(self._links)
+
+    def __contains__(self, node: Node) -> bool:
+        return node in self._nodes
+
+    def find_link(self, node_1: Node, node_2: Node) -> Optional[Link]:
+        link = self.successors.get(node_1, {}).get(node_2)
+        if link is None and not self.is_directed:
+            link = self.predecessors.get(node_1, {}).get(node_2)
+        return link
+
+    def get_neighbourhood(self, node: Node) -> Set[Node]:
+        neighbours = set(self.successors.get(node, {}))
+        if not self.is_directed:
+            neighbours |= self.predecessors.get(node, {}).keys()
+        neighbours.discard(node)
+        # Links may reference nodes that were not passed in as graph nodes
+        return {n for n in neighbours if n in self._nodes}
+
+    def get_predecessors(self, node: Node) -> Set[Node]:
+        if not self.is_directed:
+            return self.get_neighbourhood(node)
+        return {
+            n for n in self.predecessors.get(node, {}) if n != node and n in self._nodes
+        }
+
+    def get_incident_links(self, node: Node) -> Set[Link]:
+        return set(self.successors.get(node, {}).values()) | set(
+            self.predecessors.get(node, {}).values()
+        )
+
+    def get_degree(self, node: Node) -> int:
+        if self._degrees is None:
+            self._degrees = {n: len(self.get_neighbourhood(n)) for n in self._nodes}
+        degree = self._degrees.get(node)
+        return degree if degree is not None else len(self.get_neighbourhood(node))
+
+    def add_node(self, node: Node):
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        successors = self.successors.setdefault(node, {})
+        predecessors = self.predecessors.setdefault(node, {})
+        self.node_version += 1
+        if successors or predecessors:
+            # Already a link endpoint, so now joins its neighbours' neighbourhoods
+            self.link_version += 1
+            self._degrees = None
+        elif self._degrees is not None:
+            self._degrees[node] = 0
+
+    def add_link(self, link: Link):
+        """Adds the link, and its nodes if they are not yet in the graph, replacing
+        any link from node_1 to node_2 of another weight"""
+        self.check_link(link)
+        for node in link.nodes:
+            self.add_node(node)
+        if link in self._links:
+            return
+        node_1, node_2 = link.node_1, link.node_2
+        existing = self.successors[node_1].get(node_2)
+        if existing is not None:
+            # Replaces a link of another weight between the same nodes
+            self._links.remove(existing)
+        is_new_neighbour = not self._are_linked(node_1, node_2)
+        self._links.add(link)
+        self.successors[node_1][node_2] = link
+        self.predecessors[node_2][node_1] = link
+        self.link_version += 1
+        if is_new_neighbour:
+            self._update_degrees(node_1, node_2, 1)
+
+    def remove_link(self, link: Link):
+        if link not in self._links:
+            raise InvalidMutationException(f"{link} is not in the graph")
+        node_1, node_2 = link.node_1, link.node_2
+        self._links.remove(link)
+        del self.successors[node_1][node_2]
+        del self.predecessors[node_2][node_1]
+        self.link_version += 1
+        if not self._are_linked(node_1, node_2):
+            self._update_degrees(node_1, node_2, -1)
+
+    def remove_node(self, node: Node):
+        """Removes the node along with every link to or from it"""
+        if node not in self._nodes:
+            raise InvalidMutationException(f"{node} is not in the graph")
+        for link in self.get_incident_links(node):
+            self.remove_link(link)
+        self._nodes.remove(node)
+        del self.successors[node]
+        del self.predecessors[node]
+        self.node_version += 1
+        if self._degrees is not None:
+            del self._degrees[node]
+
+    def _are_linked(self, node_1: Node, node_2: Node) -> bool:
+        """If node_2 counts towards node_1's degree, ignoring membership"""
+        if node_1 == node_2:
+            return True
+        if node_2 in self.successors.get(node_1, {}):
+            return True
+        return not self.is_directed and node_2 in self.predecessors.get(node_1, {})
+
+    def _update_degrees(self, node_1: Node, node_2: Node, change: int):
+        if self._degrees is None:
+            return
+        if node_1 in self._degrees and node_2 in self._nodes:
+            self._degrees[node_1] += change
+        if not self.is_directed and node_2 in self._degrees and node_1 in self._nodes:
+            self._degrees[node_2] += change
@@ -1,4 +1,4 @@
-from typing import List, Optional, Hashable
+from typing import List, Optional, Hashable, Union
 
 import rshanker779_common as utils
 
@@ -14,12 +14,110 @@ class Node(utils.StringMixin, utils.EqualsMixin):
 
 
 class Link(utils.StringMixin, utils.EqualsMixin):
-    def __init__(self, node_1: Node, node_2: Node, is_directed: bool = False):
+    """A link between two nodes, optionally weighted. The weight is part of the
+    link, so only links of equal weight compare equal"""
+
+    def __init__(
+        self,
+        node_1: Node,
+        node_2: Node,
+        is_directed: bool = False,
+        weight: Optional[float] = None,
+    ):
         super().__init__()
         self.node_1 = node_1
         self.node_2 = node_2
         self.is_directed = is_directed
+        self.weight = weight
 
     @property
     def nodes(self) -> List[Node]:
         return [self.node_1, self.node_2]
+
+    @property
+    def cost(self) -> float:
+        """The weight, counting an unweighted link as 1"""
+        return 1 if self.weight is None else self.weight
+
+
+class LeanNode:
+    """Slotted Node with its hash computed once. Compares equal to other LeanNodes
+    with the same id, so must not be mutated once in a set or dict"""
+
+    __slots__ = ("id", "_hash")
+    _id = 0
+
+    def __init__(self, identifier: Optional[Hashable] = None):
+        if identifier is None:
+            identifier = LeanNode._id
+            LeanNode._id += 1
+        self.id = identifier
+        self._hash = hash(identifier)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        return self.id == other.id
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}>(id={self.id})"
+
+
+class LeanLink:
+    """Slotted Link with its hash computed once, equal to other LeanLinks with the
+    same nodes and directedness"""
+
+    __slots__ = ("node_1", "node_2", "is_directed", "weight", "_hash")
+
+    def __init__(
+        self,
+        node_1: LeanNode,
+        node_2: LeanNode,
+        is_directed: bool = False,
+        weight: Optional[float] = None,
+    ):
+        self.node_1 = node_1
+        self.node_2 = node_2
+        self.is_directed = is_directed
+        self.weight = weight
+        self._hash = hash(self._key())
+
+    def _key(self) -> tuple:
+        return self.node_1, self.node_2, self.is_directed, self.weight
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        return self._hash == other._hash and self._key() == other._key()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}>(node_1={self.node_1}, node_2={self.node_2}, "
+            f"is_directed={self.is_directed})"
+        )
+
+    @property
+    def nodes(self) -> List[LeanNode]:
+        return [self.node_1, self.node_2]
+
+    @property
+    def cost(self) -> float:
+        return 1 if self.weight is None else self.weight
+
+
+def new_link(
+    node_1: Union[Node, LeanNode],
+    node_2: Union[Node, LeanNode],
+    is_directed: bool = False,
+    weight: Optional[float] = None,
+) -> Union[Link, LeanLink]:
+    """A LeanLink between LeanNodes, or a Link otherwise, for storage engines
+    that build links from arrays"""
+    link_class = LeanLink if isinstance(node_1, LeanNode) else Link
+    return link_class(node_1, node_2, is_directed, weight)
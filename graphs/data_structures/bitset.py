@@ -0,0 +1,340 @@
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from graphs.data_structures.adjacency import BaseAdjacency
+from graphs.data_structures.basic_structures import Node, Link, new_link
+from graphs.data_structures.csr import CSRAdjacency, intern_ids
+from graphs.exceptions import InvalidMutationException
+
+# Number of set bits in each byte value
+BYTE_POPCOUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits across the last axis of an array of uint64 words"""
+    data = np.ascontiguousarray(words, dtype="<u8").view(np.uint8)
+    return BYTE_POPCOUNTS[data].sum(axis=-1, dtype=np.int64)
+
+
+def bit_indices(words: np.ndarray) -> np.ndarray:
+    """Positions of the set bits in a row of uint64 words, in increasing order"""
+    data = np.ascontiguousarray(words, dtype="<u8").view(np.uint8)
+    return np.flatnonzero(np.unpackbits(data, bitorder="little"))
+
+
+def get_bits(indices: np.ndarray, words: int) -> np.ndarray:
+    """A row of words with the bits at the given positions set"""
+    row = np.zeros(words, dtype=np.uint64)
+    indices = np.asarray(indices, dtype=np.int64)
+    np.bitwise_or.at(
+        row, indices // 64, np.uint64(1) << (indices % 64).astype(np.uint64)
+    )
+    return row
+
+
+class BitsetAdjacency(BaseAdjacency):
+    """Dense storage engine keeping links as packed bit rows of uint64 words.
+
+    Bit j of rows[i] is set if there is a link from node i to node j, and
+    reverse_rows holds the same bits transposed, so both directions cost one
+    word operation per 64 nodes. Node ids are interned in the order they are
+    added, and member_bits marks those that are graph nodes rather than only
+    link endpoints. Weights are kept for the weighted links only.
+
+    Takes n^2 / 4 bytes for n nodes, which is less than a set of Links once a
+    graph has more than about one link per hundred pairs of nodes, and lets
+    neighbourhoods be intersected 64 nodes at a time.
+    """
+
+    def __init__(self, is_directed: bool, capacity: int = 64):
+        self.is_directed = is_directed
+        self.node_ids: List[Hashable] = []
+        # The Node object first given for each node id
+        self.node_objects: List[Node] = []
+        self._positions: Dict[Hashable, int] = {}
+        capacity = max(64, -(-capacity // 64) * 64)
+        self.rows = np.zeros((capacity, capacity // 64), dtype=np.uint64)
+        self.reverse_rows = np.zeros_like(self.rows)
+        self.member_bits = np.zeros(capacity // 64, dtype=np.uint64)
+        self.weights: Dict[Tuple[int, int], float] = {}
+        self._order = 0
+        self._size = 0
+
+    @classmethod
+    def from_links(
+        cls, nodes: Iterable[Node], links: Iterable[Link], is_directed: bool
+    ) -> "BitsetAdjacency":
+        nodes, links = list(nodes), list(links)
+        adjacency = cls(is_directed, len(nodes))
+        for node in nodes:
+            adjacency._intern(node)
+        # Links between the same nodes keep the lightest
+        chosen: Dict[Tuple[int, int], Link] = {}
+        for link in links:
+            key = adjacency._intern(link.node_1), adjacency._intern(link.node_2)
+            existing = chosen.get(key)
+            if existing is None or link.cost < existing.cost:
+                chosen[key] = link
+        if chosen:
+            sources, targets = np.array(list(chosen)).T
+            adjacency._set_bits(sources, targets)
+        adjacency.weights = {
+            key: link.weight for key, link in chosen.items() if link.weight is not None
+        }
+        adjacency._size = len(chosen)
+        member_indices = [adjacency._positions[node.id] for node in nodes]
+        adjacency.member_bits = get_bits(member_indices, adjacency.rows.shape[1])
+        adjacency._order = len(set(member_indices))
+        return adjacency
+
+    @property
+    def nodes(self) -> Set[Node]:
+        return {self.node_at(i) for i in bit_indices(self.member_bits).tolist()}
+
+    @property
+    def links(self) -> Set[Link]:
+        sources, targets = self.edge_arrays()
+        return {
+            self._get_link(i, j) for i, j in zip(sources.tolist(), targets.tolist())
+        }
+
+    @property
+    def order(self) -> int:
+        return self._order
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __contains__(self, node: Node) -> bool:
+        index = self.index_of(node.id)
+        return index is not None and self._is_member_index(index)
+
+    def index_of(self, node_id: Hashable) -> Optional[int]:
+        return self._positions.get(node_id)
+
+    def node_at(self, index: int) -> Node:
+        return self.node_objects[index]
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (sources, targets) integer arrays, one entry per link, sorted"""
+        n = len(self.node_ids)
+        data = np.ascontiguousarray(self.rows[:n], dtype="<u8").view(np.uint8)
+        bits = np.unpackbits(data, axis=1, bitorder="little")[:, :n]
+        return np.nonzero(bits)
+
+    def neighbour_bits(self, index: int) -> np.ndarray:
+        """Bit row of the member neighbours of the node at index other than
+        itself, matching get_neighbourhood"""
+        bits = self.rows[index].copy()
+        if not self.is_directed:
+            bits |= self.reverse_rows[index]
+        bits &= self.member_bits
+        bits[index // 64] &= ~(np.uint64(1) << np.uint64(index % 64))
+        return bits
+
+    def undirected_bits(self) -> np.ndarray:
+        """Bit rows of the member nodes linked to each node in either direction,
+        other than itself, for every interned node"""
+        n = len(self.node_ids)
+        bits = (self.rows[:n] | self.reverse_rows[:n]) & self.member_bits
+        indices = np.arange(n)
+        bits[indices, indices // 64] &= ~(
+            np.uint64(1) << (indices % 64).astype(np.uint64)
+        )
+        bits[~self._member_mask()] = 0
+        return bits
+
+    def find_link(self, node_1: Node, node_2: Node) -> Optional[Link]:
+        i, j = self.index_of(node_1.id), self.index_of(node_2.id)
+        if i is None or j is None:
+            return None
+        if self._has_bit(self.rows, i, j):
+            return self._get_link(i, j)
+        if not self.is_directed and self._has_bit(self.rows, j, i):
+            return self._get_link(j, i)
+        return None
+
+    def get_neighbourhood(self, node: Node) -> Set[Node]:
+        index = self.index_of(node.id)
+        if index is None:
+            return set()
+        return {self.node_at(i) for i in bit_indices(self.neighbour_bits(index))}
+
+    def get_predecessors(self, node: Node) -> Set[Node]:
+        if not self.is_directed:
+            return self.get_neighbourhood(node)
+        index = self.index_of(node.id)
+        if index is None:
+            return set()
+        bits = self.reverse_rows[index] & self.member_bits
+        return {self.node_at(i) for i in bit_indices(bits).tolist() if i != index}
+
+    def get_incident_links(self, node: Node) -> Set[Link]:
+        index = self.index_of(node.id)
+        if index is None:
+            return set()
+        return {self._get_link(index, i) for i in bit_indices(self.rows[index])} | {
+            self._get_link(i, index) for i in bit_indices(self.reverse_rows[index])
+        }
+
+    def get_degree(self, node: Node) -> int:
+        index = self.index_of(node.id)
+        if index is None:
+            return 0
+        return int(popcount(self.neighbour_bits(index)))
+
+    def add_node(self, node: Node):
+        if node in self:
+            return
+        index = self._intern(node)
+        self.node_objects[index] = node
+        self.member_bits[index // 64] |= np.uint64(1) << np.uint64(index % 64)
+        self._order += 1
+        self.node_version += 1
+        if self.rows[index].any() or self.reverse_rows[index].any():
+            # Already a link endpoint, so now joins its neighbours' neighbourhoods
+            self.link_version += 1
+
+    def add_link(self, link: Link):
+        """Adds the link, and its nodes if they are not yet in the graph, replacing
+        any link from node_1 to node_2 of another weight"""
+        self.check_link(link)
+        for node in link.nodes:
+            self.add_node(node)
+        i, j = self.index_of(link.node_1.id), self.index_of(link.node_2.id)
+        if self._has_bit(self.rows, i, j):
+            if self.weights.get((i, j)) == link.weight:
+                return
+        else:
+            self._set_bits(np.array([i]), np.array([j]))
+            self._size += 1
+        if link.weight is None:
+            self.weights.pop((i, j), None)
+        else:
+            self.weights[i, j] = link.weight
+        self.link_version += 1
+
+    def remove_link(self, link: Link):
+        i, j = self.index_of(link.node_1.id), self.index_of(link.node_2.id)
+        if (
+            i is None
+            or j is None
+            or link.is_directed != self.is_directed
+            or not self._has_bit(self.rows, i, j)
+            or self.weights.get((i, j)) != link.weight
+        ):
+            raise InvalidMutationException(f"{link} is not in the graph")
+        self._clear_bit(i, j)
+        self.weights.pop((i, j), None)
+        self._size -= 1
+        self.link_version += 1
+
+    def remove_node(self, node: Node):
+        """Removes the node along with every link to or from it"""
+        if node not in self:
+            raise InvalidMutationException(f"{node} is not in the graph")
+        index = self.index_of(node.id)
+        targets = bit_indices(self.rows[index]).tolist()
+        sources = bit_indices(self.reverse_rows[index]).tolist()
+        links = {(index, i) for i in targets} | {(i, index) for i in sources}
+        for i, j in links:
+            self._clear_bit(i, j)
+            self.weights.pop((i, j), None)
+        self._size -= len(links)
+        self.member_bits[index // 64] &= ~(np.uint64(1) << np.uint64(index % 64))
+        self._order -= 1
+        self.node_version += 1
+        if links:
+            self.link_version += 1
+
+    def to_csr(self) -> CSRAdjacency:
+        """The same graph as CSR arrays"""
+        node_ids = intern_ids(self.node_ids)
+        positions = {j: i for i, j in enumerate(node_ids.tolist())}
+        new_indices = np.array([positions[i] for i in self.node_ids], dtype=np.int64)
+        sources, targets = self.edge_arrays()
+        weights = None
+        if self.weights:
+            # Unweighted links are stored as NaN once any link is weighted
+            n = len(self.node_ids)
+            keys = sources.astype(np.int64) * n + targets
+            weighted = np.array([i * n + j for i, j in self.weights], dtype=np.int64)
+            weights = np.full(len(keys), np.nan)
+            weights[np.searchsorted(keys, weighted)] = list(self.weights.values())
+        is_member = self._member_mask()
+        member_mask = None
+        if not is_member.all():
+            member_mask = np.zeros(len(node_ids), dtype=bool)
+            member_mask[new_indices[is_member]] = True
+        node_objects = np.empty(len(node_ids), dtype=object)
+        node_objects[new_indices] = self.node_objects
+        return CSRAdjacency.from_arrays(
+            node_ids,
+            new_indices[sources],
+            new_indices[targets],
+            self.is_directed,
+            member_mask,
+            weights,
+            node_objects,
+        )
+
+    def _intern(self, node: Node) -> int:
+        index = self._positions.get(node.id)
+        if index is None:
+            index = len(self.node_ids)
+            self._grow(index + 1)
+            self.node_ids.append(node.id)
+            self.node_objects.append(node)
+            self._positions[node.id] = index
+        return index
+
+    def _grow(self, count: int):
+        """Makes room for count nodes, doubling the capacity so growth is cheap"""
+        capacity = len(self.rows)
+        if count <= capacity:
+            return
+        new_capacity = max(2 * capacity, -(-count // 64) * 64)
+        words = self.rows.shape[1]
+        for name in ("rows", "reverse_rows"):
+            rows = np.zeros((new_capacity, new_capacity // 64), dtype=np.uint64)
+            rows[:capacity, :words] = getattr(self, name)
+            setattr(self, name, rows)
+        member_bits = np.zeros(new_capacity // 64, dtype=np.uint64)
+        member_bits[:words] = self.member_bits
+        self.member_bits = member_bits
+
+    def _set_bits(self, sources: np.ndarray, targets: np.ndarray):
+        sources, targets = sources.astype(np.int64), targets.astype(np.int64)
+        np.bitwise_or.at(
+            self.rows,
+            (sources, targets // 64),
+            np.uint64(1) << (targets % 64).astype(np.uint64),
+        )
+        np.bitwise_or.at(
+            self.reverse_rows,
+            (targets, sources // 64),
+            np.uint64(1) << (sources % 64).astype(np.uint64),
+        )
+
+    def _clear_bit(self, i: int, j: int):
+        self.rows[i, j // 64] &= ~(np.uint64(1) << np.uint64(j % 64))
+        self.reverse_rows[j, i // 64] &= ~(np.uint64(1) << np.uint64(i % 64))
+
+    @staticmethod
+    def _has_bit(rows: np.ndarray, i: int, j: int) -> bool:
+        return bool(int(rows[i, j // 64]) >> (j % 64) & 1)
+
+    def _get_link(self, i: int, j: int) -> Link:
+        return new_link(
+            self.node_at(i), self.node_at(j), self.is_directed, self.weights.get((i, j))
+        )
+
+    def _is_member_index(self, index: int) -> bool:
+        return self._has_bit(self.member_bits[np.newaxis], 0, index)
+
+    def _member_mask(self) -> np.ndarray:
+        mask = np.zeros(len(self.node_ids), dtype=bool)
+        mask[bit_indices(self.member_bits)] = True
+        return mask
@@ -0,0 +1,440 @@
+from typing import Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from graphs.data_structures.adjacency import BaseAdjacency
+from graphs.data_structures.basic_structures import Node, Link, new_link
+
+
+def link_costs(weights: np.ndarray) -> np.ndarray:
+    """Weights as costs, counting unweighted links, stored as NaN, as 1"""
+    return np.where(np.isnan(weights), 1.0, weights)
+
+
+def to_weight(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def build_csr(
+    sources: np.ndarray,
+    targets: np.ndarray,
+    n: int,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Returns (indptr, indices, weights) for the given edges, each row sorted and
+    deduplicated, keeping the lightest of any repeated edge"""
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+    if n < 2**31 and weights is None:
+        # Sorting one packed key is much faster than a lexsort over two arrays
+        keys, first = np.unique(
+            sources.astype(np.int64) * n + targets, return_index=True
+        )
+        sources, targets = keys // n, keys % n
+    else:
+        sort_keys = (
+            (targets, sources)
+            if weights is None
+            else (link_costs(weights), targets, sources)
+        )
+        first = np.lexsort(sort_keys)
+        sources, targets = sources[first], targets[first]
+        if len(sources):
+            keep = np.ones(len(sources), dtype=bool)
+            keep[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+            sources, targets, first = sources[keep], targets[keep], first[keep]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    if weights is not None:
+        weights = weights[first]
+    return indptr, targets.astype(index_dtype(n)), weights
+
+
+def component_labels(sources: np.ndarray, targets: np.ndarray, n: int) -> np.ndarray:
+    """Labels each of the n nodes with the smallest index in its weakly connected
+    component. Every round hooks each root onto the smallest root linked to its
+    tree, then flattens the trees by pointer jumping, so only a few vectorised
+    rounds are needed whatever the diameter of the graph"""
+    labels = np.arange(n)
+    while True:
+        source_labels, target_labels = labels[sources], labels[targets]
+        smallest = np.minimum(source_labels, target_labels)
+        hooked = labels.copy()
+        np.minimum.at(hooked, source_labels, smallest)
+        np.minimum.at(hooked, target_labels, smallest)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
+
+
+def row_positions(indptr: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Positions in indices of every entry of the given rows, row after row"""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    # Each entry's position is its row start plus its place within the row
+    positions = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    positions += np.arange(len(positions))
+    return positions
+
+
+def search_sorted(values: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """np.searchsorted of many keys, looked up in sorted order so the search
+    walks through values in order, which is several times faster"""
+    order = np.argsort(keys)
+    positions = np.empty(len(keys), dtype=np.int64)
+    positions[order] = np.searchsorted(values, keys[order])
+    return positions
+
+
+def neighbour_rows(adjacency: "CSRAdjacency") -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (indptr, indices) rows of the distinct member neighbours of each
+    node other than itself, matching get_neighbourhood. Rows of nodes that are
+    not members are empty"""
+    n = len(adjacency.node_ids)
+    sources, targets = adjacency.edge_arrays()
+    keep = sources != targets
+    if adjacency.is_member is not None:
+        keep &= adjacency.is_member[sources] & adjacency.is_member[targets]
+    if adjacency.is_directed and keep.all():
+        return adjacency.indptr, adjacency.indices
+    sources, targets = sources[keep], targets[keep]
+    if not adjacency.is_directed:
+        # Count each neighbour once, whichever way round its links were given
+        sources, targets = (
+            np.concatenate([sources, targets]),
+            np.concatenate([targets, sources]),
+        )
+    indptr, indices, _ = build_csr(sources, targets, n)
+    return indptr, indices
+
+
+def index_dtype(n: int) -> np.dtype:
+    return np.dtype(np.int32) if n < np.iinfo(np.int32).max else np.dtype(np.int64)
+
+
+class CSRAdjacency(BaseAdjacency):
+    """Compact storage engine interning node ids to dense integers.
+
+    Links are kept as compressed sparse row arrays, indptr/indices for the
+    forward direction and reverse_indptr/reverse_indices for the reverse one.
+    Node and Link objects are only created when a query returns them.
+    """
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        reverse_indptr: np.ndarray,
+        reverse_indices: np.ndarray,
+        is_directed: bool,
+        is_member: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+        reverse_weights: Optional[np.ndarray] = None,
+        node_objects: Optional[np.ndarray] = None,
+    ):
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.reverse_indptr = reverse_indptr
+        self.reverse_indices = reverse_indices
+        self.is_directed = is_directed
+        # Link endpoints that were not given as graph nodes are interned but not members
+        self.is_member = is_member
+        # Link weights lined up with indices and reverse_indices, None if unweighted
+        # and NaN for the unweighted links of a weighted graph
+        self.weights = weights
+        self.reverse_weights = reverse_weights
+        # The Node objects given for each node id, None if built from ids only
+        self.node_objects = node_objects
+        self._id_index = None
+        self._nodes = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        node_ids: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        is_directed: bool,
+        is_member: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+        node_objects: Optional[np.ndarray] = None,
+    ) -> "CSRAdjacency":
+        """Builds from integer edge arrays indexing into node_ids, with optional
+        weights lined up with them and Node objects lined up with node_ids"""
+        n = len(node_ids)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        indptr, indices, forward_weights = build_csr(sources, targets, n, weights)
+        reverse_indptr, reverse_indices, reverse_weights = build_csr(
+            targets, sources, n, weights
+        )
+        return cls(
+            node_ids,
+            indptr,
+            indices,
+            reverse_indptr,
+            reverse_indices,
+            is_directed,
+            is_member,
+            forward_weights,
+            reverse_weights,
+            node_objects,
+        )
+
+    @classmethod
+    def from_links(
+        cls, nodes: Iterable[Node], links: Iterable[Link], is_directed: bool
+    ) -> "CSRAdjacency":
+        links, nodes = list(links), list(nodes)
+        # The objects given are kept, graph nodes taking precedence over endpoints
+        objects = {node.id: node for link in links for node in link.nodes}
+        endpoint_ids = set(objects)
+        objects.update((node.id, node) for node in nodes)
+        member_ids = {node.id for node in nodes}
+        node_ids = intern_ids(objects)
+        node_objects = np.empty(len(node_ids), dtype=object)
+        node_objects[:] = [objects[i] for i in node_ids.tolist()]
+        positions = {j: i for i, j in enumerate(node_ids.tolist())}
+        sources = np.fromiter(
+            (positions[link.node_1.id] for link in links),
+            dtype=np.int64,
+            count=len(links),
+        )
+        targets = np.fromiter(
+            (positions[link.node_2.id] for link in links),
+            dtype=np.int64,
+            count=len(links),
+        )
+        is_member = None
+        if endpoint_ids - member_ids:
+            is_member = np.fromiter(
+                (i in member_ids for i in node_ids.tolist()),
+                dtype=bool,
+                count=len(node_ids),
+            )
+        weights = None
+        if any(link.weight is not None for link in links):
+            # Unweighted links among weighted ones are stored as NaN
+            weights = np.fromiter(
+                (np.nan if link.weight is None else link.weight for link in links),
+                dtype=np.float64,
+                count=len(links),
+            )
+        return cls.from_arrays(
+            node_ids, sources, targets, is_directed, is_member, weights, node_objects
+        )
+
+    @property
+    def nodes(self) -> Set[Node]:
+        # Node objects are per node rather than per link, so are kept once built
+        if self._nodes is None:
+            self._nodes = {self.node_at(i) for i in self._member_indices()}
+        return self._nodes
+
+    @property
+    def links(self) -> Set[Link]:
+        sources, targets = self.edge_arrays()
+        weights = (
+            [None] * len(sources)
+            if self.weights is None
+            else [to_weight(i) for i in self.weights]
+        )
+        return {
+            new_link(self.node_at(i), self.node_at(j), self.is_directed, weight)
+            for i, j, weight in zip(sources.tolist(), targets.tolist(), weights)
+        }
+
+    @property
+    def is_weighted(self) -> bool:
+        return self.weights is not None
+
+    @property
+    def order(self) -> int:
+        if self.is_member is None:
+            return len(self.node_ids)
+        return int(np.count_nonzero(self.is_member))
+
+    @property
+    def size(self) -> int:
+        return len(self.indices)
+
+    def __contains__(self, node: Node) -> bool:
+        index = self.index_of(node.id)
+        return index is not None and self._is_member_index(index)
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (sources, targets) integer arrays, one entry per link"""
+        sources = np.repeat(
+            np.arange(len(self.node_ids), dtype=self.indices.dtype),
+            np.diff(self.indptr),
+        )
+        return sources, self.indices
+
+    def index_of(self, node_id: Hashable) -> Optional[int]:
+        if self.node_ids.dtype.kind in "iu":
+            # Integer ids are interned sorted, so need no lookup table
+            if not isinstance(node_id, (int, np.integer)):
+                return None
+            index = int(np.searchsorted(self.node_ids, node_id))
+            if index < len(self.node_ids) and self.node_ids[index] == node_id:
+                return index
+            return None
+        if self._id_index is None:
+            self._id_index = {j: i for i, j in enumerate(self.node_ids.tolist())}
+        return self._id_index.get(node_id)
+
+    def indices_of(self, node_ids: Iterable[Hashable]) -> np.ndarray:
+        """index_of for many ids at once, with -1 for ids not interned"""
+        if self.node_ids.dtype.kind in "iu":
+            ids = np.asarray(
+                node_ids if isinstance(node_ids, np.ndarray) else list(node_ids)
+            )
+            if ids.dtype.kind in "iu" and len(self.node_ids):
+                positions = search_sorted(self.node_ids, ids)
+                found = self.node_ids[np.minimum(positions, len(self.node_ids) - 1)]
+                return np.where(found == ids, positions, -1)
+            node_ids = ids.tolist()
+        indices = (self.index_of(i) for i in node_ids)
+        return np.fromiter((-1 if i is None else i for i in indices), dtype=np.int64)
+
+    def node_at(self, index: int) -> Node:
+        if self.node_objects is not None:
+            return self.node_objects[index]
+        node_id = self.node_ids[index]
+        return Node(node_id.item() if isinstance(node_id, np.generic) else node_id)
+
+    def successor_indices(self, index: int) -> np.ndarray:
+        return self.indices[self.indptr[index] : self.indptr[index + 1]]
+
+    def predecessor_indices(self, index: int) -> np.ndarray:
+        return self.reverse_indices[
+            self.reverse_indptr[index] : self.reverse_indptr[index + 1]
+        ]
+
+    def neighbour_indices(self, index: int) -> np.ndarray:
+        """Sorted indices of member neighbours, matching get_neighbourhood"""
+        neighbours = self.successor_indices(index)
+        if not self.is_directed:
+            neighbours = np.union1d(neighbours, self.predecessor_indices(index))
+        neighbours = neighbours[neighbours != index]
+        if self.is_member is not None:
+            neighbours = neighbours[self.is_member[neighbours]]
+        return neighbours
+
+    def find_link(self, node_1: Node, node_2: Node) -> Optional[Link]:
+        i, j = self.index_of(node_1.id), self.index_of(node_2.id)
+        if i is None or j is None:
+            return None
+        position = self._find_index(self.indptr, self.indices, i, j)
+        if position is not None:
+            return new_link(
+                self.node_at(i),
+                self.node_at(j),
+                self.is_directed,
+                self.weight_at(position),
+            )
+        if not self.is_directed:
+            # Reverse rows hold the link from j to i at the same place as its weight
+            position = self._find_index(self.reverse_indptr, self.reverse_indices, i, j)
+            if position is not None:
+                return new_link(
+                    self.node_at(j),
+                    self.node_at(i),
+                    self.is_directed,
+                    self.weight_at(position, reverse=True),
+                )
+        return None
+
+    def get_neighbourhood(self, node: Node) -> Set[Node]:
+        index = self.index_of(node.id)
+        if index is None:
+            return set()
+        return {self.node_at(i) for i in self.neighbour_indices(index).tolist()}
+
+    def get_predecessors(self, node: Node) -> Set[Node]:
+        index = self.index_of(node.id)
+        if index is None:
+            return set()
+        if not self.is_directed:
+            neighbours = self.neighbour_indices(index)
+        else:
+            neighbours = self.predecessor_indices(index)
+            neighbours = neighbours[neighbours != index]
+            if self.is_member is not None:
+                neighbours = neighbours[self.is_member[neighbours]]
+        return {self.node_at(i) for i in neighbours.tolist()}
+
+    def get_incident_links(self, node: Node) -> Set[Link]:
+        index = self.index_of(node.id)
+        if index is None:
+            return set()
+        node = self.node_at(index)
+        start, reverse_start = self.indptr[index], self.reverse_indptr[index]
+        return {
+            new_link(node, self.node_at(i), self.is_directed, self.weight_at(start + k))
+            for k, i in enumerate(self.successor_indices(index).tolist())
+        } | {
+            new_link(
+                self.node_at(i),
+                node,
+                self.is_directed,
+                self.weight_at(reverse_start + k, reverse=True),
+            )
+            for k, i in enumerate(self.predecessor_indices(index).tolist())
+        }
+
+    @staticmethod
+    def _find_index(
+        indptr: np.ndarray, indices: np.ndarray, row: int, index: int
+    ) -> Optional[int]:
+        """Position of index within the given row of indices, if it is there"""
+        start, end = indptr[row], indptr[row + 1]
+        position = start + int(np.searchsorted(indices[start:end], index))
+        if position < end and indices[position] == index:
+            return int(position)
+        return None
+
+    def weight_at(self, position: int, reverse: bool = False) -> Optional[float]:
+        weights = self.reverse_weights if reverse else self.weights
+        return None if weights is None else to_weight(weights[position])
+
+    def _is_member_index(self, index: int) -> bool:
+        return self.is_member is None or bool(self.is_member[index])
+
+    def _member_indices(self) -> List[int]:
+        if self.is_member is None:
+            return list(range(len(self.node_ids)))
+        return np.flatnonzero(self.is_member).tolist()
+
+
+def intern_ids(node_ids: Iterable[Hashable]) -> np.ndarray:
+    """Returns the ids as an array, sorted when they are all integers"""
+    node_ids = list(node_ids)
+    int64 = np.iinfo(np.int64)
+    if all(
+        isinstance(i, int) and not isinstance(i, bool) and int64.min <= i <= int64.max
+        for i in node_ids
+    ):
+        return np.array(sorted(node_ids), dtype=np.int64)
+    array = np.empty(len(node_ids), dtype=object)
+    array[:] = node_ids
+    return array
+
+
+def as_csr(adjacency: BaseAdjacency) -> CSRAdjacency:
+    """Returns the storage as CSR arrays, converting other engines"""
+    if isinstance(adjacency, CSRAdjacency):
+        return adjacency
+    to_csr = getattr(adjacency, "to_csr", None)
+    if to_csr is not None:
+        return to_csr()
+    return CSRAdjacency.from_links(
+        adjacency.nodes, adjacency.links, adjacency.is_directed
+    )
@@ -1,13 +1,75 @@
-from typing import List
+from typing import List, Optional, Set, Type
 
+from graphs.data_structures.adjacency import AdjacencyIndex, BaseAdjacency
 from graphs.data_structures.basic_structures import Node, Link
+from graphs.data_structures.bitset import BitsetAdjacency
+
+# Graphs picking their own storage use bit rows from this order and density up
+DENSE_MIN_ORDER = 64
+DENSE_MIN_DENSITY = 0.25
+
+
+def choose_adjacency_class(
+    order: int, size: int, is_directed: bool
+) -> Type[BaseAdjacency]:
+    """BitsetAdjacency for graphs large and dense enough that bit rows take less
+    memory than sets of links and speed up neighbourhood operations, otherwise
+    AdjacencyIndex"""
+    if order < DENSE_MIN_ORDER:
+        return AdjacencyIndex
+    pairs = order * (order - 1)
+    density = size / pairs if is_directed else 2 * size / pairs
+    return BitsetAdjacency if density >= DENSE_MIN_DENSITY else AdjacencyIndex
 
 
 class BaseGraph:
-    def __init__(self, nodes: List[Node], links: List[Link]):
-        self.nodes = set(nodes)
+    def __init__(
+        self,
+        nodes: List[Node],
+        links: List[Link],
+        adjacency_class: Optional[Type[BaseAdjacency]] = None,
+    ):
+        """Stores the graph with adjacency_class, picked by choose_adjacency_class
+        if None"""
         assert all(i.is_directed for i in links) or all(
             not i.is_directed for i in links
         )
-        self.is_directed = next(i.is_directed for i in links)
-        self.links = set(links)
+        is_directed = next(i.is_directed for i in links)
+        if adjacency_class is None:
+            adjacency_class = choose_adjacency_class(
+                len(set(nodes)), len(set(links)), is_directed
+            )
+        self._set_adjacency(adjacency_class.from_links(nodes, links, is_directed))
+
+    @classmethod
+    def from_adjacency(cls, adjacency: BaseAdjacency):
+        """Wraps an already built storage engine without copying it"""
+        graph = cls.__new__(cls)
+        graph._set_adjacency(adjacency)
+        return graph
+
+    def _set_adjacency(self, adjacency: BaseAdjacency):
+        self.adjacency = adjacency
+        self.is_directed = adjacency.is_directed
+
+    @property
+    def nodes(self) -> Set[Node]:
+        return self.adjacency.nodes
+
+    @property
+    def links(self) -> Set[Link]:
+        return self.adjacency.links
+
+    def add_node(self, node: Node):
+        self.adjacency.add_node(node)
+
+    def add_link(self, link: Link):
+        """Adds the link, and its nodes if they are not yet in the graph"""
+        self.adjacency.add_link(link)
+
+    def remove_link(self, link: Link):
+        self.adjacency.remove_link(link)
+
+    def remove_node(self, node: Node):
+        """Removes the node along with every link to or from it"""
+        self.adjacency.remove_node(node)
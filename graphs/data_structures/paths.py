@@ -1,6 +1,6 @@
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
-from graphs.data_structures.basic_structures import Link, Node
+from graphs.data_structures.basic_structures import Link, Node, LeanLink
 
 
 class PathLink(Link):
@@ -17,4 +17,25 @@ class PathReport:
         self.to_node = to_node
         self.is_possible = len(paths) > 0
         self.paths = paths
-        self.distance = min(len(p) for p in paths) if paths else -1
+        # The total weight, so the number of links if the graph is unweighted
+        self.distance = (
+            min(sum(i.underlying_link.cost for i in p) for p in paths) if paths else -1
+        )
+
+
+class LeanPathLink(LeanLink):
+    __slots__ = ("underlying_link",)
+
+    def __init__(self, node_1, node_2, underlying_link):
+        self.underlying_link = underlying_link
+        super().__init__(node_1, node_2, True)
+
+    def _key(self) -> tuple:
+        return self.node_1, self.node_2, self.is_directed, self.underlying_link
+
+
+def new_path_link(node_1, node_2, underlying_link) -> Union[PathLink, LeanPathLink]:
+    """A LeanPathLink along a LeanLink, or a PathLink otherwise"""
+    if isinstance(underlying_link, LeanLink):
+        return LeanPathLink(node_1, node_2, underlying_link)
+    return PathLink(node_1, node_2, underlying_link)
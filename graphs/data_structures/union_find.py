@@ -0,0 +1,100 @@
+from typing import Dict, FrozenSet, Hashable, Iterable, Set
+
+
+class UnionFind:
+    """Disjoint set forest with union by size and path halving, so each operation
+    is amortised near O(1)"""
+
+    def __init__(self, items: Iterable[Hashable] = ()):
+        self.parents: Dict[Hashable, Hashable] = {}
+        self.sizes: Dict[Hashable, int] = {}
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.parents
+
+    def add(self, item: Hashable):
+        if item not in self.parents:
+            self.parents[item] = item
+            self.sizes[item] = 1
+
+    def find(self, item: Hashable) -> Hashable:
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, item_1: Hashable, item_2: Hashable) -> bool:
+        """Merges the sets holding both items, returning False if already merged"""
+        root_1, root_2 = self.find(item_1), self.find(item_2)
+        if root_1 == root_2:
+            return False
+        if self.sizes[root_1] < self.sizes[root_2]:
+            root_1, root_2 = root_2, root_1
+        self.parents[root_2] = root_1
+        self.sizes[root_1] += self.sizes.pop(root_2)
+        return True
+
+    def are_connected(self, item_1: Hashable, item_2: Hashable) -> bool:
+        return self.find(item_1) == self.find(item_2)
+
+    @property
+    def groups(self) -> Set[FrozenSet[Hashable]]:
+        groups: Dict[Hashable, Set[Hashable]] = {}
+        for item in self.parents:
+            groups.setdefault(self.find(item), set()).add(item)
+        return {frozenset(i) for i in groups.values()}
+
+
+class DynamicComponents(UnionFind):
+    """Union find that also keeps the members of each set, so a set can be split
+    again when a deletion disconnects it"""
+
+    def __init__(self, items: Iterable[Hashable] = ()):
+        self.members: Dict[Hashable, Set[Hashable]] = {}
+        super().__init__(items)
+
+    def add(self, item: Hashable):
+        if item not in self.parents:
+            super().add(item)
+            self.members[item] = {item}
+
+    def union(self, item_1: Hashable, item_2: Hashable) -> bool:
+        root_1, root_2 = self.find(item_1), self.find(item_2)
+        if not super().union(item_1, item_2):
+            return False
+        root = self.find(root_1)
+        other = root_2 if root == root_1 else root_1
+        self.members[root] |= self.members.pop(other)
+        return True
+
+    def get_members(self, item: Hashable) -> Set[Hashable]:
+        return self.members[self.find(item)]
+
+    def split(self, part: Set[Hashable]):
+        """Splits part, which must lie within one set, off into a set of its own"""
+        root = self.find(next(iter(part)))
+        rest = self.members.pop(root) - part
+        del self.sizes[root]
+        for group in (part, rest):
+            if group:
+                new_root = next(iter(group))
+                for item in group:
+                    self.parents[item] = new_root
+                self.sizes[new_root] = len(group)
+                self.members[new_root] = set(group)
+
+    def remove(self, item: Hashable):
+        """Removes an item that is alone in its set"""
+        root = self.find(item)
+        if self.members[root] != {item}:
+            raise ValueError(f"{item} is not alone in its set")
+        del self.parents[item]
+        del self.sizes[item]
+        del self.members[item]
+
+    @property
+    def groups(self) -> Set[FrozenSet[Hashable]]:
+        return {frozenset(i) for i in self.members.values()}
@@ -0,0 +1,244 @@
+from typing import Callable, Iterable, Optional, Set
+
+import numpy as np
+
+from graphs.data_structures.adjacency import BaseAdjacency
+from graphs.data_structures.basic_structures import Node, Link, new_link
+from graphs.data_structures.csr import CSRAdjacency, as_csr
+from graphs.exceptions import ImmutableGraphException
+
+
+class AdjacencyView(BaseAdjacency):
+    """Read only storage engine answering queries from the storage of another
+    graph, without copying it. Changes to the parent show through, and its
+    versions are the view's, so cached values follow them"""
+
+    def __init__(self, parent: BaseAdjacency):
+        self.parent = parent
+        self.is_directed = parent.is_directed
+
+    @classmethod
+    def from_links(
+        cls, nodes: Iterable[Node], links: Iterable[Link], is_directed: bool
+    ) -> "AdjacencyView":
+        raise ImmutableGraphException(
+            f"{cls.__name__} is a view of another graph, build that graph instead"
+        )
+
+    @property
+    def node_version(self) -> int:
+        return self.parent.node_version
+
+    @property
+    def link_version(self) -> int:
+        return self.parent.link_version
+
+    def _raise_immutable(self):
+        raise ImmutableGraphException(
+            f"{self.__class__.__name__} is a read only view, change the graph it "
+            f"views instead"
+        )
+
+
+class SubgraphView(AdjacencyView):
+    """The subgraph induced by a set of nodes, with every link of the parent
+    between two of them. Nodes that are not in the parent are left out"""
+
+    def __init__(self, parent: BaseAdjacency, nodes: Iterable[Node]):
+        super().__init__(parent)
+        self._nodes = frozenset(nodes)
+
+    @property
+    def nodes(self) -> Set[Node]:
+        return {node for node in self._nodes if node in self.parent}
+
+    @property
+    def links(self) -> Set[Link]:
+        nodes = self.nodes
+        return {
+            link
+            for node in nodes
+            for link in self.parent.get_incident_links(node)
+            if link.node_1 in nodes and link.node_2 in nodes
+        }
+
+    @property
+    def order(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def size(self) -> int:
+        return len(self.links)
+
+    def __contains__(self, node: Node) -> bool:
+        return node in self._nodes and node in self.parent
+
+    def find_link(self, node_1: Node, node_2: Node) -> Optional[Link]:
+        if node_1 in self and node_2 in self:
+            return self.parent.find_link(node_1, node_2)
+        return None
+
+    def get_neighbourhood(self, node: Node) -> Set[Node]:
+        if node not in self._nodes:
+            return set()
+        return self.parent.get_neighbourhood(node) & self._nodes
+
+    def get_predecessors(self, node: Node) -> Set[Node]:
+        if node not in self._nodes:
+            return set()
+        return self.parent.get_predecessors(node) & self._nodes
+
+    def get_incident_links(self, node: Node) -> Set[Link]:
+        if node not in self:
+            return set()
+        return {
+            link
+            for link in self.parent.get_incident_links(node)
+            if link.node_1 in self and link.node_2 in self
+        }
+
+    def to_csr(self) -> CSRAdjacency:
+        """The subgraph as CSR arrays, sliced from those of a CSR parent"""
+        if not isinstance(self.parent, CSRAdjacency):
+            return CSRAdjacency.from_links(self.nodes, self.links, self.is_directed)
+        parent = self.parent
+        indices = np.unique(parent.indices_of([node.id for node in self._nodes]))
+        indices = indices[indices >= 0]
+        if parent.is_member is not None:
+            indices = indices[parent.is_member[indices]]
+        new_indices = np.full(len(parent.node_ids), -1, dtype=np.int64)
+        new_indices[indices] = np.arange(len(indices))
+        sources, targets = parent.edge_arrays()
+        keep = (new_indices[sources] >= 0) & (new_indices[targets] >= 0)
+        return CSRAdjacency.from_arrays(
+            parent.node_ids[indices],
+            new_indices[sources[keep]],
+            new_indices[targets[keep]],
+            self.is_directed,
+            weights=None if parent.weights is None else parent.weights[keep],
+            node_objects=(
+                None if parent.node_objects is None else parent.node_objects[indices]
+            ),
+        )
+
+
+class LinkFilterView(AdjacencyView):
+    """Every node of the parent, with only the links passing predicate"""
+
+    def __init__(self, parent: BaseAdjacency, predicate: Callable[[Link], bool]):
+        super().__init__(parent)
+        self.predicate = predicate
+
+    @property
+    def nodes(self) -> Set[Node]:
+        return self.parent.nodes
+
+    @property
+    def links(self) -> Set[Link]:
+        return {link for link in self.parent.links if self.predicate(link)}
+
+    @property
+    def order(self) -> int:
+        return self.parent.order
+
+    @property
+    def size(self) -> int:
+        return len(self.links)
+
+    def __contains__(self, node: Node) -> bool:
+        return node in self.parent
+
+    def find_link(self, node_1: Node, node_2: Node) -> Optional[Link]:
+        link = self.parent.find_link(node_1, node_2)
+        if link is not None and self.predicate(link):
+            return link
+        if not self.is_directed:
+            # The parent may hold links both ways round, finding the other first
+            link = self.parent.find_link(node_2, node_1)
+            if link is not None and self.predicate(link):
+                return link
+        return None
+
+    def get_neighbourhood(self, node: Node) -> Set[Node]:
+        return {
+            neighbour
+            for neighbour in self.parent.get_neighbourhood(node)
+            if self.find_link(node, neighbour) is not None
+        }
+
+    def get_predecessors(self, node: Node) -> Set[Node]:
+        if not self.is_directed:
+            return self.get_neighbourhood(node)
+        return {
+            predecessor
+            for predecessor in self.parent.get_predecessors(node)
+            if self.find_link(predecessor, node) is not None
+        }
+
+    def get_incident_links(self, node: Node) -> Set[Link]:
+        return {
+            link
+            for link in self.parent.get_incident_links(node)
+            if self.predicate(link)
+        }
+
+
+class ReversedView(AdjacencyView):
+    """The parent with the direction of every link turned round"""
+
+    def __init__(self, parent: BaseAdjacency):
+        if not parent.is_directed:
+            raise ValueError("Only directed graphs can be reversed")
+        super().__init__(parent)
+
+    @property
+    def nodes(self) -> Set[Node]:
+        return self.parent.nodes
+
+    @property
+    def links(self) -> Set[Link]:
+        return {reverse_link(link) for link in self.parent.links}
+
+    @property
+    def order(self) -> int:
+        return self.parent.order
+
+    @property
+    def size(self) -> int:
+        return self.parent.size
+
+    def __contains__(self, node: Node) -> bool:
+        return node in self.parent
+
+    def find_link(self, node_1: Node, node_2: Node) -> Optional[Link]:
+        link = self.parent.find_link(node_2, node_1)
+        return None if link is None else reverse_link(link)
+
+    def get_neighbourhood(self, node: Node) -> Set[Node]:
+        return self.parent.get_predecessors(node)
+
+    def get_predecessors(self, node: Node) -> Set[Node]:
+        return self.parent.get_neighbourhood(node)
+
+    def get_incident_links(self, node: Node) -> Set[Link]:
+        return {reverse_link(link) for link in self.parent.get_incident_links(node)}
+
+    def to_csr(self) -> CSRAdjacency:
+        """The CSR arrays of the parent with the forward and reverse rows swapped"""
+        csr = as_csr(self.parent)
+        return CSRAdjacency(
+            csr.node_ids,
+            csr.reverse_indptr,
+            csr.reverse_indices,
+            csr.indptr,
+            csr.indices,
+            csr.is_directed,
+            csr.is_member,
+            csr.reverse_weights,
+            csr.weights,
+            csr.node_objects,
+        )
+
+
+def reverse_link(link: Link) -> Link:
+    return new_link(link.node_2, link.node_1, link.is_directed, link.weight)
@@ -0,0 +1,106 @@
+from typing import List
+
+import numpy as np
+
+from graphs.data_structures.basic_structures import Node
+from graphs.data_structures.csr import CSRAdjacency, neighbour_rows
+
+# Which degree of each node a statistic is taken over
+OUT = "out"
+IN = "in"
+TOTAL = "total"
+
+
+class DegreeDistribution:
+    """Degrees of every node as NumPy arrays, counted in one vectorised pass over
+    the CSR arrays.
+
+    Degrees count distinct neighbours other than the node itself, as get_degree
+    does. In a directed graph the out degree is the graph's degree and the total
+    degree is the in degree plus the out degree, in an undirected graph all three
+    are the same. Entry i of each array belongs to nodes[i].
+    """
+
+    def __init__(self, adjacency: CSRAdjacency):
+        self.adjacency = adjacency
+        self.is_directed = adjacency.is_directed
+        n = len(adjacency.node_ids)
+        indptr, targets = neighbour_rows(adjacency)
+        sources = np.repeat(np.arange(n), np.diff(indptr))
+        # Rows are deduplicated, so every remaining edge is a distinct neighbour
+        self._sources, self._targets = sources, targets
+        self._all_out_degrees = np.bincount(sources, minlength=n)
+        self._all_in_degrees = np.bincount(targets, minlength=n)
+        self._member_indices = (
+            None if adjacency.is_member is None else np.flatnonzero(adjacency.is_member)
+        )
+        self.out_degrees = self._members_only(self._all_out_degrees)
+        self.in_degrees = self._members_only(self._all_in_degrees)
+        self.total_degrees = (
+            self.out_degrees + self.in_degrees if self.is_directed else self.out_degrees
+        )
+        self._nodes = None
+
+    @property
+    def degrees(self) -> np.ndarray:
+        return self.out_degrees
+
+    @property
+    def nodes(self) -> List[Node]:
+        if self._nodes is None:
+            indices = (
+                range(len(self.adjacency.node_ids))
+                if self._member_indices is None
+                else self._member_indices.tolist()
+            )
+            self._nodes = [self.adjacency.node_at(i) for i in indices]
+        return self._nodes
+
+    def get_degrees(self, kind: str = OUT) -> np.ndarray:
+        if kind == OUT:
+            return self.out_degrees
+        if kind == IN:
+            return self.in_degrees
+        if kind == TOTAL:
+            return self.total_degrees
+        raise ValueError(
+            f"Unknown degree kind {kind}, expected one of {OUT, IN, TOTAL}"
+        )
+
+    def maximum(self, kind: str = OUT) -> int:
+        return int(self.get_degrees(kind).max())
+
+    def minimum(self, kind: str = OUT) -> int:
+        return int(self.get_degrees(kind).min())
+
+    def is_k_regular(self, k: int, kind: str = OUT) -> bool:
+        degrees = self.get_degrees(kind)
+        return len(degrees) > 0 and bool((degrees == k).all())
+
+    def histogram(self, kind: str = OUT) -> np.ndarray:
+        """Number of nodes with each degree, indexed by degree"""
+        return np.bincount(self.get_degrees(kind))
+
+    def percentile(self, q, kind: str = OUT):
+        """Degree at percentile(s) q, between 0 and 100"""
+        return np.percentile(self.get_degrees(kind), q)
+
+    def nodes_with_degree(self, k: int, kind: str = OUT) -> List[Node]:
+        nodes = self.nodes
+        return [nodes[i] for i in np.flatnonzero(self.get_degrees(kind) == k).tolist()]
+
+    def assortativity(self) -> float:
+        """Pearson correlation between the degrees at either end of each link,
+        out degree of the source against in degree of the target if directed.
+        Positive if nodes tend to link to nodes of similar degree, nan if every
+        link joins the same pair of degrees"""
+        x = self._all_out_degrees[self._sources].astype(np.float64)
+        y = self._all_in_degrees[self._targets].astype(np.float64)
+        if len(x) == 0 or x.std() == 0 or y.std() == 0:
+            return float("nan")
+        return float(((x - x.mean()) * (y - y.mean())).mean() / (x.std() * y.std()))
+
+    def _members_only(self, degrees: np.ndarray) -> np.ndarray:
+        if self._member_indices is None:
+            return degrees
+        return degrees[self._member_indices]
@@ -0,0 +1,170 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from graphs.data_structures.basic_structures import new_link
+from graphs.data_structures.csr import CSRAdjacency, component_labels
+from graphs.data_structures.graphs import BaseGraph
+from graphs.data_structures.paths import PathLink, new_path_link
+from graphs.graph_properties import ArrayGraphProperties
+
+
+class EulerianProperties(ArrayGraphProperties):
+    """Euler paths, which use every link exactly once, and Euler circuits, which
+    also end where they start.
+
+    Works on the CSR arrays of the graph. Every link between graph nodes counts,
+    so a self loop adds two to an undirected degree and two links between the
+    same pair are both traversed. Nodes without links are ignored, and the links
+    must all lie in one weakly connected part.
+    """
+
+    def __init__(self, graph: BaseGraph):
+        super().__init__(graph)
+        self._arrays_csr: Optional[CSRAdjacency] = None
+
+    def _refresh(self):
+        """Rebuilds the link arrays and degrees if the graph has changed"""
+        csr = self.csr
+        if csr is self._arrays_csr:
+            return
+        sources, targets = csr.edge_arrays()
+        # Where each link is stored in indices, to look its weight up by
+        positions = np.arange(len(sources))
+        if csr.is_member is not None:
+            keep = csr.is_member[sources] & csr.is_member[targets]
+            sources, targets, positions = sources[keep], targets[keep], positions[keep]
+        self.positions = positions
+        self.sources = sources.astype(np.int64)
+        self.targets = targets.astype(np.int64)
+        n = len(csr.node_ids)
+        self.out_degrees = np.bincount(self.sources, minlength=n)
+        self.in_degrees = np.bincount(self.targets, minlength=n)
+        self._arrays_csr = csr
+
+    @property
+    def is_eulerian(self) -> bool:
+        """If there is an Euler circuit, in O(V + E)"""
+        self._refresh()
+        if self.is_directed:
+            balanced = np.array_equal(self.out_degrees, self.in_degrees)
+        else:
+            balanced = not self._odd_nodes().size
+        return balanced and self._is_weakly_connected()
+
+    @property
+    def has_eulerian_path(self) -> bool:
+        """If there is an Euler path, open or closed, in O(V + E)"""
+        self._refresh()
+        return self._get_start() is not None and self._is_weakly_connected()
+
+    def find_eulerian_circuit(self) -> Optional[Tuple[PathLink, ...]]:
+        if not self.is_eulerian:
+            return None
+        return self._to_path(*self._hierholzer(self._get_start()))
+
+    def find_eulerian_path(self) -> Optional[Tuple[PathLink, ...]]:
+        """Returns an Euler path, which is a circuit if one exists"""
+        if not self.has_eulerian_path:
+            return None
+        return self._to_path(*self._hierholzer(self._get_start()))
+
+    def find_eulerian_node_ids(self, circuit: bool = False) -> Optional[np.ndarray]:
+        """The ids of the nodes along an Euler circuit, or path if not circuit, as
+        one array. Avoids building a PathLink per link on very large graphs"""
+        exists = self.is_eulerian if circuit else self.has_eulerian_path
+        if not exists:
+            return None
+        nodes, _ = self._hierholzer(self._get_start())
+        return self.csr.node_ids[np.asarray(nodes, dtype=np.int64)]
+
+    def _odd_nodes(self) -> np.ndarray:
+        return np.flatnonzero((self.out_degrees + self.in_degrees) % 2)
+
+    def _get_start(self) -> Optional[int]:
+        """Index of the node an Euler path must start from, any node with a link if
+        it can start anywhere, or None if the degrees rule out an Euler path"""
+        if not len(self.sources):
+            return -1
+        if self.is_directed:
+            surplus = self.out_degrees - self.in_degrees
+            unbalanced = np.flatnonzero(surplus)
+            if not unbalanced.size:
+                return int(self.sources[0])
+            if sorted(surplus[unbalanced].tolist()) != [-1, 1]:
+                return None
+            return int(unbalanced[surplus[unbalanced] == 1][0])
+        odd_nodes = self._odd_nodes()
+        if not odd_nodes.size:
+            return int(self.sources[0])
+        return int(odd_nodes[0]) if odd_nodes.size == 2 else None
+
+    def _is_weakly_connected(self) -> bool:
+        """If every node with a link is in the same weakly connected component"""
+        if not len(self.sources):
+            return True
+        labels = component_labels(self.sources, self.targets, len(self.csr.node_ids))
+        linked_labels = labels[self.out_degrees + self.in_degrees > 0]
+        return bool((linked_labels == linked_labels[0]).all())
+
+    def _hierholzer(self, start: int) -> Tuple[List[int], List[int]]:
+        """Iterative Hierholzer's algorithm in O(E), returning the path as node
+        indices and the index of the link taken between each consecutive pair"""
+        if start < 0:
+            return [], []
+        n = len(self.csr.node_ids)
+        link_indices = np.arange(len(self.sources))
+        if self.is_directed:
+            tails, heads = self.sources, self.targets
+        else:
+            # Each undirected link can be left from either end
+            tails = np.concatenate([self.sources, self.targets])
+            heads = np.concatenate([self.targets, self.sources])
+            link_indices = np.concatenate([link_indices, link_indices])
+        order = np.argsort(tails, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=n), out=indptr[1:])
+        # Python lists are much faster than arrays to index one element at a time
+        row_ends = indptr[1:].tolist()
+        next_positions = indptr[:-1].tolist()
+        heads = heads[order].tolist()
+        link_indices = link_indices[order].tolist()
+        used = bytearray(len(self.sources))
+
+        node_stack, link_stack = [start], [-1]
+        nodes, links = [], []
+        while node_stack:
+            node = node_stack[-1]
+            position, end = next_positions[node], row_ends[node]
+            while position < end and used[link_indices[position]]:
+                position += 1
+            if position == end:
+                next_positions[node] = position
+                nodes.append(node_stack.pop())
+                links.append(link_stack.pop())
+                continue
+            next_positions[node] = position + 1
+            used[link_indices[position]] = 1
+            node_stack.append(heads[position])
+            link_stack.append(link_indices[position])
+        nodes.reverse()
+        links.reverse()
+        return nodes, links[1:]
+
+    def _to_path(self, nodes: List[int], links: List[int]) -> Tuple[PathLink, ...]:
+        # Each node is built once however often the path passes through it
+        graph_nodes = {i: self.csr.node_at(i) for i in set(nodes)}
+        sources, targets = self.sources.tolist(), self.targets.tolist()
+        positions = self.positions.tolist()
+        path = []
+        for node_1, node_2, link in zip(nodes, nodes[1:], links):
+            underlying_link = new_link(
+                graph_nodes[sources[link]],
+                graph_nodes[targets[link]],
+                self.is_directed,
+                self.csr.weight_at(positions[link]),
+            )
+            path.append(
+                new_path_link(graph_nodes[node_1], graph_nodes[node_2], underlying_link)
+            )
+        return tuple(path)
@@ -1,2 +1,30 @@
 class InvalidDictionaryException(Exception):
     pass
+
+
+class InvalidEdgesException(Exception):
+    pass
+
+
+class InvalidFileException(Exception):
+    pass
+
+
+class UnsupportedNodeIdsException(Exception):
+    pass
+
+
+class InvalidMutationException(Exception):
+    pass
+
+
+class ImmutableGraphException(Exception):
+    pass
+
+
+class NegativeWeightException(Exception):
+    pass
+
+
+class PathLimitException(Exception):
+    pass
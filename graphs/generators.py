@@ -0,0 +1,169 @@
+"""Seeded synthetic graphs for tests and benchmarks. Links are generated as
+arrays of integer node ids 0 to n - 1, so graphs of millions of links build in
+seconds on CSR storage. Wrap the result with Graph.from_base_graph."""
+
+import random
+from typing import Tuple, Type
+
+import numpy as np
+
+from graphs.data_structures.adjacency import BaseAdjacency
+from graphs.data_structures.basic_structures import Node, Link
+from graphs.data_structures.csr import CSRAdjacency
+from graphs.data_structures.graphs import BaseGraph
+
+Links = Tuple[np.ndarray, np.ndarray]
+
+
+def erdos_renyi_graph(
+    n: int,
+    p: float,
+    is_directed: bool = False,
+    seed: int = 0,
+    adjacency_class: Type[BaseAdjacency] = CSRAdjacency,
+) -> BaseGraph:
+    """Links each pair of distinct nodes with probability p"""
+    rng = np.random.default_rng(seed)
+    pairs = n * (n - 1) if is_directed else n * (n - 1) // 2
+    count = int(rng.binomial(pairs, p)) if pairs else 0
+    return _build(
+        n, _sample_pairs(rng, n, count, is_directed), is_directed, adjacency_class
+    )
+
+
+def barabasi_albert_graph(
+    n: int,
+    m: int,
+    is_directed: bool = False,
+    seed: int = 0,
+    adjacency_class: Type[BaseAdjacency] = CSRAdjacency,
+) -> BaseGraph:
+    """Adds nodes one at a time from m initial nodes, each linking to m distinct
+    earlier nodes chosen in proportion to their degree, giving a scale free
+    degree distribution. Directed links point from the new node"""
+    rng = random.Random(seed)
+    sources, targets = [], []
+    # Each node appears once per link end, so a uniform pick is degree weighted
+    ends = list(range(m))
+    for node in range(m, n):
+        chosen = set()
+        while len(chosen) < m:
+            chosen.add(ends[rng.randrange(len(ends))])
+        sources.extend([node] * m)
+        targets.extend(chosen)
+        ends.extend(chosen)
+        ends.extend([node] * m)
+    return _build(
+        n,
+        (np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)),
+        is_directed,
+        adjacency_class,
+    )
+
+
+def grid_graph(
+    rows: int,
+    columns: int,
+    is_directed: bool = False,
+    adjacency_class: Type[BaseAdjacency] = CSRAdjacency,
+) -> BaseGraph:
+    """Nodes on a rows by columns lattice, numbered row by row, linked to the
+    nodes to their right and below"""
+    ids = np.arange(rows * columns).reshape(rows, columns)
+    sources = np.concatenate([ids[:, :-1].ravel(), ids[:-1].ravel()])
+    targets = np.concatenate([ids[:, 1:].ravel(), ids[1:].ravel()])
+    return _build(rows * columns, (sources, targets), is_directed, adjacency_class)
+
+
+def random_dag(
+    n: int,
+    p: float,
+    seed: int = 0,
+    adjacency_class: Type[BaseAdjacency] = CSRAdjacency,
+) -> BaseGraph:
+    """erdos_renyi_graph with each link pointing along a random order of the
+    nodes, so there are no cycles"""
+    rng = np.random.default_rng(seed)
+    pairs = n * (n - 1) // 2
+    count = int(rng.binomial(pairs, p)) if pairs else 0
+    sources, targets = _sample_pairs(rng, n, count, False)
+    ranks = rng.permutation(n)
+    is_forward = ranks[sources] < ranks[targets]
+    links = (
+        np.where(is_forward, sources, targets),
+        np.where(is_forward, targets, sources),
+    )
+    return _build(n, links, True, adjacency_class)
+
+
+def complete_graph(
+    n: int,
+    is_directed: bool = False,
+    adjacency_class: Type[BaseAdjacency] = CSRAdjacency,
+) -> BaseGraph:
+    """Links every pair of distinct nodes, both ways round if directed"""
+    if is_directed:
+        sources, targets = np.nonzero(~np.eye(n, dtype=bool))
+    else:
+        sources, targets = np.triu_indices(n, 1)
+    return _build(n, (sources, targets), is_directed, adjacency_class)
+
+
+def path_graph(
+    n: int,
+    is_directed: bool = False,
+    adjacency_class: Type[BaseAdjacency] = CSRAdjacency,
+) -> BaseGraph:
+    """Links each node to the next"""
+    return _build(n, (np.arange(n - 1), np.arange(1, n)), is_directed, adjacency_class)
+
+
+def _sample_pairs(
+    rng: np.random.Generator, n: int, count: int, is_directed: bool
+) -> Links:
+    """count distinct pairs of distinct nodes, uniformly at random, with the
+    smaller id first if undirected"""
+    pairs = n * (n - 1) if is_directed else n * (n - 1) // 2
+    keys = rng.choice(pairs, count, replace=False) if count else np.empty(0, int)
+    keys = keys.astype(np.int64)
+    if is_directed:
+        # Targets are numbered among the other n - 1 nodes, skipping the source
+        sources, targets = keys // (n - 1), keys % (n - 1)
+        targets += targets >= sources
+        return sources, targets
+    # Row i of the upper triangle starts at key i * (2n - i - 1) / 2, inverted
+    # in floating point then corrected for rounding
+    sources = ((2 * n - 1 - np.sqrt((2 * n - 1) ** 2 - 8.0 * keys)) // 2).astype(
+        np.int64
+    )
+    sources -= _get_row_starts(n, sources) > keys
+    sources += _get_row_starts(n, sources + 1) <= keys
+    return sources, keys - _get_row_starts(n, sources) + sources + 1
+
+
+def _get_row_starts(n: int, rows: np.ndarray) -> np.ndarray:
+    return rows * (2 * n - rows - 1) // 2
+
+
+def _build(
+    n: int,
+    links: Links,
+    is_directed: bool,
+    adjacency_class: Type[BaseAdjacency],
+) -> BaseGraph:
+    sources, targets = links
+    if adjacency_class is CSRAdjacency:
+        adjacency = CSRAdjacency.from_arrays(
+            np.arange(n), sources, targets, is_directed
+        )
+    else:
+        nodes = [Node(i) for i in range(n)]
+        adjacency = adjacency_class.from_links(
+            nodes,
+            [
+                Link(nodes[i], nodes[j], is_directed)
+                for i, j in zip(sources.tolist(), targets.tolist())
+            ],
+            is_directed,
+        )
+    return BaseGraph.from_adjacency(adjacency)
@@ -1,30 +1,308 @@
-from typing import Dict, Iterable, Hashable
+from typing import Dict, Iterable, Hashable, Type, Optional, Tuple, List, Sequence
 
+import numpy as np
+
+from graphs.data_structures.adjacency import BaseAdjacency
+from graphs.data_structures.csr import CSRAdjacency
 from graphs.data_structures.graphs import BaseGraph
 from graphs.data_structures.basic_structures import Node, Link
-from graphs.exceptions import InvalidDictionaryException
+from graphs.exceptions import InvalidDictionaryException, InvalidEdgesException
 
 
 class GraphBuilder:
     @classmethod
     def from_graph_dictionary(
-        cls, graph_dictionary: Dict[Hashable, Iterable[Hashable]], is_directed: bool
+        cls,
+        graph_dictionary: Dict[Hashable, Iterable[Hashable]],
+        is_directed: bool,
+        adjacency_class: Optional[Type[BaseAdjacency]] = None,
     ) -> BaseGraph:
         cls._validate_graph_dict(graph_dictionary)
+        if adjacency_class is not None and issubclass(adjacency_class, CSRAdjacency):
+            edges = (
+                (node, link_node)
+                for node, links in graph_dictionary.items()
+                for link_node in links
+            )
+            return cls.from_edge_list(edges, is_directed, graph_dictionary.keys())
         nodes = {node: Node(node) for node in graph_dictionary.keys()}
         all_links = []
         for node, links in graph_dictionary.items():
-            all_links += [
+            all_links.extend(
                 Link(nodes[node], nodes[link_node], is_directed) for link_node in links
-            ]
-        return BaseGraph(list(nodes.values()), all_links)
+            )
+        return BaseGraph(list(nodes.values()), all_links, adjacency_class)
+
+    @classmethod
+    def from_edge_list(
+        cls,
+        edges: Iterable[Tuple],
+        is_directed: bool,
+        node_ids: Optional[Iterable[Hashable]] = None,
+    ) -> BaseGraph:
+        """Builds a CSR backed graph from (source id, target id) pairs, or
+        (source id, target id, weight) triples. Nodes are all the link endpoints
+        unless node_ids is given, which must then contain them"""
+        sources, targets, weights = [], [], []
+        for source, target, *weight in edges:
+            sources.append(source)
+            targets.append(target)
+            weights.extend(weight)
+        if weights and len(weights) != len(sources):
+            raise InvalidEdgesException(
+                "Either every edge or no edge must have a weight"
+            )
+        return cls.from_numpy(
+            cls._to_id_array(sources),
+            cls._to_id_array(targets),
+            is_directed,
+            None if node_ids is None else cls._to_id_array(list(node_ids)),
+            np.array(weights, dtype=np.float64) if weights else None,
+        )
+
+    @classmethod
+    def from_numpy(
+        cls,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        is_directed: bool,
+        node_ids: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+    ) -> BaseGraph:
+        """Builds a CSR backed graph from parallel arrays of source and target ids,
+        and optionally of link weights"""
+        sources, targets = np.asarray(sources), np.asarray(targets)
+        cls._validate_edge_arrays(sources, targets, weights)
+        arrays = [sources, targets] + ([] if node_ids is None else [node_ids])
+        sources, targets, *node_ids = cls._as_common_kind(*arrays)
+        node_ids = node_ids[0] if node_ids else None
+        if sources.dtype.kind == "O":
+            node_ids, source_indices, target_indices = cls._intern_objects(
+                sources, targets, node_ids
+            )
+        else:
+            node_ids, source_indices, target_indices = cls._intern_arrays(
+                sources, targets, node_ids
+            )
+        if (source_indices < 0).any() or (target_indices < 0).any():
+            extra_nodes = set(sources[source_indices < 0].tolist()) | set(
+                targets[target_indices < 0].tolist()
+            )
+            raise InvalidEdgesException(
+                f"Found edge endpoint(s) that are not present in the node ids: {extra_nodes}"
+            )
+        adjacency = CSRAdjacency.from_arrays(
+            node_ids, source_indices, target_indices, is_directed, weights=weights
+        )
+        return BaseGraph.from_adjacency(adjacency)
+
+    @classmethod
+    def from_coo(
+        cls,
+        row: np.ndarray,
+        col: np.ndarray,
+        is_directed: bool,
+        shape: Optional[Tuple[int, int]] = None,
+        data: Optional[np.ndarray] = None,
+    ) -> BaseGraph:
+        """Builds a CSR backed graph from scipy style COO coordinates, so
+        node ids are 0 to n - 1, with data as the link weights if given. A scipy
+        matrix m can be passed as from_coo(m.row, m.col, is_directed, m.shape, m.data)
+        """
+        row, col = np.asarray(row), np.asarray(col)
+        cls._validate_edge_arrays(row, col, data)
+        n = (
+            max(shape)
+            if shape is not None
+            else int(max(row.max(initial=-1), col.max(initial=-1))) + 1
+        )
+        if len(row) and (
+            min(row.min(), col.min()) < 0 or max(row.max(), col.max()) >= n
+        ):
+            raise InvalidEdgesException(
+                f"Found coordinate(s) outside of the {n} x {n} matrix"
+            )
+        adjacency = CSRAdjacency.from_arrays(
+            np.arange(n, dtype=np.int64), row, col, is_directed, weights=data
+        )
+        return BaseGraph.from_adjacency(adjacency)
 
     @staticmethod
     def _validate_graph_dict(graph_dict: Dict[Hashable, Iterable[Hashable]]):
-        allowed_nodes = set(graph_dict.keys())
+        allowed_nodes = graph_dict.keys()
         for links in graph_dict.values():
-            if not set(links).issubset(allowed_nodes):
-                extra_links = set(links) - allowed_nodes
+            extra_links = set(links) - allowed_nodes
+            if extra_links:
                 raise InvalidDictionaryException(
                     f"Found node(s) in dictionary values that is not present in the keys: {extra_links} "
                 )
+
+    @staticmethod
+    def _validate_edge_arrays(
+        sources: np.ndarray, targets: np.ndarray, weights: Optional[np.ndarray] = None
+    ):
+        if sources.ndim != 1 or sources.shape != targets.shape:
+            raise InvalidEdgesException(
+                f"Sources and targets must be one dimensional arrays of the same length, "
+                f"got shapes {sources.shape} and {targets.shape}"
+            )
+        if weights is not None and np.shape(weights) != sources.shape:
+            raise InvalidEdgesException(
+                f"Weights must line up with the edges, got shape {np.shape(weights)} "
+                f"for {len(sources)} edges"
+            )
+
+    @staticmethod
+    def _to_id_array(ids: list) -> np.ndarray:
+        try:
+            if all(type(i) is int for i in ids):
+                return np.array(ids, dtype=np.int64)
+        except OverflowError:
+            pass
+        if all(type(i) is str for i in ids):
+            return np.array(ids, dtype=str)
+        # Tuples and mixed types stay as Python objects
+        array = np.empty(len(ids), dtype=object)
+        array[:] = ids
+        return array
+
+    @staticmethod
+    def _as_common_kind(*arrays: np.ndarray) -> Iterable[np.ndarray]:
+        """Falls back to object arrays rather than letting NumPy cast ids between
+        integers and strings"""
+        arrays = [np.asarray(i) for i in arrays]
+        kinds = {i.dtype.kind for i in arrays}
+        if len(kinds) == 1 or kinds <= {"i", "u"}:
+            return arrays
+        object_arrays = []
+        for array in arrays:
+            object_array = np.empty(len(array), dtype=object)
+            object_array[:] = array.tolist()
+            object_arrays.append(object_array)
+        return object_arrays
+
+    @staticmethod
+    def _intern_arrays(
+        sources: np.ndarray, targets: np.ndarray, node_ids: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Interns sortable ids with one vectorised unique, giving the sorted node ids
+        and each endpoint's index into them, or -1 if it is not a node"""
+        known_ids = [] if node_ids is None else [np.unique(node_ids)]
+        unique_ids, inverse = np.unique(
+            np.concatenate(known_ids + [sources, targets]), return_inverse=True
+        )
+        inverse = inverse.reshape(-1)
+        if node_ids is None:
+            node_ids = unique_ids
+        else:
+            node_ids = known_ids[0]
+            positions = np.full(len(unique_ids), -1, dtype=np.int64)
+            positions[inverse[: len(node_ids)]] = np.arange(len(node_ids))
+            inverse = positions[inverse[len(node_ids) :]]
+        if node_ids.dtype.kind in "iu":
+            # CSR storage expects signed ids so lookups never mix signedness
+            node_ids = node_ids.astype(np.int64)
+        return node_ids, inverse[: len(sources)], inverse[len(sources) :]
+
+    @staticmethod
+    def _intern_objects(
+        sources: np.ndarray, targets: np.ndarray, node_ids: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """As _intern_arrays for ids NumPy cannot sort, keeping them in first seen order"""
+        if node_ids is None:
+            node_ids = np.concatenate([sources, targets])
+        node_indices = dict.fromkeys(node_ids.tolist())
+        for index, node_id in enumerate(node_indices):
+            node_indices[node_id] = index
+        unique_ids = np.empty(len(node_indices), dtype=object)
+        unique_ids[:] = list(node_indices)
+        endpoint_indices = [
+            np.fromiter(
+                (node_indices.get(i, -1) for i in ids.tolist()),
+                dtype=np.int64,
+                count=len(ids),
+            )
+            for ids in (sources, targets)
+        ]
+        return (unique_ids, *endpoint_indices)
+
+
+class StreamingGraphBuilder:
+    """Collects edges chunk by chunk as compact integer arrays, so a graph can be
+    built from a stream without holding its source or any per edge objects.
+
+    Integer ids are kept as they are and interned once at build, any other ids
+    are interned to integers as they arrive.
+    """
+
+    def __init__(self, is_directed: bool, integer_ids: bool = True):
+        self.is_directed = is_directed
+        self.integer_ids = integer_ids
+        self.edge_count = 0
+        self._node_indices: Dict[Hashable, int] = {}
+        self._node_chunks: List[np.ndarray] = []
+        self._source_chunks: List[np.ndarray] = []
+        self._target_chunks: List[np.ndarray] = []
+        self._weight_chunks: List[np.ndarray] = []
+
+    def add_nodes(self, node_ids: Sequence[Hashable]):
+        """Adds nodes that may have no links"""
+        self._node_chunks.append(self._to_array(node_ids))
+
+    def add_edges(
+        self,
+        sources: Sequence[Hashable],
+        targets: Sequence[Hashable],
+        weights: Optional[Sequence[float]] = None,
+    ):
+        """Adds edges, which must be weighted in every call or in none"""
+        if len(sources) != len(targets):
+            raise InvalidEdgesException(
+                f"Got {len(sources)} sources but {len(targets)} targets"
+            )
+        if (weights is not None) != (len(self._weight_chunks) > 0) and self.edge_count:
+            raise InvalidEdgesException(
+                "Either every edge or no edge must have a weight"
+            )
+        if weights is not None:
+            if len(weights) != len(sources):
+                raise InvalidEdgesException(
+                    f"Got {len(sources)} sources but {len(weights)} weights"
+                )
+            self._weight_chunks.append(np.asarray(weights, dtype=np.float64))
+        self._source_chunks.append(self._to_array(sources))
+        self._target_chunks.append(self._to_array(targets))
+        self.edge_count += len(sources)
+
+    def build(self) -> BaseGraph:
+        sources = self._concatenate(self._source_chunks)
+        targets = self._concatenate(self._target_chunks)
+        weights = np.concatenate(self._weight_chunks) if self._weight_chunks else None
+        if self.integer_ids:
+            node_ids = None
+            if self._node_chunks:
+                node_ids = self._concatenate(self._node_chunks + [sources, targets])
+            return GraphBuilder.from_numpy(
+                sources, targets, self.is_directed, node_ids, weights
+            )
+        # Ids are in interning order, so are kept as objects rather than sorted
+        node_ids = np.empty(len(self._node_indices), dtype=object)
+        node_ids[:] = list(self._node_indices)
+        adjacency = CSRAdjacency.from_arrays(
+            node_ids, sources, targets, self.is_directed, weights=weights
+        )
+        return BaseGraph.from_adjacency(adjacency)
+
+    def _to_array(self, ids: Sequence[Hashable]) -> np.ndarray:
+        if self.integer_ids:
+            return np.asarray(ids, dtype=np.int64)
+        node_indices = self._node_indices
+        return np.fromiter(
+            (node_indices.setdefault(i, len(node_indices)) for i in ids),
+            dtype=np.int64,
+            count=len(ids),
+        )
+
+    @staticmethod
+    def _concatenate(chunks: List[np.ndarray]) -> np.ndarray:
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
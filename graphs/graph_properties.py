@@ -1,42 +1,89 @@
-from typing import Set, List
+from collections import deque
+from typing import Set, List, Optional, Dict, Iterator, Tuple, FrozenSet
+from typing import Iterable, Union
+
+import numpy as np
 
 from graphs.data_structures.basic_structures import Node, Link
+from graphs.data_structures.csr import CSRAdjacency, as_csr
 from graphs.data_structures.graphs import BaseGraph
+from graphs.data_structures.paths import PathLink, PathReport, new_path_link
+from graphs.data_structures.union_find import DynamicComponents
+from graphs.degrees import DegreeDistribution
+from graphs.instrumentation import instrumented, record_size
+
+# Nodes for a batch query, or an array of their ids to skip building Node objects
+Nodes = Union[Iterable[Node], np.ndarray]
 
 
 class BaseGraphProperties:
     def __init__(self, graph: BaseGraph):
         self.graph = graph
-        self.links = self.graph.links
-        self.nodes = self.graph.nodes
         self.is_directed = self.graph.is_directed
+        self.adjacency = self.graph.adjacency
+
+    @property
+    def nodes(self) -> Set[Node]:
+        return self.graph.nodes
+
+    @property
+    def links(self) -> Set[Link]:
+        return self.graph.links
+
+
+class ArrayGraphProperties(BaseGraphProperties):
+    """Properties computed over the CSR arrays of the graph. Other storage is
+    converted on first use, and again only once the graph has changed"""
+
+    def __init__(self, graph: BaseGraph):
+        super().__init__(graph)
+        self._csr: Optional[CSRAdjacency] = None
+        self._versions: Optional[Tuple[int, int]] = None
+
+    @property
+    def csr(self) -> CSRAdjacency:
+        versions = (self.adjacency.node_version, self.adjacency.link_version)
+        if self._csr is None or versions != self._versions:
+            self._csr = as_csr(self.adjacency)
+            self._versions = versions
+        return self._csr
+
+    @property
+    def node_ids(self) -> np.ndarray:
+        """Ids of the graph nodes, in the order of array results"""
+        csr = self.csr
+        return csr.node_ids if csr.is_member is None else csr.node_ids[csr.is_member]
+
+    def _get_indices(self, nodes: Nodes) -> np.ndarray:
+        """Array indices of the nodes, or of an array of node ids, with -1 for any
+        that are not graph nodes"""
+        node_ids = nodes if isinstance(nodes, np.ndarray) else [i.id for i in nodes]
+        csr = self.csr
+        indices = csr.indices_of(node_ids)
+        if csr.is_member is not None:
+            indices[~csr.is_member[indices] & (indices >= 0)] = -1
+        return indices
 
 
 class NeighbouringGraphProperties(BaseGraphProperties):
-    def find_link(self, node_1: Node, node_2: Node):
-        forward_link = Link(node_1, node_2, self.is_directed)
-        if forward_link in self.links:
-            return forward_link
-        backwards_link = Link(node_2, node_1)
-        if backwards_link in self.links:
-            return backwards_link
+    @instrumented("find_link")
+    def find_link(self, node_1: Node, node_2: Node) -> Optional[Link]:
+        return self.adjacency.find_link(node_1, node_2)
 
     def is_in_graph(self, node: Node) -> bool:
-        return node in self.nodes
+        return node in self.adjacency
 
     def are_neighbours(self, node_1: Node, node_2: Node) -> bool:
         """Returns if there is a length one path between node_1 and node_2"""
         return self.find_link(node_1, node_2) is not None
 
+    @instrumented("get_neighbourhood")
     def get_neighbourhood(self, node: Node) -> Set[Node]:
-        matching_links = [
-            self.find_link(node, n)
-            for n in self.nodes
-            if self.find_link(node, n) is not None
-        ]
-        return (
-            {l.node_1 for l in matching_links} | {l.node_2 for l in matching_links}
-        ) - {node}
+        return self.adjacency.get_neighbourhood(node)
+
+    @instrumented("get_predecessors")
+    def get_predecessors(self, node: Node) -> Set[Node]:
+        return self.adjacency.get_predecessors(node)
 
 
 class DegreeProperties(BaseGraphProperties):
@@ -45,22 +92,308 @@ class DegreeProperties(BaseGraphProperties):
         self.neighbouring_graph_properties = NeighbouringGraphProperties(graph)
 
     def get_degree(self, node: Node) -> int:
-        return len(self.neighbouring_graph_properties.get_neighbourhood(node))
+        return self.adjacency.get_degree(node)
+
+    @property
+    def degree_distribution(self) -> DegreeDistribution:
+        return DegreeDistribution(as_csr(self.adjacency))
 
     @property
     def degree_sequence(self) -> List[int]:
-        return [self.get_degree(n) for n in self.nodes]
+        return self.degree_distribution.degrees.tolist()
 
     @property
     def maximum_degree(self) -> int:
-        return max(self.get_degree(n) for n in self.nodes)
+        return self.degree_distribution.maximum()
 
     @property
     def minimum_degree(self) -> int:
-        return min(self.get_degree(n) for n in self.nodes)
+        return self.degree_distribution.minimum()
 
     def is_k_regular(self, k: int) -> bool:
-        return set(self.degree_sequence) == {k}
+        return self.degree_distribution.is_k_regular(k)
+
+
+class PathProperties(BaseGraphProperties):
+    def __init__(self, graph: BaseGraph):
+        super().__init__(graph)
+        self.neighbouring_graph_properties = NeighbouringGraphProperties(graph)
+
+    def get_shortest_path(self, node_1: Node, node_2: Node) -> PathReport:
+        """Breadth first search for one shortest path, in O(V + E).
+        A node reaches itself by the empty path"""
+        parents = self._get_breadth_first_parents(node_1, node_2)
+        if node_2 not in parents:
+            return PathReport(node_1, node_2, [])
+        path = []
+        node = node_2
+        while node != node_1:
+            parent = parents[node]
+            link = self.neighbouring_graph_properties.find_link(parent, node)
+            path.append(new_path_link(parent, node, link))
+            node = parent
+        return PathReport(node_1, node_2, [tuple(reversed(path))])
+
+    def is_reachable(self, node_1: Node, node_2: Node) -> bool:
+        return node_2 in self._get_breadth_first_parents(node_1, node_2)
+
+    def iter_paths(
+        self, node_1: Node, node_2: Node, max_length: Optional[int] = None
+    ) -> Iterator[Tuple[PathLink, ...]]:
+        """Lazily yields the simple paths from node_1 to node_2 depth first, so only
+        the current path is held in memory. Paths longer than max_length are skipped"""
+        get_neighbourhood = self.neighbouring_graph_properties.get_neighbourhood
+        find_link = self.neighbouring_graph_properties.find_link
+        path: List[PathLink] = []
+        visited = {node_1}
+        stack = [iter(get_neighbourhood(node_1))]
+        while stack:
+            next_node = next(stack[-1], None)
+            if next_node is None:
+                stack.pop()
+                if path:
+                    visited.discard(path.pop().node_2)
+                continue
+            if next_node in visited:
+                continue
+            node = path[-1].node_2 if path else node_1
+            link = new_path_link(node, next_node, find_link(node, next_node))
+            if next_node == node_2:
+                yield tuple(path) + (link,)
+            elif max_length is None or len(path) + 1 < max_length:
+                path.append(link)
+                visited.add(next_node)
+                stack.append(iter(get_neighbourhood(next_node)))
+
+    def _get_breadth_first_parents(
+        self, source: Node, target: Optional[Node] = None
+    ) -> Dict[Node, Optional[Node]]:
+        """Maps each node reached from source to its parent in the search tree,
+        stopping early once target is reached"""
+        parents: Dict[Node, Optional[Node]] = {source: None}
+        queue = deque([source])
+        while queue and target not in parents:
+            node = queue.popleft()
+            for neighbour in self.neighbouring_graph_properties.get_neighbourhood(node):
+                if neighbour not in parents:
+                    parents[neighbour] = node
+                    queue.append(neighbour)
+        record_size("breadth_first_search.reached", len(parents))
+        return parents
+
+
+class ComponentProperties(BaseGraphProperties):
+    def __init__(self, graph: BaseGraph):
+        super().__init__(graph)
+        self.neighbouring_graph_properties = NeighbouringGraphProperties(graph)
+        self.path_properties = PathProperties(graph)
+        # Built on first use, then kept up to date as nodes and links change
+        # through the graph. Storage versions seen since show changes made any
+        # other way, such as to the parent of a view, which force a rebuild
+        self._components: Optional[DynamicComponents] = None
+        self._components_versions: Tuple[int, int] = (-1, -1)
+
+    def get_connected_component(self, node: Node) -> Set[Node]:
+        """Nodes reachable from node, following link direction if directed"""
+        return set(self.path_properties._get_breadth_first_parents(node))
+
+    @property
+    def connected_components(self) -> Set[FrozenSet[Node]]:
+        """Connected components, or weakly connected components if directed"""
+        return self._get_components().groups
+
+    def are_connected(self, node_1: Node, node_2: Node) -> bool:
+        """If both nodes are in the same (weakly) connected component"""
+        components = self._get_components()
+        return (
+            node_1 in components
+            and node_2 in components
+            and components.are_connected(node_1, node_2)
+        )
+
+    def on_node_added(self, node: Node):
+        if self._components is not None:
+            self._components.add(node)
+            # The node may already have been a link endpoint
+            for neighbour in self._get_weak_neighbourhood(node):
+                self._components.union(node, neighbour)
+        self._set_components_versions()
+
+    def on_link_added(self, link: Link):
+        node_1, node_2 = link.node_1, link.node_2
+        if (
+            self._components is not None
+            and node_1 in self._components
+            and node_2 in self._components
+        ):
+            self._components.union(node_1, node_2)
+        self._set_components_versions()
+
+    def on_link_removed(self, link: Link):
+        """Splits the component if the link was its only connection between the
+        two nodes, searching no further than the smaller side of the split"""
+        node_1, node_2 = link.node_1, link.node_2
+        self._set_components_versions()
+        if (
+            self._components is None
+            or node_1 == node_2
+            or node_1 not in self._components
+            or node_2 not in self._components
+            or node_2 in self._get_weak_neighbourhood(node_1)
+        ):
+            return
+        part = self._find_separated_part(node_1, node_2)
+        if part is not None:
+            self._components.split(part)
+
+    def on_node_removed(self, node: Node):
+        if self._components is not None:
+            self._components.remove(node)
+        self._set_components_versions()
+
+    def _get_components(self) -> DynamicComponents:
+        """Merges nodes with their neighbours in a disjoint set, in near O(V + E)"""
+        if self._components is None or self._components_versions != self._versions:
+            components = DynamicComponents(self.nodes)
+            for node in self.nodes:
+                for neighbour in self.neighbouring_graph_properties.get_neighbourhood(
+                    node
+                ):
+                    components.union(node, neighbour)
+            self._components = components
+            self._components_versions = self._versions
+        return self._components
+
+    @property
+    def _versions(self) -> Tuple[int, int]:
+        return self.adjacency.node_version, self.adjacency.link_version
+
+    def _set_components_versions(self):
+        """Marks the components as up to date after an update through the graph"""
+        if self._components is not None:
+            self._components_versions = self._versions
+
+    def _get_weak_neighbourhood(self, node: Node) -> Set[Node]:
+        neighbourhood = self.neighbouring_graph_properties.get_neighbourhood(node)
+        if self.is_directed:
+            neighbourhood |= self.neighbouring_graph_properties.get_predecessors(node)
+        return neighbourhood
+
+    def _find_separated_part(self, node_1: Node, node_2: Node) -> Optional[Set[Node]]:
+        """Searches outwards from both nodes a node at a time. Returns None if the
+        searches meet, else the nodes found by the search that ran out first"""
+        visited = [{node_1}, {node_2}]
+        queues = [deque([node_1]), deque([node_2])]
+        side = 0
+        while queues[side]:
+            node = queues[side].popleft()
+            for neighbour in self._get_weak_neighbourhood(node):
+                if neighbour in visited[1 - side]:
+                    return None
+                if neighbour not in visited[side]:
+                    visited[side].add(neighbour)
+                    queues[side].append(neighbour)
+            side = 1 - side
+        return visited[side]
+
+    @property
+    def strongly_connected_components(self) -> Set[FrozenSet[Node]]:
+        """Tarjan's algorithm with an explicit stack, in O(V + E). Undirected graphs
+        have the same strongly connected components as connected components"""
+        if not self.is_directed:
+            return self.connected_components
+        get_neighbourhood = self.neighbouring_graph_properties.get_neighbourhood
+        indices: Dict[Node, int] = {}
+        low_links: Dict[Node, int] = {}
+        stack: List[Node] = []
+        on_stack: Set[Node] = set()
+        components = set()
+        for root in self.nodes:
+            if root in indices:
+                continue
+            indices[root] = low_links[root] = len(indices)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(get_neighbourhood(root)))]
+            while work:
+                node, neighbours = work[-1]
+                next_node = next(neighbours, None)
+                if next_node is not None:
+                    if next_node not in indices:
+                        indices[next_node] = low_links[next_node] = len(indices)
+                        stack.append(next_node)
+                        on_stack.add(next_node)
+                        work.append((next_node, iter(get_neighbourhood(next_node))))
+                    elif next_node in on_stack:
+                        low_links[node] = min(low_links[node], indices[next_node])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low_links[parent] = min(low_links[parent], low_links[node])
+                if low_links[node] == indices[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    components.add(frozenset(component))
+        return components
+
+
+class CycleProperties(BaseGraphProperties):
+    def __init__(self, graph: BaseGraph):
+        super().__init__(graph)
+        self.neighbouring_graph_properties = NeighbouringGraphProperties(graph)
+
+    @property
+    def is_cyclic(self) -> bool:
+        return self.find_cycle() is not None
+
+    def find_cycle(self) -> Optional[Tuple[PathLink, ...]]:
+        """Returns a cycle as a closed path, or None if the graph is acyclic.
+
+        Uses an iterative depth first search, so is O(V + E) with no recursion
+        limit. A directed cycle is found as an edge back to a node still on the
+        stack. An undirected cycle is any edge to a visited node other than the
+        link just arrived by, so two distinct links between a pair are a cycle.
+        """
+        find_link = self.neighbouring_graph_properties.find_link
+        get_neighbourhood = self.neighbouring_graph_properties.get_neighbourhood
+        finished = set()
+        for root in self.nodes:
+            if root in finished:
+                continue
+            stack = [(root, None, iter(get_neighbourhood(root)))]
+            stack_positions = {root: 0}
+            while stack:
+                node, arrived_by, neighbours = stack[-1]
+                next_node = next(neighbours, None)
+                if next_node is None:
+                    stack.pop()
+                    del stack_positions[node]
+                    finished.add(node)
+                    continue
+                if next_node in finished:
+                    continue
+                link = find_link(node, next_node)
+                if next_node in stack_positions:
+                    if self.is_directed or link != arrived_by:
+                        cycle = [i[0] for i in stack[stack_positions[next_node] :]]
+                        return self._to_path(cycle + [next_node])
+                    continue
+                stack_positions[next_node] = len(stack)
+                stack.append((next_node, link, iter(get_neighbourhood(next_node))))
+        return None
+
+    def _to_path(self, nodes: List[Node]) -> Tuple[PathLink, ...]:
+        find_link = self.neighbouring_graph_properties.find_link
+        return tuple(
+            new_path_link(node_1, node_2, find_link(node_1, node_2))
+            for node_1, node_2 in zip(nodes, nodes[1:])
+        )
 
 
 class DirectedAcyclicGraphProperties(BaseGraphProperties):
@@ -70,14 +403,43 @@ class DirectedAcyclicGraphProperties(BaseGraphProperties):
 
     @property
     def dependency_chain(self) -> List[Node]:
-        chain = []
-        processed_nodes = set()
-        while processed_nodes != self.nodes:
-            for node in self.nodes - processed_nodes:
-                neighbourhood = self.neighbouring_graph_properties.get_neighbourhood(
+        return list(self.iter_dependency_chain())
+
+    def iter_dependency_chain(self) -> Iterator[Node]:
+        """Kahn's algorithm, yielding each node once everything it links to has been
+        yielded. O(V + E), and nodes on a cycle are never yielded"""
+        remaining = self._count_dependencies()
+        ready = deque(node for node, count in remaining.items() if count == 0)
+        while ready:
+            node = ready.popleft()
+            yield node
+            for dependent in self.neighbouring_graph_properties.get_predecessors(node):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+    @property
+    def dependency_levels(self) -> List[List[Node]]:
+        """Groups the dependency chain into waves, where each node only depends on
+        nodes in earlier waves so a wave can be processed in parallel"""
+        remaining = self._count_dependencies()
+        level = [node for node, count in remaining.items() if count == 0]
+        levels = []
+        while level:
+            levels.append(level)
+            next_level = []
+            for node in level:
+                for dependent in self.neighbouring_graph_properties.get_predecessors(
                     node
-                )
-                if not neighbourhood - processed_nodes:
-                    chain.append(node)
-                    processed_nodes.add(node)
-        return chain
+                ):
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        next_level.append(dependent)
+            level = next_level
+        return levels
+
+    def _count_dependencies(self) -> Dict[Node, int]:
+        return {
+            node: len(self.neighbouring_graph_properties.get_neighbourhood(node))
+            for node in self.nodes
+        }
@@ -1,52 +1,198 @@
-import operator
-from functools import reduce
-from typing import Dict, Iterable, Hashable
-from typing import List, Set, Tuple, Optional, FrozenSet
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Hashable, Type
+from typing import List, Set, Tuple, Optional, FrozenSet, Iterator
 
-import matplotlib.pyplot as plt
-from more_itertools import flatten
+import numpy as np
 
-from graphs.data_structures.basic_structures import Node, Link
+from graphs import binary_format
+from graphs.data_structures.adjacency import BaseAdjacency, AdjacencyIndex
+from graphs.data_structures.basic_structures import Node, Link, LeanNode, LeanLink
+from graphs.data_structures.bitset import BitsetAdjacency
+from graphs.data_structures.csr import CSRAdjacency
 from graphs.data_structures.graphs import BaseGraph
-from graphs.data_structures.paths import PathLink, PathReport
+from graphs.data_structures.views import SubgraphView, LinkFilterView, ReversedView
+from graphs.data_structures.paths import PathLink, PathReport, LeanPathLink
+from graphs.cache import GraphCache, cached, NODES, LINKS
+from graphs.batch_queries import BatchQueryProperties
+from graphs.centrality import CentralityProperties
+from graphs.dense import DenseProperties
+from graphs.eulerian import EulerianProperties
+from graphs.path_enumeration import PathEnumerationProperties
+from graphs.reachability import ReachabilityIndex
+from graphs.shortest_paths import WeightedPathProperties, Heuristic
+from graphs.degrees import DegreeDistribution, OUT, IN, TOTAL
 from graphs.graph_builder import GraphBuilder
+from graphs.instrumentation import instrumented, record_size
 from graphs.graph_properties import (
     NeighbouringGraphProperties,
     DegreeProperties,
     DirectedAcyclicGraphProperties,
+    PathProperties,
+    CycleProperties,
+    ComponentProperties,
+    Nodes,
 )
-from graphs.plots import GraphPlotter
+from graphs.layouts import CIRCULAR
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from graphs.plots import GraphPlotter
 
 
 class Graph(BaseGraph):
     @classmethod
     def from_base_graph(cls, graph: BaseGraph):
-        return cls(graph.nodes, graph.links)
+        return cls.from_adjacency(graph.adjacency)
 
     @classmethod
     def from_graph_dictionary(
-        cls, graph_dictionary: Dict[Hashable, Iterable[Hashable]], is_directed: bool
+        cls,
+        graph_dictionary: Dict[Hashable, Iterable[Hashable]],
+        is_directed: bool,
+        adjacency_class: Optional[Type[BaseAdjacency]] = None,
+    ):
+        base_graph = GraphBuilder.from_graph_dictionary(
+            graph_dictionary, is_directed, adjacency_class
+        )
+        return cls.from_base_graph(base_graph)
+
+    @classmethod
+    def from_edge_list(
+        cls,
+        edges: Iterable[Tuple],
+        is_directed: bool,
+        node_ids: Optional[Iterable[Hashable]] = None,
+    ):
+        base_graph = GraphBuilder.from_edge_list(edges, is_directed, node_ids)
+        return cls.from_base_graph(base_graph)
+
+    @classmethod
+    def from_numpy(
+        cls,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        is_directed: bool,
+        node_ids: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
     ):
-        base_graph = GraphBuilder.from_graph_dictionary(graph_dictionary, is_directed)
+        base_graph = GraphBuilder.from_numpy(
+            sources, targets, is_directed, node_ids, weights
+        )
         return cls.from_base_graph(base_graph)
 
-    def __init__(self, nodes: List[Node], links: List[Link]):
-        super().__init__(nodes, links)
+    @classmethod
+    def from_coo(
+        cls,
+        row: np.ndarray,
+        col: np.ndarray,
+        is_directed: bool,
+        shape: Optional[Tuple[int, int]] = None,
+        data: Optional[np.ndarray] = None,
+    ):
+        base_graph = GraphBuilder.from_coo(row, col, is_directed, shape, data)
+        return cls.from_base_graph(base_graph)
+
+    def _set_adjacency(self, adjacency: BaseAdjacency):
+        super()._set_adjacency(adjacency)
         self.neighbouring_graph_properties = NeighbouringGraphProperties(self)
-        self.plotter = GraphPlotter(self)
+        # Built on first use, so only graphs that are plotted import matplotlib
+        self._plotter: Optional["GraphPlotter"] = None
         self.degree_properties = DegreeProperties(self)
         self.dag_properties = DirectedAcyclicGraphProperties(self)
+        self.path_properties = PathProperties(self)
+        self.cycle_properties = CycleProperties(self)
+        self.component_properties = ComponentProperties(self)
+        self.eulerian_properties = EulerianProperties(self)
+        self.weighted_path_properties = WeightedPathProperties(self)
+        self.path_enumeration_properties = PathEnumerationProperties(self)
+        self.batch_query_properties = BatchQueryProperties(self)
+        self.centrality_properties = CentralityProperties(self)
+        self.dense_properties = DenseProperties(self)
+        self.cache = GraphCache(adjacency)
+
+    def subgraph_view(self, nodes: Iterable[Node]) -> "Graph":
+        """Read only graph of the given nodes and the links between them, sharing
+        this graph's storage. Takes O(len(nodes)) to create"""
+        return self.from_adjacency(SubgraphView(self.adjacency, nodes))
+
+    def link_filter_view(self, predicate: Callable[[Link], bool]) -> "Graph":
+        """Read only graph of every node and the links passing predicate, sharing
+        this graph's storage"""
+        return self.from_adjacency(LinkFilterView(self.adjacency, predicate))
+
+    def reversed_view(self) -> "Graph":
+        """Read only graph with every link of this directed graph turned round,
+        sharing its storage"""
+        return self.from_adjacency(ReversedView(self.adjacency))
+
+    @property
+    def plotter(self) -> "GraphPlotter":
+        if self._plotter is None:
+            from graphs.plots import GraphPlotter
+
+            self._plotter = GraphPlotter(self)
+        return self._plotter
+
+    def clear_cache(self):
+        self.cache.clear()
+
+    def save(self, path: str):
+        """Saves to the memory mappable binary format, see graphs.binary_format"""
+        binary_format.save(self.adjacency, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        return cls.from_adjacency(binary_format.load(path, mmap))
+
+    def add_node(self, node: Node):
+        is_new = node not in self.adjacency
+        super().add_node(node)
+        if is_new:
+            self.component_properties.on_node_added(node)
+
+    def add_link(self, link: Link):
+        # Checked before any node is added, so a rejected link changes nothing
+        self.adjacency.check_link(link)
+        for node in link.nodes:
+            self.add_node(node)
+        super().add_link(link)
+        self.component_properties.on_link_added(link)
+
+    def remove_link(self, link: Link):
+        super().remove_link(link)
+        self.component_properties.on_link_removed(link)
 
-    def plot_graph(self) -> plt.Figure:
-        return self.plotter.plot_graph()
+    def remove_node(self, node: Node):
+        if node in self.adjacency:
+            for link in self.adjacency.get_incident_links(node):
+                self.remove_link(link)
+        super().remove_node(node)
+        self.component_properties.on_node_removed(node)
+
+    def plot_graph(
+        self,
+        layout: str = CIRCULAR,
+        max_links: Optional[int] = None,
+        rasterized: Optional[bool] = None,
+        max_iterations: Optional[int] = None,
+        seed: int = 0,
+    ) -> "Figure":
+        return self.plotter.plot_graph(
+            layout, max_links, rasterized, max_iterations, seed
+        )
+
+    def get_layout(
+        self, layout: str, max_iterations: Optional[int] = None, seed: int = 0
+    ) -> np.ndarray:
+        return self.plotter.get_layout(layout, max_iterations, seed)
 
     @property
     def order(self) -> int:
-        return len(self.nodes)
+        return self.adjacency.order
 
     @property
     def size(self) -> int:
-        return len(self.links)
+        return self.adjacency.size
 
     def find_link(self, node_1, node_2) -> Optional[Link]:
         return self.neighbouring_graph_properties.find_link(node_1, node_2)
@@ -64,88 +210,160 @@ class Graph(BaseGraph):
         return self.degree_properties.get_degree(node)
 
     @property
+    @cached(NODES, LINKS)
+    def degree_distribution(self) -> DegreeDistribution:
+        return self.degree_properties.degree_distribution
+
+    @property
+    @instrumented("degree_sequence")
+    @cached(NODES, LINKS, copy=list)
     def degree_sequence(self) -> List[int]:
-        return self.degree_properties.degree_sequence
+        return self.degree_distribution.degrees.tolist()
 
     @property
     def maximum_degree(self) -> int:
-        return self.degree_properties.maximum_degree
+        return self.degree_distribution.maximum()
 
     @property
     def minimum_degree(self) -> int:
-        return self.degree_properties.minimum_degree
+        return self.degree_distribution.minimum()
 
     def is_k_regular(self, k: int) -> bool:
-        return self.degree_properties.is_k_regular(k)
+        return self.degree_distribution.is_k_regular(k)
 
+    @instrumented("get_paths")
     def get_paths(self, node_1: Node, node_2: Node) -> PathReport:
+        """Every simple path from node_1 to a different node_2, shortest first"""
+        paths = list(self.path_enumeration_properties.iter_paths(node_1, node_2))
+        record_size("get_paths.paths", len(paths))
+        return PathReport(node_1, node_2, paths)
+
+    @instrumented("get_shortest_path")
+    def get_shortest_path(self, node_1: Node, node_2: Node) -> PathReport:
+        """A path with the fewest links, or the least total weight if the graph is
+        weighted, so its distance agrees with get_paths and get_distances"""
+        if self.weighted_path_properties.csr.is_weighted:
+            return self.get_dijkstra_path(node_1, node_2)
+        return self.path_properties.get_shortest_path(node_1, node_2)
+
+    @instrumented("is_reachable")
+    def is_reachable(self, node_1: Node, node_2: Node) -> bool:
+        return self.path_properties.is_reachable(node_1, node_2)
+
+    @property
+    @cached(NODES, LINKS)
+    def reachability_index(self) -> ReachabilityIndex:
+        """Index answering is_reachable without a search, rebuilt on first use
+        after the graph changes"""
+        return ReachabilityIndex(self)
 
-        paths: List[Tuple[PathLink, ...]] = []
-        for node in self.get_neighbourhood(node_1):
-            link = self.find_link(node_1, node)
-            if link is not None:
-                paths.append((PathLink(node_1, node, link),))
-        # We traverse breadth first to expand to all possible (acyclic) paths visiting unique points
-        # Note if we have Link(1,2) and Link(2,1), we would still only get the path 1,2.
-        # This is more about connectivity then full path enumeration
-        while True:
-            next_paths = paths
-            for *initial, last_link in paths:
-                last_node = last_link.node_2
-                next_steps = self.get_neighbourhood(last_node) - set(
-                    flatten(i.nodes for i in initial)
-                )
-                for step in next_steps:
-                    link = self.find_link(last_node, step)
-                    if (
-                        link is not None
-                        and link not in {i.underlying_link for i in initial}
-                        and link != last_link.underlying_link
-                    ):
-                        next_paths.append(
-                            tuple(
-                                [*initial, last_link, PathLink(last_node, step, link)]
-                            )
-                        )
-            if len(next_paths) == len(paths):
-                paths = next_paths
-                break
-            paths = next_paths
-        paths_between = [i for i in paths if i[-1].node_2 == node_2]
-        return PathReport(node_1, node_2, paths_between)
+    @instrumented("get_dijkstra_path")
+    def get_dijkstra_path(self, node_1: Node, node_2: Node) -> PathReport:
+        return self.weighted_path_properties.get_dijkstra_path(node_1, node_2)
 
+    @instrumented("get_bidirectional_dijkstra_path")
+    def get_bidirectional_dijkstra_path(self, node_1: Node, node_2: Node) -> PathReport:
+        return self.weighted_path_properties.get_bidirectional_dijkstra_path(
+            node_1, node_2
+        )
+
+    @instrumented("get_a_star_path")
+    def get_a_star_path(
+        self, node_1: Node, node_2: Node, heuristic: Heuristic
+    ) -> PathReport:
+        return self.weighted_path_properties.get_a_star_path(node_1, node_2, heuristic)
+
+    @instrumented("get_all_distances")
+    def get_all_distances(self, node: Node) -> np.ndarray:
+        return self.weighted_path_properties.get_all_distances(node)
+
+    @property
+    def node_ids(self) -> np.ndarray:
+        return self.weighted_path_properties.node_ids
+
+    def batch_are_neighbours(self, nodes_1: Nodes, nodes_2: Nodes) -> np.ndarray:
+        return self.batch_query_properties.are_neighbours(nodes_1, nodes_2)
+
+    def batch_get_neighbourhoods(self, nodes: Nodes) -> List[Set[Node]]:
+        return self.batch_query_properties.get_neighbourhoods(nodes)
+
+    def batch_get_neighbour_ids(self, nodes: Nodes) -> Tuple[np.ndarray, np.ndarray]:
+        return self.batch_query_properties.get_neighbour_ids(nodes)
+
+    def batch_get_degrees(self, nodes: Nodes) -> np.ndarray:
+        return self.batch_query_properties.get_degrees(nodes)
+
+    @instrumented("batch_is_reachable")
+    def batch_is_reachable(self, nodes_1: Nodes, nodes_2: Nodes) -> np.ndarray:
+        return self.batch_query_properties.are_reachable(nodes_1, nodes_2)
+
+    @instrumented("get_distances")
+    def get_distances(
+        self, sources: Nodes, targets: Optional[Nodes] = None, workers: int = 1
+    ) -> np.ndarray:
+        return self.batch_query_properties.get_distances(sources, targets, workers)
+
+    def get_eccentricities(self, workers: int = 1) -> np.ndarray:
+        return self.centrality_properties.get_eccentricities(workers)
+
+    def get_betweenness(self, workers: int = 1) -> np.ndarray:
+        return self.centrality_properties.get_betweenness(workers)
+
+    def get_common_neighbours(self, node_1: Node, node_2: Node) -> Set[Node]:
+        return self.dense_properties.get_common_neighbours(node_1, node_2)
+
+    def count_common_neighbours(self, node_1: Node, node_2: Node) -> int:
+        return self.dense_properties.count_common_neighbours(node_1, node_2)
+
+    @instrumented("count_triangles")
+    @cached(NODES, LINKS)
+    def count_triangles(self) -> int:
+        return self.dense_properties.count_triangles()
+
+    def is_clique(self, nodes: Iterable[Node]) -> bool:
+        return self.dense_properties.is_clique(nodes)
+
+    def iter_paths(
+        self,
+        node_1: Node,
+        node_2: Node,
+        max_length: Optional[int] = None,
+        max_paths: Optional[int] = None,
+        shortest_first: bool = False,
+        max_memory: Optional[int] = None,
+    ) -> Iterator[Tuple[PathLink, ...]]:
+        """Lazily yields up to max_paths simple paths from node_1 to node_2, none
+        longer than max_length links. Depth first, holding only the current path,
+        unless shortest_first, when paths come in order of length and the partial
+        paths may take up to max_memory bytes"""
+        if shortest_first:
+            return self.path_enumeration_properties.iter_paths(
+                node_1, node_2, max_length, max_paths, max_memory
+            )
+        if max_memory is not None:
+            raise ValueError("max_memory only limits shortest_first paths")
+        paths = self.path_properties.iter_paths(node_1, node_2, max_length)
+        return islice(paths, max_paths)
+
+    @instrumented("get_connected_component")
     def get_connected_component(self, node: Node) -> Set[Node]:
-        neighbourhood = self.get_neighbourhood(node) | {node}
-        processed_nodes = {node}
-        while neighbourhood != set(processed_nodes):
-            next_node = next(i for i in neighbourhood - processed_nodes)
-            neighbourhood |= self.get_neighbourhood(next_node)
-            processed_nodes |= {next_node}
-        return neighbourhood
+        return self.component_properties.get_connected_component(node)
 
     @property
+    @instrumented("connected_components")
+    @cached(NODES, LINKS, copy=set)
     def connected_components(self) -> Set[FrozenSet[Node]]:
-        processed_nodes = set()
-        components = set()
-        while processed_nodes != self.nodes:
-            next_node = next(i for i in self.nodes - processed_nodes)
-            component = self.get_connected_component(next_node)
-            components.add(frozenset(component))
-            processed_nodes |= component
-        if not self.is_directed:
-            return components
-
-        clean_components = set()
-        while True:
-            previous_length = len(clean_components)
-            for node in self.nodes:
-                nodes_components = reduce(
-                    operator.or_, [i for i in components if node in i], frozenset()
-                )
-                clean_components.add(nodes_components)
-            if len(clean_components) != previous_length:
-                break
-        return clean_components
+        return self.component_properties.connected_components
+
+    @property
+    @instrumented("strongly_connected_components")
+    @cached(NODES, LINKS, copy=set)
+    def strongly_connected_components(self) -> Set[FrozenSet[Node]]:
+        return self.component_properties.strongly_connected_components
+
+    @instrumented("are_connected")
+    def are_connected(self, node_1: Node, node_2: Node) -> bool:
+        return self.component_properties.are_connected(node_1, node_2)
 
     @property
     def is_connected(self):
@@ -153,27 +371,55 @@ class Graph(BaseGraph):
 
     @property
     def is_cyclic(self):
-        for starting_node in self.nodes:
-            for next_node in self.nodes - {starting_node}:
-                connections = self.get_paths(starting_node, next_node)
-                for path in connections.paths:
-                    last_link = path[-1]
-                    underlying_links = {i.underlying_link for i in path}
-                    next_link = self.find_link(last_link.node_2, starting_node)
-                    if next_link is not None and next_link not in underlying_links:
-                        return True
-        return False
+        return self.find_cycle() is not None
+
+    @instrumented("find_cycle")
+    @cached(LINKS)
+    def find_cycle(self) -> Optional[Tuple[PathLink, ...]]:
+        return self.cycle_properties.find_cycle()
 
     @property
     def is_dag(self):
         return self.is_directed and not self.is_cyclic
 
     @property
-    def is_eulerian(self):
-        return all(self.get_degree(node) % 2 == 0 for node in self.nodes)
+    @cached(NODES, LINKS)
+    def is_eulerian(self) -> bool:
+        return self.eulerian_properties.is_eulerian
+
+    @property
+    @cached(NODES, LINKS)
+    def has_eulerian_path(self) -> bool:
+        return self.eulerian_properties.has_eulerian_path
+
+    @cached(NODES, LINKS)
+    def find_eulerian_circuit(self) -> Optional[Tuple[PathLink, ...]]:
+        return self.eulerian_properties.find_eulerian_circuit()
+
+    @cached(NODES, LINKS)
+    def find_eulerian_path(self) -> Optional[Tuple[PathLink, ...]]:
+        return self.eulerian_properties.find_eulerian_path()
+
+    def find_eulerian_node_ids(self, circuit: bool = False) -> Optional[np.ndarray]:
+        return self.eulerian_properties.find_eulerian_node_ids(circuit)
 
     @property
+    @instrumented("dependency_chain")
+    @cached(NODES, LINKS, copy=list)
     def dependency_chain(self):
         if self.is_dag:
             return self.dag_properties.dependency_chain
         return []
+
+    def iter_dependency_chain(self) -> Iterator[Node]:
+        if self.is_dag:
+            return self.dag_properties.iter_dependency_chain()
+        return iter([])
+
+    @property
+    @instrumented("dependency_levels")
+    @cached(NODES, LINKS, copy=lambda levels: [list(i) for i in levels])
+    def dependency_levels(self) -> List[List[Node]]:
+        if self.is_dag:
+            return self.dag_properties.dependency_levels
+        return []
@@ -0,0 +1,188 @@
+"""Opt-in counters, timings and sizes for graph operations.
+
+Graph queries and the internal steps they are built from, such as find_link
+and get_neighbourhood, are wrapped in spans, and searches record the sizes of
+their frontiers and results. Nothing is recorded unless an instrument context
+is open, and while none is, each wrapped call only checks one global.
+
+    with instrument(callback=export) as stats:
+        graph.get_paths(n1, n2)
+    stats.as_dict()
+
+The callback is given the name and Stats of each top level operation as it
+finishes, with the steps it ran inside it, so can export per query stats.
+Contexts are per thread, and work done in worker processes is not recorded.
+"""
+
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Number of instrument contexts open in any thread, checked before anything else
+_open_contexts = 0
+_lock = threading.Lock()
+_local = threading.local()
+
+# Given the name and Stats of each top level operation once it finishes
+Callback = Callable[[str, "Stats"], None]
+
+
+class SizeSummary:
+    """Count, total and largest of the sizes recorded under one name"""
+
+    __slots__ = ("count", "total", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.maximum = 0
+
+    def add(self, size: int):
+        self.count += 1
+        self.total += size
+        if size > self.maximum:
+            self.maximum = size
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Stats:
+    """Calls and seconds spent per span name, seconds including any spans run
+    inside, and summaries of the sizes recorded per name"""
+
+    def __init__(self):
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.sizes: Dict[str, SizeSummary] = defaultdict(SizeSummary)
+
+    def as_dict(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Plain nested dictionaries, ready to serialise"""
+        return {
+            "calls": dict(self.calls),
+            "seconds": dict(self.seconds),
+            "sizes": {
+                name: {
+                    "count": size.count,
+                    "total": size.total,
+                    "max": size.maximum,
+                    "mean": size.mean,
+                }
+                for name, size in self.sizes.items()
+            },
+        }
+
+
+class _Recorder:
+    """Instrumentation state of one thread"""
+
+    def __init__(self):
+        self.stats: List[Stats] = []
+        self.callbacks: List[Callback] = []
+        # Stats of the top level operation running, if any, and span depth
+        self.query: Optional[Stats] = None
+        self.depth = 0
+
+    def targets(self) -> List[Stats]:
+        return self.stats if self.query is None else self.stats + [self.query]
+
+
+def _get_recorder() -> Optional[_Recorder]:
+    recorder = getattr(_local, "recorder", None)
+    return recorder if recorder is not None and recorder.stats else None
+
+
+def is_enabled() -> bool:
+    return _open_contexts > 0 and _get_recorder() is not None
+
+
+@contextmanager
+def instrument(callback: Optional[Callback] = None) -> Iterator[Stats]:
+    """Records everything run in this thread inside the context into the Stats
+    it yields. Contexts can be nested, each seeing everything inside it"""
+    global _open_contexts
+    recorder = getattr(_local, "recorder", None)
+    if recorder is None:
+        recorder = _local.recorder = _Recorder()
+    stats = Stats()
+    recorder.stats.append(stats)
+    if callback is not None:
+        recorder.callbacks.append(callback)
+    with _lock:
+        _open_contexts += 1
+    try:
+        yield stats
+    finally:
+        with _lock:
+            _open_contexts -= 1
+        recorder.stats.remove(stats)
+        if callback is not None:
+            recorder.callbacks.remove(callback)
+
+
+def count(name: str, calls: int = 1):
+    """Adds to the calls of name without timing anything"""
+    if not _open_contexts:
+        return
+    recorder = _get_recorder()
+    if recorder is not None:
+        for stats in recorder.targets():
+            stats.calls[name] += calls
+
+
+def record_size(name: str, size: int):
+    """Records a size, such as of a search frontier or a set of paths"""
+    if not _open_contexts:
+        return
+    recorder = _get_recorder()
+    if recorder is not None:
+        for stats in recorder.targets():
+            stats.sizes[name].add(size)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Counts and times the code inside. The outermost span in a thread is a
+    top level operation, passed to the callbacks once it finishes"""
+    recorder = _get_recorder() if _open_contexts else None
+    if recorder is None:
+        yield
+        return
+    is_query = recorder.depth == 0
+    if is_query:
+        recorder.query = Stats()
+    recorder.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        recorder.depth -= 1
+        for stats in recorder.targets():
+            stats.calls[name] += 1
+            stats.seconds[name] += elapsed
+        if is_query:
+            query, recorder.query = recorder.query, None
+            for callback in list(recorder.callbacks):
+                callback(name, query)
+
+
+def instrumented(name: str):
+    """Wraps a function in a span of the given name while instrumentation is on,
+    and otherwise calls it directly"""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _open_contexts:
+                return function(*args, **kwargs)
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
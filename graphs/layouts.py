@@ -0,0 +1,173 @@
+"""Node positions for plotting, computed with array operations from integer
+link arrays. Links are taken as undirected, and every layout returns an (n, 2)
+array of positions centred on the origin and scaled to fit in [-1, 1]."""
+
+from typing import Optional
+
+import numpy as np
+
+CIRCULAR = "circular"
+SPECTRAL = "spectral"
+FORCE_DIRECTED = "force_directed"
+LAYOUTS = (CIRCULAR, SPECTRAL, FORCE_DIRECTED)
+# Largest graph whose spectral layout is found by a dense eigendecomposition
+MAX_DENSE_SPECTRAL_NODES = 1000
+# Largest graph whose force directed layout repels every pair of nodes, above
+# which nodes are repelled by the centres of the cells of a grid instead
+MAX_EXACT_REPULSION_NODES = 1000
+# Most node to node, or node to cell, distances held at once
+MAX_PAIRS = 1 << 22
+
+
+def get_layout(
+    method: str,
+    n: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    max_iterations: Optional[int] = None,
+    seed: int = 0,
+) -> np.ndarray:
+    """Positions of n nodes linked from sources to targets, by the named method.
+    max_iterations caps the work of the iterative methods"""
+    if method == CIRCULAR:
+        return circular_layout(n)
+    if method == SPECTRAL:
+        return spectral_layout(n, sources, targets, max_iterations or 300, seed)
+    if method == FORCE_DIRECTED:
+        return force_directed_layout(n, sources, targets, max_iterations or 50, seed)
+    raise ValueError(f"Unknown layout {method}, expected one of {LAYOUTS}")
+
+
+def circular_layout(n: int) -> np.ndarray:
+    """Nodes evenly spaced around the unit circle"""
+    angles = 2 * np.pi * np.arange(n) / max(n, 1)
+    return np.column_stack([np.cos(angles), np.sin(angles)])
+
+
+def spectral_layout(
+    n: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    max_iterations: int = 300,
+    seed: int = 0,
+) -> np.ndarray:
+    """Nodes placed by the eigenvectors of the two smallest non zero eigenvalues
+    of the graph Laplacian, which puts linked nodes close together. Small graphs
+    are decomposed exactly, larger ones by at most max_iterations of subspace
+    iteration"""
+    if n < 3:
+        return circular_layout(n)
+    sources, targets = _get_undirected_links(n, sources, targets)
+    degrees = np.bincount(sources, minlength=n).astype(np.float64)
+    if n <= MAX_DENSE_SPECTRAL_NODES:
+        laplacian = np.diag(degrees)
+        laplacian[sources, targets] -= 1
+        _, vectors = np.linalg.eigh(laplacian)
+        return _normalise(vectors[:, 1:3])
+    # The largest eigenvalues of shift - L are the smallest of L
+    shift = 2 * degrees.max() + 1
+    constant = np.full(n, 1 / np.sqrt(n))
+    vectors = np.random.default_rng(seed).standard_normal((n, 2))
+    for _ in range(max_iterations):
+        products = shift * vectors - degrees[:, np.newaxis] * vectors
+        for column in range(2):
+            products[:, column] += np.bincount(
+                sources, weights=vectors[targets, column], minlength=n
+            )
+        # The constant vector always has eigenvalue 0, so is projected out
+        products -= np.outer(constant, constant @ products)
+        vectors, _ = np.linalg.qr(products)
+    return _normalise(vectors)
+
+
+def force_directed_layout(
+    n: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    max_iterations: int = 50,
+    seed: int = 0,
+) -> np.ndarray:
+    """Fruchterman-Reingold layout, in which every pair of nodes repels and
+    linked nodes attract, with each node moving at most a cooling temperature
+    per iteration"""
+    if n < 2:
+        return np.zeros((n, 2))
+    sources, targets = _get_undirected_links(n, sources, targets)
+    positions = np.random.default_rng(seed).uniform(-1, 1, (n, 2))
+    # Ideal distance between nodes, spreading them over an area of 4
+    k = 2 / np.sqrt(n)
+    for iteration in range(max_iterations):
+        temperature = 0.2 * (1 - iteration / max_iterations)
+        if n <= MAX_EXACT_REPULSION_NODES:
+            moves = _get_repulsion(positions, positions, np.ones(n), k)
+        else:
+            moves = _get_grid_repulsion(positions, k)
+        deltas = positions[sources] - positions[targets]
+        distances = np.maximum(np.linalg.norm(deltas, axis=1), 1e-9)
+        # Each link appears both ways round, so pulls each of its ends
+        pulls = deltas * (distances / k)[:, np.newaxis]
+        for column in range(2):
+            moves[:, column] -= np.bincount(
+                sources, weights=pulls[:, column], minlength=n
+            )
+        lengths = np.maximum(np.linalg.norm(moves, axis=1), 1e-9)
+        positions += moves * (np.minimum(lengths, temperature) / lengths)[:, None]
+    return _normalise(positions)
+
+
+def _get_repulsion(
+    positions: np.ndarray, centres: np.ndarray, masses: np.ndarray, k: float
+) -> np.ndarray:
+    """Sum of the k^2 / d pushes on each position from every centre, weighted by
+    its mass, taken in chunks of positions to bound memory"""
+    moves = np.zeros_like(positions)
+    chunk_size = max(1, MAX_PAIRS // max(len(centres), 1))
+    for start in range(0, len(positions), chunk_size):
+        chunk = positions[start : start + chunk_size]
+        x_deltas = chunk[:, :1] - centres[:, 0]
+        y_deltas = chunk[:, 1:] - centres[:, 1]
+        squared = x_deltas * x_deltas + y_deltas * y_deltas
+        # A node at the same place as a centre, such as itself, is not pushed
+        squared[squared == 0] = np.inf
+        np.maximum(squared, (0.01 * k) ** 2, out=squared)
+        pushes = masses * k**2 / squared
+        moves[start : start + chunk_size, 0] = (x_deltas * pushes).sum(axis=1)
+        moves[start : start + chunk_size, 1] = (y_deltas * pushes).sum(axis=1)
+    return moves
+
+
+def _get_grid_repulsion(positions: np.ndarray, k: float) -> np.ndarray:
+    """_get_repulsion from the centres of mass of the nodes in each cell of a
+    grid, which is close for nodes a few cells apart"""
+    cells_per_side = int(min(16, np.sqrt(len(positions) / 4) + 1))
+    lows = positions.min(axis=0)
+    spans = np.maximum(positions.max(axis=0) - lows, 1e-9)
+    cells = np.minimum(
+        ((positions - lows) / spans * cells_per_side).astype(np.int64),
+        cells_per_side - 1,
+    )
+    labels = cells[:, 0] * cells_per_side + cells[:, 1]
+    _, inverse, masses = np.unique(labels, return_inverse=True, return_counts=True)
+    centres = (
+        np.column_stack(
+            [np.bincount(inverse, weights=positions[:, i]) for i in range(2)]
+        )
+        / masses[:, np.newaxis]
+    )
+    return _get_repulsion(positions, centres, masses.astype(np.float64), k)
+
+
+def _get_undirected_links(n: int, sources: np.ndarray, targets: np.ndarray):
+    """Distinct links without self loops, each given both ways round"""
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+    keys = np.unique(np.concatenate([sources * n + targets, targets * n + sources]))
+    return keys // n, keys % n
+
+
+def _normalise(positions: np.ndarray) -> np.ndarray:
+    positions = positions - positions.mean(axis=0)
+    scale = np.abs(positions).max()
+    return positions / scale if scale > 0 else positions
@@ -0,0 +1,119 @@
+"""Runs analyses over chunks of source nodes in a pool of worker processes. The
+arrays a task reads and writes are copied once into shared memory blocks, which
+every worker maps when it starts, so no task pickles the graph or its results.
+
+Chunks are fixed by the caller rather than by the number of workers and each
+writes its own part of the outputs, so results are the same however many
+workers run them and in whatever order they finish.
+
+Shared memory needs Python 3.8, so on earlier versions every chunk runs in this
+process, with the same results."""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+# Reads the arrays and writes its part of the outputs for the chunk at index,
+# covering the items from start up to end
+Task = Callable[[Dict[str, np.ndarray], int, int, int], None]
+# Name of the shared memory block, shape and dtype of a shared array
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_blocks: List["SharedMemory"] = []
+# multiprocessing.shared_memory was added in Python 3.8
+HAS_SHARED_MEMORY = sys.version_info >= (3, 8)
+
+
+def get_chunks(count: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """(start, end) of consecutive chunks of at most chunk_size items"""
+    return [(i, min(i + chunk_size, count)) for i in range(0, count, chunk_size)]
+
+
+def get_workers(workers: Optional[int]) -> int:
+    """The number of workers to run, every core this process may use if None"""
+    if workers is None:
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+    return max(workers, 1)
+
+
+def run_chunks(
+    task: Task,
+    arrays: Dict[str, np.ndarray],
+    outputs: Dict[str, np.ndarray],
+    chunks: List[Tuple[int, int]],
+    workers: Optional[int] = 1,
+):
+    """Runs task on every chunk, given the arrays and outputs together, and
+    fills in outputs. Runs in this process if there is one worker or one chunk,
+    or shared memory is not available"""
+    workers = min(get_workers(workers), len(chunks))
+    if workers <= 1 or not HAS_SHARED_MEMORY:
+        for index, (start, end) in enumerate(chunks):
+            task({**arrays, **outputs}, index, start, end)
+        return
+    with SharedArrays({**arrays, **outputs}) as shared:
+        with ProcessPoolExecutor(
+            workers, initializer=_attach, initargs=(shared.specs,)
+        ) as executor:
+            futures = [
+                executor.submit(_run, task, index, start, end)
+                for index, (start, end) in enumerate(chunks)
+            ]
+            for future in futures:
+                future.result()
+        for name, output in outputs.items():
+            output[...] = shared.arrays[name]
+
+
+class SharedArrays:
+    """Copies of arrays in shared memory blocks, which are freed on leaving the
+    context. specs lets other processes map the same blocks"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        from multiprocessing import shared_memory
+
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.specs: Dict[str, ArraySpec] = {}
+        self._blocks: List["SharedMemory"] = []
+        for name, array in arrays.items():
+            # Blocks cannot be empty
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            shared = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+            shared[...] = array
+            self.arrays[name] = shared
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info):
+        # Views must go before their blocks can be closed
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+
+def _attach(specs: Dict[str, ArraySpec]):
+    """Worker initializer mapping the shared arrays, kept for the worker's life"""
+    from multiprocessing import shared_memory
+
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_blocks.append(block)
+        _worker_arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+
+
+def _run(task: Task, index: int, start: int, end: int):
+    task(_worker_arrays, index, start, end)
@@ -0,0 +1,161 @@
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from graphs.data_structures.basic_structures import Node
+from graphs.data_structures.csr import row_positions
+from graphs.data_structures.paths import PathLink
+from graphs.exceptions import PathLimitException
+from graphs.instrumentation import record_size
+from graphs.shortest_paths import SearchArrayProperties
+
+# Bytes each step of a partial path takes in the trie: its node, parent and link
+TRIE_ENTRY_BYTES = 3 * np.dtype(np.int64).itemsize
+
+
+class TrieLevel:
+    """The last steps of the partial paths of one length. Each step holds the
+    array index of the node reached, the step before it as a position in the
+    previous level, and the position of the link taken, as in the search arrays"""
+
+    def __init__(self, nodes: np.ndarray, parents: np.ndarray, links: np.ndarray):
+        self.nodes = nodes
+        self.parents = parents
+        self.links = links
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def take(self, positions: np.ndarray) -> "TrieLevel":
+        return TrieLevel(
+            self.nodes[positions], self.parents[positions], self.links[positions]
+        )
+
+
+class PathEnumerationProperties(SearchArrayProperties):
+    """Enumerates the simple paths between two nodes breadth first, so shortest
+    first, extending every partial path of one length at once with vectorised
+    operations over the CSR rows.
+
+    Partial paths are held as a trie of parent pointers, one level per length, so
+    paths share the steps of their common prefixes. A path is only extended to
+    nodes that can still reach the target within the length allowed, found by a
+    breadth first search back from the target, so dead ends are never stored.
+    Link weights play no part, so may be negative.
+    """
+
+    def iter_paths(
+        self,
+        node_1: Node,
+        node_2: Node,
+        max_length: Optional[int] = None,
+        max_paths: Optional[int] = None,
+        max_memory: Optional[int] = None,
+    ) -> Iterator[Tuple[PathLink, ...]]:
+        """Yields each simple path from node_1 to a different node_2 once, in order
+        of length, stopping after max_paths paths. Paths longer than max_length
+        links are skipped. Raises PathLimitException if the partial paths would
+        take more than max_memory bytes"""
+        source, target = self._get_index(node_1), self._get_index(node_2)
+        if source is None or target is None or source == target:
+            return
+        indptr, indices, _, link_positions = self.get_search_arrays(backwards=False)
+        n = len(indptr) - 1
+        if max_length is None:
+            max_length = n - 1
+        remaining = self._get_levels_to(target, max_length)
+        if remaining[source] > max_length:
+            return
+        max_entries = None if max_memory is None else max_memory // TRIE_ENTRY_BYTES
+        levels = [TrieLevel(np.array([source]), np.array([-1]), np.array([-1]))]
+        found = 0
+        while len(levels[-1]) and len(levels) <= max_length:
+            # Every link out of the ends of the paths, leading to nodes that can
+            # still reach the target in time and are not on the path already
+            ends = levels[-1].nodes
+            positions = row_positions(indptr, ends)
+            parents = np.repeat(np.arange(len(ends)), indptr[ends + 1] - indptr[ends])
+            nodes = indices[positions]
+            keep = remaining[nodes] + len(levels) <= max_length
+            keep[keep] = ~self._is_on_path(levels, parents[keep], nodes[keep])
+            parents, nodes, positions = parents[keep], nodes[keep], positions[keep]
+            # Parallel links lead to the same path, so only the first is taken
+            _, first = np.unique(parents * n + nodes, return_index=True)
+            first.sort()
+            level = TrieLevel(
+                nodes[first], parents[first], link_positions[positions][first]
+            )
+            is_end = level.nodes == target
+            for end in np.flatnonzero(is_end):
+                yield self._to_trie_path(levels, level, end)
+                found += 1
+                if max_paths is not None and found >= max_paths:
+                    return
+            levels.append(level.take(np.flatnonzero(~is_end)))
+            record_size("enumerate_paths.frontier", len(levels[-1]))
+            if max_entries is not None and self._count_entries(levels) > max_entries:
+                levels = self._prune(levels)
+                if self._count_entries(levels) > max_entries:
+                    raise PathLimitException(
+                        f"Paths of {len(levels) - 1} links need more than "
+                        f"{max_memory} bytes"
+                    )
+            record_size("enumerate_paths.trie", self._count_entries(levels))
+
+    def _get_levels_to(self, target: int, max_length: int) -> np.ndarray:
+        """Number of links on a shortest path from each array index to target, inf
+        where there is none or it is longer than max_length"""
+        indptr, indices, _, _ = self.get_search_arrays(backwards=True)
+        levels = np.full(len(indptr) - 1, np.inf)
+        levels[target] = 0
+        frontier = np.array([target])
+        for level in range(1, max_length + 1):
+            neighbours = indices[row_positions(indptr, frontier)]
+            frontier = np.unique(neighbours[np.isinf(levels[neighbours])])
+            if not len(frontier):
+                break
+            levels[frontier] = level
+        return levels
+
+    @staticmethod
+    def _is_on_path(
+        levels: List[TrieLevel], parents: np.ndarray, nodes: np.ndarray
+    ) -> np.ndarray:
+        """Whether each node is on the path ending at its parent in the last level"""
+        on_path = np.zeros(len(nodes), dtype=bool)
+        for level in reversed(levels):
+            on_path |= level.nodes[parents] == nodes
+            parents = level.parents[parents]
+        return on_path
+
+    @staticmethod
+    def _count_entries(levels: List[TrieLevel]) -> int:
+        return sum(len(i) for i in levels)
+
+    @staticmethod
+    def _prune(levels: List[TrieLevel]) -> List[TrieLevel]:
+        """The trie without the steps no longer leading to a partial path"""
+        pruned = [levels[-1]]
+        for level in reversed(levels[:-1]):
+            kept, parents = np.unique(pruned[0].parents, return_inverse=True)
+            pruned[0] = TrieLevel(pruned[0].nodes, parents.reshape(-1), pruned[0].links)
+            pruned.insert(0, level.take(kept))
+        return pruned
+
+    def _to_trie_path(
+        self, levels: List[TrieLevel], last: TrieLevel, position: int
+    ) -> Tuple[PathLink, ...]:
+        """The path ending with the step at position in last, which extends the
+        paths in levels"""
+        path = []
+        reached = int(last.nodes[position])
+        link, parent = int(last.links[position]), int(last.parents[position])
+        for level in reversed(levels):
+            left = int(level.nodes[parent])
+            path.append(self._to_path_link(left, reached, link))
+            reached, link, parent = (
+                left,
+                int(level.links[parent]),
+                int(level.parents[parent]),
+            )
+        return tuple(reversed(path))
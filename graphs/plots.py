@@ -1,38 +1,101 @@
+from typing import Optional, Tuple
+
 import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
+
+from graphs.graph_properties import ArrayGraphProperties
+from graphs.layouts import CIRCULAR, get_layout
 
-from graphs.graph_properties import BaseGraphProperties
+# Links drawn from which the link artists are rasterised by default
+RASTERIZE_MIN_LINKS = 10000
+# Arrow head length and half width, as shares of the span of the layout
+ARROW_LENGTH = 0.03
+ARROW_HALF_WIDTH = 0.01
 
 
-class GraphPlotter(BaseGraphProperties):
-    def plot_graph(self) -> plt.Figure:
-        n = len(self.nodes)
-        point_map = {i: j for i, j in enumerate(self.nodes)}
-        node_map = {j.id: self._get_roots_of_unity(i, n) for i, j in point_map.items()}
-        complex_repns = [self._get_roots_of_unity(k, n) for k in point_map]
-        plt.figure()
-        plt.scatter(
-            [np.real(i) for i in complex_repns], [np.imag(i) for i in complex_repns]
+class GraphPlotter(ArrayGraphProperties):
+    """Draws the graph with one artist for the nodes, one for the links and one
+    for the arrow heads of a directed graph, however large it is"""
+
+    def plot_graph(
+        self,
+        layout: str = CIRCULAR,
+        max_links: Optional[int] = None,
+        rasterized: Optional[bool] = None,
+        max_iterations: Optional[int] = None,
+        seed: int = 0,
+    ) -> plt.Figure:
+        """Plots the nodes placed by the named layout, see graphs.layouts. At most
+        max_links links are drawn, chosen at random, and the links are rasterised
+        if rasterized, or by default once there are many of them"""
+        n, sources, targets = self._get_member_links()
+        positions = get_layout(layout, n, sources, targets, max_iterations, seed)
+        if max_links is not None and len(sources) > max_links:
+            rng = np.random.default_rng(seed)
+            chosen = np.sort(rng.choice(len(sources), max_links, replace=False))
+            sources, targets = sources[chosen], targets[chosen]
+        if rasterized is None:
+            rasterized = len(sources) >= RASTERIZE_MIN_LINKS
+        figure, axes = plt.subplots()
+        axes.scatter(positions[:, 0], positions[:, 1], zorder=2)
+        starts, ends = positions[sources], positions[targets]
+        axes.add_collection(
+            LineCollection(
+                np.stack([starts, ends], axis=1), colors="b", rasterized=rasterized
+            )
         )
-        for link in self.links:
-            points = [node_map[link.node_1.id], node_map[link.node_2.id]]
-            x = [np.real(i) for i in points]
-            y = [np.imag(i) for i in points]
-            plt.plot(x, y, c="b")
-            if link.is_directed:
-                eps = 0.02
-                plt.arrow(
-                    x[-1],
-                    y[-1],
-                    eps * (x[-1] - x[0]),
-                    eps * (y[-1] - y[0]),
-                    shape="full",
-                    lw=0,
-                    length_includes_head=True,
-                    head_width=0.05,
+        if self.is_directed:
+            axes.add_collection(
+                PolyCollection(
+                    self._get_arrow_heads(starts, ends),
+                    facecolors="b",
+                    edgecolors="none",
+                    rasterized=rasterized,
                 )
-        return plt.gcf()
+            )
+        axes.autoscale_view()
+        return figure
+
+    def get_layout(
+        self, layout: str, max_iterations: Optional[int] = None, seed: int = 0
+    ) -> np.ndarray:
+        """Positions of the nodes by the named layout, lined up with node_ids"""
+        n, sources, targets = self._get_member_links()
+        return get_layout(layout, n, sources, targets, max_iterations, seed)
+
+    def _get_member_links(self) -> Tuple[int, np.ndarray, np.ndarray]:
+        """Returns (n, sources, targets), the number of graph nodes and the links
+        between them, indexing into node_ids"""
+        csr = self.csr
+        sources, targets = csr.edge_arrays()
+        if csr.is_member is None:
+            return len(csr.node_ids), sources, targets
+        positions = np.cumsum(csr.is_member) - 1
+        keep = csr.is_member[sources] & csr.is_member[targets]
+        return (
+            int(csr.is_member.sum()),
+            positions[sources[keep]],
+            positions[targets[keep]],
+        )
 
     @staticmethod
-    def _get_roots_of_unity(k, n) -> complex:
-        return np.exp(2 * np.pi * 1j * k / n)
+    def _get_arrow_heads(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Triangles pointing along each link with their tips at its end"""
+        points = np.concatenate([starts, ends]) if len(starts) else np.zeros((1, 2))
+        span = max(np.ptp(points, axis=0).max(), 1e-9)
+        directions = ends - starts
+        lengths = np.linalg.norm(directions, axis=1)
+        # Self loops have no direction, so get no arrow head
+        keep = lengths > 0
+        ends, directions = ends[keep], directions[keep] / lengths[keep, np.newaxis]
+        normals = np.column_stack([-directions[:, 1], directions[:, 0]])
+        bases = ends - ARROW_LENGTH * span * directions
+        return np.stack(
+            [
+                ends,
+                bases + ARROW_HALF_WIDTH * span * normals,
+                bases - ARROW_HALF_WIDTH * span * normals,
+            ],
+            axis=1,
+        )
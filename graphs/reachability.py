@@ -0,0 +1,269 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from graphs.data_structures.basic_structures import Node
+from graphs.data_structures.csr import as_csr, build_csr, neighbour_rows
+from graphs.data_structures.graphs import BaseGraph
+from graphs.graph_properties import Nodes
+
+# How a ReachabilityIndex stores what each strongly connected component reaches
+CLOSURE = "closure"
+INTERVALS = "intervals"
+# Largest closure, in bytes, that the index picks over intervals by default
+DEFAULT_MAX_CLOSURE_BYTES = 1 << 26
+
+
+class ReachabilityIndex:
+    """Answers whether one node can reach another without searching, from labels
+    precomputed on the condensation of the graph, which joins each strongly
+    connected component into one node so that what is left is a DAG.
+
+    The CLOSURE method keeps one bit per pair of components, so answers in O(1)
+    but takes C^2 / 8 bytes for C components. The INTERVALS method numbers the
+    components in post order along a spanning forest and keeps, for each, the
+    merged ranges of numbers it reaches, so answers with one binary search in
+    O(log C). It takes far less memory on graphs that are close to trees, though
+    O(C^2) at worst. By default the closure is used if it fits in
+    max_closure_bytes.
+
+    The index describes the graph as it was when built. A node reaches itself,
+    and nodes that are not in the graph reach nothing.
+    """
+
+    def __init__(
+        self,
+        graph: BaseGraph,
+        method: Optional[str] = None,
+        max_closure_bytes: int = DEFAULT_MAX_CLOSURE_BYTES,
+    ):
+        self.csr = as_csr(graph.adjacency)
+        indptr, indices = neighbour_rows(self.csr)
+        self.labels, self.component_count = strongly_connected_labels(indptr, indices)
+        c = self.component_count
+        if method is None:
+            method = (
+                CLOSURE if c * ((c + 63) // 64) * 8 <= max_closure_bytes else INTERVALS
+            )
+        if method not in (CLOSURE, INTERVALS):
+            raise ValueError(
+                f"Unknown reachability method {method}, expected one of "
+                f"{CLOSURE, INTERVALS}"
+            )
+        self.method = method
+        sources = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        component_sources, component_targets = (
+            self.labels[sources],
+            self.labels[indices],
+        )
+        is_between = component_sources != component_targets
+        component_indptr, component_indices, _ = build_csr(
+            component_sources[is_between], component_targets[is_between], c
+        )
+        if method == CLOSURE:
+            self.closure = _get_closure(component_indptr, component_indices)
+        else:
+            self.post_order, subtree_starts = _get_post_order(
+                component_indptr, component_indices
+            )
+            self.interval_keys, self.interval_ends = _get_intervals(
+                component_indptr, component_indices, self.post_order, subtree_starts
+            )
+
+    @property
+    def nbytes(self) -> int:
+        """Memory taken by the labels of the index"""
+        if self.method == CLOSURE:
+            return self.labels.nbytes + self.closure.nbytes
+        return (
+            self.labels.nbytes
+            + self.post_order.nbytes
+            + self.interval_keys.nbytes
+            + self.interval_ends.nbytes
+        )
+
+    def is_reachable(self, node_1: Node, node_2: Node) -> bool:
+        indices = self._get_indices([node_1, node_2])
+        return bool(self._are_reachable(indices[:1], indices[1:])[0])
+
+    def batch_is_reachable(self, nodes_1: Nodes, nodes_2: Nodes) -> np.ndarray:
+        """is_reachable for each pair of nodes at the same place in nodes_1 and
+        nodes_2, given as nodes or arrays of node ids"""
+        return self._are_reachable(
+            self._get_indices(nodes_1), self._get_indices(nodes_2)
+        )
+
+    def _are_reachable(
+        self, indices_1: np.ndarray, indices_2: np.ndarray
+    ) -> np.ndarray:
+        is_found = (indices_1 >= 0) & (indices_2 >= 0)
+        is_reachable = np.zeros(len(indices_1), dtype=bool)
+        components_1 = self.labels[indices_1[is_found]]
+        components_2 = self.labels[indices_2[is_found]]
+        if self.method == CLOSURE:
+            words = self.closure[components_1, components_2 // 64]
+            shifts = (components_2 % 64).astype(np.uint64)
+            is_reachable[is_found] = ((words >> shifts) & np.uint64(1)) == 1
+            return is_reachable
+        # The last interval of the first component starting at or before the
+        # post order number of the second must cover it
+        numbers = self.post_order[components_2]
+        keys = components_1 * self.component_count + numbers
+        positions = np.searchsorted(self.interval_keys, keys, side="right") - 1
+        is_covered = positions >= 0
+        is_covered[is_covered] = (
+            self.interval_keys[positions[is_covered]] // self.component_count
+            == components_1[is_covered]
+        ) & (self.interval_ends[positions[is_covered]] >= numbers[is_covered])
+        is_reachable[is_found] = is_covered
+        return is_reachable
+
+    def _get_indices(self, nodes: Nodes) -> np.ndarray:
+        node_ids = nodes if isinstance(nodes, np.ndarray) else [i.id for i in nodes]
+        indices = self.csr.indices_of(node_ids)
+        if self.csr.is_member is not None:
+            indices[~self.csr.is_member[indices] & (indices >= 0)] = -1
+        return indices
+
+
+def strongly_connected_labels(
+    indptr: np.ndarray, indices: np.ndarray
+) -> Tuple[np.ndarray, int]:
+    """Returns (labels, count), numbering the strongly connected component of
+    each node in the order Tarjan's algorithm completes them. Links only ever
+    lead to a component completed earlier, so the numbers are a reverse
+    topological order of the condensation"""
+    n = len(indptr) - 1
+    # Python lists are much faster than arrays to index one element at a time
+    row_starts, row_ends = indptr[:-1].tolist(), indptr[1:].tolist()
+    indices = indices.tolist()
+    order, low_links, labels = [-1] * n, [0] * n, [-1] * n
+    on_stack = bytearray(n)
+    stack: List[int] = []
+    visited = count = 0
+    for root in range(n):
+        if order[root] >= 0:
+            continue
+        order[root] = low_links[root] = visited
+        visited += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [[root, row_starts[root]]]
+        while work:
+            node, position = work[-1]
+            if position < row_ends[node]:
+                work[-1][1] = position + 1
+                next_node = indices[position]
+                if order[next_node] < 0:
+                    order[next_node] = low_links[next_node] = visited
+                    visited += 1
+                    stack.append(next_node)
+                    on_stack[next_node] = 1
+                    work.append([next_node, row_starts[next_node]])
+                elif on_stack[next_node] and order[next_node] < low_links[node]:
+                    low_links[node] = order[next_node]
+                continue
+            work.pop()
+            if work and low_links[node] < low_links[work[-1][0]]:
+                low_links[work[-1][0]] = low_links[node]
+            if low_links[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    labels[member] = count
+                    if member == node:
+                        break
+                count += 1
+    return np.array(labels, dtype=np.int64), count
+
+
+def _get_closure(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Bit rows of the components each component reaches, itself included,
+    built from the components it links to, which are all numbered before it"""
+    c = len(indptr) - 1
+    closure = np.zeros((c, (c + 63) // 64), dtype=np.uint64)
+    closure[np.arange(c), np.arange(c) // 64] = np.left_shift(
+        np.uint64(1), (np.arange(c) % 64).astype(np.uint64)
+    )
+    for component, (start, end) in enumerate(
+        zip(indptr[:-1].tolist(), indptr[1:].tolist())
+    ):
+        if start < end:
+            closure[component] |= np.bitwise_or.reduce(
+                closure[indices[start:end]], axis=0
+            )
+    return closure
+
+
+def _get_post_order(
+    indptr: np.ndarray, indices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (post_order, subtree_starts), the post order numbers of the
+    components along a depth first spanning forest of the condensation, and the
+    smallest number in the subtree of each. Descendants are numbered just before
+    a component, so its subtree is the range between the two"""
+    c = len(indptr) - 1
+    row_starts, row_ends = indptr[:-1].tolist(), indptr[1:].tolist()
+    indices = indices.tolist()
+    has_links_in = bytearray(c)
+    for i in indices:
+        has_links_in[i] = 1
+    post_order, subtree_starts = [-1] * c, [-1] * c
+    visited = 0
+    # Every component can be reached from one nothing links to, as this is a DAG
+    for root in range(c):
+        if has_links_in[root]:
+            continue
+        subtree_starts[root] = visited
+        work = [[root, row_starts[root]]]
+        while work:
+            component, position = work[-1]
+            if position < row_ends[component]:
+                work[-1][1] = position + 1
+                next_component = indices[position]
+                if subtree_starts[next_component] < 0:
+                    subtree_starts[next_component] = visited
+                    work.append([next_component, row_starts[next_component]])
+                continue
+            work.pop()
+            post_order[component] = visited
+            visited += 1
+    return np.array(post_order, dtype=np.int64), np.array(subtree_starts)
+
+
+def _get_intervals(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    post_order: np.ndarray,
+    subtree_starts: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (keys, ends) of the merged post order ranges each component
+    reaches, sorted by key, which is the component times the component count
+    plus the start of the range"""
+    c = len(indptr) - 1
+    row_starts, row_ends = indptr[:-1].tolist(), indptr[1:].tolist()
+    indices, post_order = indices.tolist(), post_order.tolist()
+    subtree_starts = subtree_starts.tolist()
+    intervals: List[List[Tuple[int, int]]] = []
+    # Components only link to those numbered before them, so are merged in order
+    for component in range(c):
+        ranges = [(subtree_starts[component], post_order[component])]
+        for next_component in indices[row_starts[component] : row_ends[component]]:
+            ranges.extend(intervals[next_component])
+        ranges.sort()
+        merged = [ranges[0]]
+        for start, end in ranges[1:]:
+            last_start, last_end = merged[-1]
+            if start <= last_end + 1:
+                if end > last_end:
+                    merged[-1] = (last_start, end)
+            else:
+                merged.append((start, end))
+        intervals.append(merged)
+    keys = [
+        component * c + start
+        for component, merged in enumerate(intervals)
+        for start, _ in merged
+    ]
+    ends = [end for merged in intervals for _, end in merged]
+    return np.array(keys, dtype=np.int64), np.array(ends, dtype=np.int64)
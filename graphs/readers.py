@@ -0,0 +1,184 @@
+"""Streaming readers building graphs from edge list, adjacency list and DIMACS
+files, read in chunks of lines so memory is bounded by the graph being built.
+Paths to gzip files are decompressed on the fly."""
+
+import gzip
+import os
+from typing import BinaryIO, Callable, Hashable, Iterator, List, Optional, Union
+
+from graphs.data_structures.graphs import BaseGraph
+from graphs.exceptions import InvalidFileException
+from graphs.graph_builder import StreamingGraphBuilder
+
+PathOrFile = Union[str, os.PathLike, BinaryIO]
+ProgressCallback = Callable[[int, int], None]
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+COMMENT_PREFIXES = (b"#", b"%")
+GZIP_MAGIC = b"\x1f\x8b"
+BLOCK_SIZE = 1 << 22
+
+
+def read_edge_list(
+    source: PathOrFile,
+    is_directed: bool,
+    delimiter: Optional[str] = None,
+    id_type: Callable[[str], Hashable] = int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+    weighted: bool = False,
+) -> BaseGraph:
+    """Reads one "source target" pair per line, split on whitespace or delimiter,
+    e.g. "," for CSV, followed by the link weight if weighted. Further columns
+    are ignored"""
+    builder = StreamingGraphBuilder(is_directed, id_type is int)
+    parse = _get_parser(id_type)
+    for chunk, bytes_read in _iter_chunks(source, delimiter, chunk_size):
+        try:
+            sources = [parse(tokens[0]) for tokens in chunk]
+            targets = [parse(tokens[1]) for tokens in chunk]
+            weights = [float(tokens[2]) for tokens in chunk] if weighted else None
+        except (IndexError, ValueError) as exc:
+            raise InvalidFileException(
+                f"Could not parse edge list line: {exc}"
+            ) from exc
+        builder.add_edges(sources, targets, weights)
+        _report(progress, bytes_read, builder)
+    return builder.build()
+
+
+def read_adjacency_list(
+    source: PathOrFile,
+    is_directed: bool,
+    delimiter: Optional[str] = None,
+    id_type: Callable[[str], Hashable] = int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> BaseGraph:
+    """Reads lines of "node neighbour neighbour ...", a node alone on a line has
+    no links"""
+    builder = StreamingGraphBuilder(is_directed, id_type is int)
+    parse = _get_parser(id_type)
+    for chunk, bytes_read in _iter_chunks(source, delimiter, chunk_size):
+        try:
+            nodes = [parse(tokens[0]) for tokens in chunk]
+            sources = [node for node, tokens in zip(nodes, chunk) for _ in tokens[1:]]
+            targets = [parse(token) for tokens in chunk for token in tokens[1:]]
+        except ValueError as exc:
+            raise InvalidFileException(
+                f"Could not parse adjacency list line: {exc}"
+            ) from exc
+        builder.add_nodes(nodes)
+        builder.add_edges(sources, targets)
+        _report(progress, bytes_read, builder)
+    return builder.build()
+
+
+def read_dimacs(
+    source: PathOrFile,
+    is_directed: Optional[bool] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+    weighted: bool = False,
+) -> BaseGraph:
+    """Reads DIMACS "p", "a" and "e" lines, with nodes 1 to n from the problem
+    line. Unless given, directedness is taken from the problem type, so "p sp"
+    is directed and "p edge" or "p col" is undirected. If weighted, links take
+    their weight from the fourth column, as in "a u v w" shortest path files"""
+    builder = StreamingGraphBuilder(bool(is_directed))
+    for chunk, bytes_read in _iter_chunks(source, None, chunk_size, (b"c",)):
+        sources, targets = [], []
+        weights = [] if weighted else None
+        for tokens in chunk:
+            kind = tokens[0]
+            try:
+                if kind in (b"a", b"e"):
+                    sources.append(int(tokens[1]))
+                    targets.append(int(tokens[2]))
+                    if weighted:
+                        weights.append(float(tokens[3]))
+                elif kind == b"p":
+                    if is_directed is None:
+                        builder.is_directed = tokens[1] not in (b"edge", b"col")
+                    builder.add_nodes(range(1, int(tokens[2]) + 1))
+            except (IndexError, ValueError) as exc:
+                raise InvalidFileException(
+                    f"Could not parse DIMACS line: {exc}"
+                ) from exc
+        builder.add_edges(sources, targets, weights)
+        _report(progress, bytes_read, builder)
+    return builder.build()
+
+
+def open_binary(source: PathOrFile) -> BinaryIO:
+    """Opens a path for binary reading, decompressing gzip files"""
+    if not isinstance(source, (str, os.PathLike)):
+        return source
+    with open(source, "rb") as file:
+        is_gzip = file.read(2) == GZIP_MAGIC
+    return gzip.open(source, "rb") if is_gzip else open(source, "rb")
+
+
+def _iter_chunks(
+    source: PathOrFile,
+    delimiter: Optional[str],
+    chunk_size: int,
+    comment_prefixes=COMMENT_PREFIXES,
+) -> Iterator[tuple]:
+    """Yields lists of up to chunk_size tokenised lines, skipping blank lines and
+    comments, with the number of (decompressed) bytes read so far"""
+    separator = None if delimiter is None else delimiter.encode()
+    file = open_binary(source)
+    try:
+        chunk: List[List[bytes]] = []
+        bytes_read = 0
+        for lines, bytes_read in _iter_lines(file):
+            for line in lines:
+                tokens = line.split(separator)
+                if separator is not None:
+                    tokens = [i.strip() for i in tokens]
+                if (
+                    not tokens
+                    or not tokens[0]
+                    or tokens[0].startswith(comment_prefixes)
+                ):
+                    continue
+                chunk.append(tokens)
+                if len(chunk) == chunk_size:
+                    yield chunk, bytes_read
+                    chunk = []
+        yield chunk, bytes_read
+    finally:
+        if file is not source:
+            file.close()
+
+
+def _iter_lines(file: BinaryIO) -> Iterator[tuple]:
+    """Reads large blocks rather than single lines, which is far faster through
+    gzip, yielding the complete lines in each block and the bytes read so far"""
+    remainder = b""
+    bytes_read = 0
+    while True:
+        block = file.read(BLOCK_SIZE)
+        if not block:
+            yield [remainder], bytes_read
+            return
+        bytes_read += len(block)
+        lines = (remainder + block).split(b"\n")
+        remainder = lines.pop()
+        yield lines, bytes_read
+
+
+def _get_parser(id_type: Callable[[str], Hashable]) -> Callable[[bytes], Hashable]:
+    if id_type is int:
+        return int
+    return lambda token: id_type(token.decode())
+
+
+def _report(
+    progress: Optional[ProgressCallback],
+    bytes_read: int,
+    builder: StreamingGraphBuilder,
+):
+    if progress is not None:
+        progress(bytes_read, builder.edge_count)
@@ -0,0 +1,358 @@
+import heapq
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from graphs.data_structures.basic_structures import Node, Link, new_link
+from graphs.data_structures.csr import CSRAdjacency, link_costs, row_positions
+from graphs.data_structures.graphs import BaseGraph
+from graphs.data_structures.paths import PathLink, PathReport, new_path_link
+from graphs.exceptions import NegativeWeightException
+from graphs.graph_properties import ArrayGraphProperties
+from graphs.instrumentation import record_size
+
+# Estimates the remaining distance from a node to the target, see get_a_star_path
+Heuristic = Callable[[Node, Node], float]
+# Where the link taken is stored, its position in indices if at least 0, else
+# position -1 - p in reverse_indices
+LinkPosition = int
+# For each reached node, the node it was reached from and the link taken
+Parents = Dict[int, Optional[Tuple[int, LinkPosition]]]
+# CSR rows (indptr, indices, weights, link positions) that a search follows
+SearchArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class SearchArrayProperties(ArrayGraphProperties):
+    """CSR rows holding every link that can be followed out of each node, for
+    the searches built on them: both directions of an undirected link, and only
+    links between graph nodes. These rows are built once per version of the
+    graph, with unweighted links costing 1.
+    """
+
+    def __init__(self, graph: BaseGraph):
+        super().__init__(graph)
+        self._search_arrays: Dict[bool, SearchArrays] = {}
+        self._search_arrays_csr: Optional[CSRAdjacency] = None
+
+    def _get_index(self, node: Node) -> Optional[int]:
+        csr = self.csr
+        index = csr.index_of(node.id)
+        if index is None or (csr.is_member is not None and not csr.is_member[index]):
+            return None
+        return index
+
+    def get_search_arrays(self, backwards: bool) -> SearchArrays:
+        """CSR rows of the links followed out of each node, or into it if
+        searching backwards, with their weights and link positions"""
+        csr = self.csr
+        if csr is not self._search_arrays_csr:
+            self._search_arrays = {}
+            self._search_arrays_csr = csr
+        if not self.is_directed:
+            # Undirected links are followed the same way in both directions
+            backwards = False
+        if backwards not in self._search_arrays:
+            self._search_arrays[backwards] = self._build_search_arrays(backwards)
+        return self._search_arrays[backwards]
+
+    def _build_search_arrays(self, backwards: bool) -> SearchArrays:
+        csr = self.csr
+        n = len(csr.node_ids)
+        parts = []
+        for reverse in (False, True):
+            if self.is_directed and reverse != backwards:
+                continue
+            indptr, indices, weights = (
+                (csr.reverse_indptr, csr.reverse_indices, csr.reverse_weights)
+                if reverse
+                else (csr.indptr, csr.indices, csr.weights)
+            )
+            positions = np.arange(len(indices))
+            parts.append(
+                (
+                    np.repeat(np.arange(n), np.diff(indptr)),
+                    indices,
+                    np.ones(len(indices)) if weights is None else link_costs(weights),
+                    -1 - positions if reverse else positions,
+                )
+            )
+        rows, indices, weights, positions = (np.concatenate(i) for i in zip(*parts))
+        if csr.is_member is not None:
+            keep = csr.is_member[indices]
+            rows, indices, weights, positions = (
+                rows[keep],
+                indices[keep],
+                weights[keep],
+                positions[keep],
+            )
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, indices[order], weights[order], positions[order]
+
+    @staticmethod
+    def _get_row(arrays: SearchArrays, index: int) -> Iterator[Tuple[int, float, int]]:
+        """(neighbour, weight, link position) for each link followed out of index"""
+        indptr, indices, weights, positions = arrays
+        start, end = indptr[index], indptr[index + 1]
+        return zip(
+            indices[start:end].tolist(),
+            weights[start:end].tolist(),
+            positions[start:end].tolist(),
+        )
+
+    def _to_path(self, parents: Parents, node: int) -> Tuple[PathLink, ...]:
+        path = []
+        while parents[node] is not None:
+            previous, link = parents[node]
+            path.append(self._to_path_link(previous, node, link))
+            node = previous
+        return tuple(reversed(path))
+
+    def _to_path_link(
+        self, left: int, reached: int, link: LinkPosition, backwards: bool = False
+    ) -> PathLink:
+        """The step of the path for a search that left one node for another by
+        link, which runs the other way round along the path if searching
+        backwards from the end"""
+        csr = self.csr
+        # A reverse position is a link stored from the node reached to the one left
+        if link >= 0:
+            link_nodes, weight = (left, reached), csr.weight_at(link)
+        else:
+            link_nodes, weight = (reached, left), csr.weight_at(-1 - link, reverse=True)
+        underlying_link = new_link(
+            csr.node_at(link_nodes[0]),
+            csr.node_at(link_nodes[1]),
+            self.is_directed,
+            weight,
+        )
+        node_1, node_2 = (reached, left) if backwards else (left, reached)
+        return new_path_link(csr.node_at(node_1), csr.node_at(node_2), underlying_link)
+
+
+class WeightedPathProperties(SearchArrayProperties):
+    """Shortest paths by total link weight, with unweighted links counting as 1.
+
+    Searches use a binary heap, so take O((V + E) log V), over the search rows.
+    Weights must not be negative.
+    """
+
+    def _build_search_arrays(self, backwards: bool) -> SearchArrays:
+        arrays = super()._build_search_arrays(backwards)
+        self._check_weights(arrays[2])
+        return arrays
+
+    def get_dijkstra_path(self, node_1: Node, node_2: Node) -> PathReport:
+        return self.get_a_star_path(node_1, node_2, None)
+
+    def get_a_star_path(
+        self, node_1: Node, node_2: Node, heuristic: Optional[Heuristic]
+    ) -> PathReport:
+        """Dijkstra's algorithm guided towards node_2 by heuristic(node, node_2),
+        which must never overestimate the remaining distance for the path to be
+        shortest. Without a heuristic this is plain Dijkstra"""
+        source, target = self._get_index(node_1), self._get_index(node_2)
+        if source is None or target is None:
+            return PathReport(node_1, node_2, [])
+        estimate = None
+        if heuristic is not None:
+            node_at = self.csr.node_at
+
+            def estimate(index: int) -> float:
+                return heuristic(node_at(index), node_2)
+
+        _, parents = self._search(
+            self.get_search_arrays(backwards=False), source, target, estimate
+        )
+        if target not in parents:
+            return PathReport(node_1, node_2, [])
+        return PathReport(node_1, node_2, [self._to_path(parents, target)])
+
+    def get_bidirectional_dijkstra_path(self, node_1: Node, node_2: Node) -> PathReport:
+        """Dijkstra's algorithm from both ends at once, against link direction from
+        node_2, stopping once no shorter meeting point can remain. Explores far
+        fewer nodes than a one sided search on large graphs"""
+        source, target = self._get_index(node_1), self._get_index(node_2)
+        if source is None or target is None:
+            return PathReport(node_1, node_2, [])
+        arrays = (
+            self.get_search_arrays(backwards=False),
+            self.get_search_arrays(backwards=True),
+        )
+        distances = ({source: 0.0}, {target: 0.0})
+        parents: Tuple[Parents, Parents] = ({source: None}, {target: None})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best, meeting_node = (0.0, source) if source == target else (np.inf, None)
+        while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            distance, node = heapq.heappop(heaps[side])
+            if distance > distances[side][node]:
+                continue
+            side_distances, other_distances = distances[side], distances[1 - side]
+            for neighbour, weight, link in self._get_row(arrays[side], node):
+                next_distance = distance + weight
+                if next_distance < side_distances.get(neighbour, np.inf):
+                    side_distances[neighbour] = next_distance
+                    parents[side][neighbour] = (node, link)
+                    heapq.heappush(heaps[side], (next_distance, neighbour))
+                    other_distance = other_distances.get(neighbour)
+                    if (
+                        other_distance is not None
+                        and next_distance + other_distance < best
+                    ):
+                        best, meeting_node = next_distance + other_distance, neighbour
+        record_size("dijkstra.reached", len(distances[0]) + len(distances[1]))
+        if meeting_node is None:
+            return PathReport(node_1, node_2, [])
+        path = self._to_path(parents[0], meeting_node)
+        # The backward search's parents lead on from the meeting node to node_2
+        node, rest = meeting_node, []
+        while parents[1][node] is not None:
+            next_node, link = parents[1][node]
+            rest.append(self._to_path_link(next_node, node, link, backwards=True))
+            node = next_node
+        return PathReport(node_1, node_2, [path + tuple(rest)])
+
+    def get_all_distances(self, node: Node) -> np.ndarray:
+        """Distances from node to every graph node, in the order of node_ids, with
+        inf for nodes it cannot reach"""
+        source = self._get_index(node)
+        csr = self.csr
+        if source is None:
+            return np.full(len(self.node_ids), np.inf)
+        distances = self.get_index_distances(source)
+        return distances if csr.is_member is None else distances[csr.is_member]
+
+    def get_index_distances(self, source: int) -> np.ndarray:
+        """Distances from the node at array index source to every array index"""
+        indptr, indices, weights, _ = self.get_search_arrays(backwards=False)
+        return bucket_distances(indptr, indices, weights, source)
+
+    @staticmethod
+    def _check_weights(weights: np.ndarray):
+        if len(weights) and weights.min() < 0:
+            raise NegativeWeightException(
+                "Shortest paths need link weights of at least 0"
+            )
+
+    def _search(
+        self,
+        arrays: SearchArrays,
+        source: int,
+        target: Optional[int] = None,
+        estimate: Optional[Callable[[int], float]] = None,
+    ) -> Tuple[Dict[int, float], Parents]:
+        """Dijkstra's algorithm, or A* given an estimate of the distance left,
+        stopping once target is settled or, without one, every node is"""
+        distances = {source: 0.0}
+        parents: Parents = {source: None}
+        heap = [(estimate(source) if estimate else 0.0, 0.0, source)]
+        while heap:
+            _, distance, node = heapq.heappop(heap)
+            if distance > distances[node]:
+                continue
+            if node == target:
+                break
+            for neighbour, weight, link in self._get_row(arrays, node):
+                next_distance = distance + weight
+                if next_distance < distances.get(neighbour, np.inf):
+                    distances[neighbour] = next_distance
+                    parents[neighbour] = (node, link)
+                    priority = next_distance
+                    if estimate is not None:
+                        priority += estimate(neighbour)
+                    heapq.heappush(heap, (priority, next_distance, neighbour))
+        record_size("dijkstra.reached", len(distances))
+        return distances, parents
+
+
+def bucket_distances(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    weights: np.ndarray,
+    source: int,
+    min_frontier: int = 64,
+) -> np.ndarray:
+    """Single source distances over CSR rows by delta stepping, relaxing every
+    node in the nearest bucket of distances at once with vectorised operations.
+
+    Buckets are the mean weight wide. Long thin graphs leave only a few nodes
+    per bucket, so once the frontiers average under min_frontier nodes the
+    search is finished with a heap instead.
+    """
+    distances = np.full(len(indptr) - 1, np.inf)
+    distances[source] = 0.0
+    mean_weight = float(weights.mean()) if len(weights) else 0.0
+    delta = mean_weight if mean_weight > 0 else 1.0
+    buckets: Dict[int, List[np.ndarray]] = {0: [np.array([source])]}
+    rounds = relaxed = 0
+    while buckets:
+        bucket = min(buckets)
+        frontier = np.unique(np.concatenate(buckets.pop(bucket)))
+        # Nodes improved into an earlier bucket since were relaxed there
+        frontier = frontier[distances[frontier] // delta == bucket]
+        while frontier.size:
+            rounds += 1
+            relaxed += frontier.size
+            if rounds > 100 and relaxed < min_frontier * rounds:
+                return _heap_distances(
+                    indptr, indices, weights, distances, bucket * delta
+                )
+            changed = _relax(indptr, indices, weights, frontier, distances)
+            changed_buckets = (distances[changed] // delta).astype(np.int64)
+            is_inside = changed_buckets == bucket
+            frontier = changed[is_inside]
+            later, later_buckets = changed[~is_inside], changed_buckets[~is_inside]
+            order = np.argsort(later_buckets, kind="stable")
+            later, later_buckets = later[order], later_buckets[order]
+            splits = np.flatnonzero(np.diff(later_buckets)) + 1
+            for group in np.split(later, splits) if later.size else []:
+                buckets.setdefault(int(distances[group[0]] // delta), []).append(group)
+    return distances
+
+
+def _relax(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    weights: np.ndarray,
+    frontier: np.ndarray,
+    distances: np.ndarray,
+) -> np.ndarray:
+    """Relaxes every link out of the frontier, returning the improved nodes"""
+    positions = row_positions(indptr, frontier)
+    counts = indptr[frontier + 1] - indptr[frontier]
+    targets = indices[positions]
+    new_distances = np.repeat(distances[frontier], counts) + weights[positions]
+    is_shorter = new_distances < distances[targets]
+    targets = targets[is_shorter]
+    np.minimum.at(distances, targets, new_distances[is_shorter])
+    return np.unique(targets)
+
+
+def _heap_distances(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    weights: np.ndarray,
+    distances: np.ndarray,
+    settled_below: float,
+) -> np.ndarray:
+    """Finishes a search with Dijkstra's algorithm, given distances that are
+    final below settled_below and upper bounds elsewhere"""
+    unsettled = np.flatnonzero(np.isfinite(distances) & (distances >= settled_below))
+    heap = list(zip(distances[unsettled].tolist(), unsettled.tolist()))
+    heapq.heapify(heap)
+    # Python lists are much faster than arrays to index one element at a time
+    indptr, indices, weights = indptr.tolist(), indices.tolist(), weights.tolist()
+    distances = distances.tolist()
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if distance > distances[node]:
+            continue
+        for position in range(indptr[node], indptr[node + 1]):
+            next_distance = distance + weights[position]
+            neighbour = indices[position]
+            if next_distance < distances[neighbour]:
+                distances[neighbour] = next_distance
+                heapq.heappush(heap, (next_distance, neighbour))
+    return np.array(distances)
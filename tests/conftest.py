@@ -2,10 +2,18 @@ from itertools import combinations
 
 import pytest
 
+from graphs.data_structures.adjacency import AdjacencyIndex
 from graphs.data_structures.basic_structures import Node, Link
+from graphs.data_structures.bitset import BitsetAdjacency
+from graphs.data_structures.csr import CSRAdjacency
 from graphs import Graph
 
 
+@pytest.fixture(params=[AdjacencyIndex, CSRAdjacency, BitsetAdjacency])
+def adjacency_class(request):
+    return request.param
+
+
 @pytest.fixture
 def nodes():
     n1 = Node()
@@ -56,25 +64,25 @@ def cyclic_directed_links(nodes):
 
 
 @pytest.fixture
-def line_graph(nodes, line_links):
-    return Graph(nodes, line_links)
+def line_graph(nodes, line_links, adjacency_class):
+    return Graph(nodes, line_links, adjacency_class)
 
 
 @pytest.fixture
-def complete_graph(nodes, complete_links):
-    return Graph(nodes, complete_links)
+def complete_graph(nodes, complete_links, adjacency_class):
+    return Graph(nodes, complete_links, adjacency_class)
 
 
 @pytest.fixture
-def disconnected_graph(nodes, disconnected_links):
-    return Graph(nodes, disconnected_links)
+def disconnected_graph(nodes, disconnected_links, adjacency_class):
+    return Graph(nodes, disconnected_links, adjacency_class)
 
 
 @pytest.fixture
-def directed_graph(nodes, directed_links):
-    return Graph(nodes, directed_links)
+def directed_graph(nodes, directed_links, adjacency_class):
+    return Graph(nodes, directed_links, adjacency_class)
 
 
 @pytest.fixture
-def cyclic_directed_graph(nodes, cyclic_directed_links):
-    return Graph(nodes, cyclic_directed_links)
+def cyclic_directed_graph(nodes, cyclic_directed_links, adjacency_class):
+    return Graph(nodes, cyclic_directed_links, adjacency_class)
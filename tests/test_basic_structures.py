@@ -0,0 +1,72 @@
+from itertools import combinations
+
+import pytest
+
+from graphs import Graph, Node, Link, LeanNode, LeanLink, LeanPathLink
+
+
+def test_lean_node_equality():
+    assert LeanNode(1) == LeanNode(1)
+    assert LeanNode(1) != LeanNode(2)
+    assert LeanNode(1) != Node(1)
+    assert LeanNode() != LeanNode()
+    assert len({LeanNode("a"), LeanNode("a")}) == 1
+    with pytest.raises(AttributeError):
+        LeanNode(1).colour = "red"
+
+
+def test_lean_link_equality():
+    n1, n2 = LeanNode(1), LeanNode(2)
+    assert LeanLink(n1, n2) == LeanLink(LeanNode(1), LeanNode(2))
+    assert LeanLink(n1, n2) != LeanLink(n2, n1)
+    assert LeanLink(n1, n2) != LeanLink(n1, n2, True)
+    assert LeanLink(n1, n2) != Link(Node(1), Node(2))
+    assert LeanLink(n1, n2).nodes == [n1, n2]
+    assert LeanPathLink(n1, n2, LeanLink(n1, n2)) == LeanPathLink(
+        n1, n2, LeanLink(n1, n2)
+    )
+    assert LeanPathLink(n1, n2, LeanLink(n1, n2)) != LeanPathLink(
+        n1, n2, LeanLink(n2, n1)
+    )
+    assert repr(LeanLink(n1, n2)) == (
+        "<LeanLink>(node_1=<LeanNode>(id=1), node_2=<LeanNode>(id=2), is_directed=False)"
+    )
+
+
+def test_lean_graph():
+    nodes = [LeanNode(i) for i in range(3)]
+    graph = Graph(nodes, [LeanLink(nodes[0], nodes[1]), LeanLink(nodes[1], nodes[2])])
+    assert graph.get_neighbourhood(nodes[1]) == {nodes[0], nodes[2]}
+    assert graph.get_shortest_path(nodes[0], nodes[2]).distance == 2
+    paths = [
+        graph.get_shortest_path(nodes[0], nodes[2]).paths[0],
+        graph.get_paths(nodes[0], nodes[2]).paths[0],
+        next(graph.iter_paths(nodes[0], nodes[2])),
+        graph.find_eulerian_path(),
+    ]
+    assert all(isinstance(i, LeanPathLink) for path in paths for i in path)
+
+
+def test_lean_objects_kept(adjacency_class):
+    nodes = [LeanNode(i) for i in range(4)]
+    links = [
+        LeanLink(nodes[0], nodes[1], weight=1.0),
+        LeanLink(nodes[1], nodes[2], weight=2.0),
+    ]
+    graph = Graph(nodes, links, adjacency_class)
+    assert graph.nodes == set(nodes)
+    assert graph.links == set(links)
+    assert nodes[1] in graph.get_neighbourhood(nodes[0])
+    assert graph.find_link(nodes[1], nodes[2]) == links[1]
+    assert graph.subgraph_view(nodes[:2]).links == {links[0]}
+    path = graph.get_shortest_path(nodes[0], nodes[2]).paths[0]
+    assert [i.underlying_link for i in path] == links
+
+
+def test_dense_lean_graph():
+    # Dense enough to be stored as bitsets
+    nodes = [LeanNode(i) for i in range(70)]
+    links = [LeanLink(i, j) for i, j in combinations(nodes, 2)]
+    graph = Graph(nodes, links)
+    assert graph.nodes == set(nodes)
+    assert nodes[1] in graph.get_neighbourhood(nodes[0])
@@ -0,0 +1,115 @@
+import random
+from itertools import product
+
+import numpy as np
+import pytest
+
+from graphs import Graph, Node, Link
+from graphs.batch_queries import multi_source_bfs
+from graphs.data_structures.csr import CSRAdjacency
+
+
+def get_random_graph(adjacency_class, is_directed, seed, is_weighted=False):
+    rng = random.Random(seed)
+    nodes = [Node() for _ in range(10)]
+    links = [
+        Link(
+            rng.choice(nodes),
+            rng.choice(nodes),
+            is_directed,
+            rng.randint(0, 9) if is_weighted else None,
+        )
+        for _ in range(14)
+    ]
+    return Graph(nodes, links, adjacency_class), nodes
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+@pytest.mark.parametrize("seed", range(4))
+def test_batch_queries_match_single_queries(adjacency_class, is_directed, seed):
+    graph, nodes = get_random_graph(adjacency_class, is_directed, seed)
+    nodes_1, nodes_2 = zip(*product(nodes, nodes))
+    assert graph.batch_are_neighbours(nodes_1, nodes_2).tolist() == [
+        graph.are_neighbours(i, j) for i, j in zip(nodes_1, nodes_2)
+    ]
+    assert graph.batch_is_reachable(nodes_1, nodes_2).tolist() == [
+        graph.is_reachable(i, j) for i, j in zip(nodes_1, nodes_2)
+    ]
+    assert graph.batch_get_neighbourhoods(nodes) == [
+        graph.get_neighbourhood(i) for i in nodes
+    ]
+    offsets, neighbour_ids = graph.batch_get_neighbour_ids(nodes)
+    assert [
+        {Node(j) for j in neighbour_ids[start:end].tolist()}
+        for start, end in zip(offsets, offsets[1:])
+    ] == [graph.get_neighbourhood(i) for i in nodes]
+    assert graph.batch_get_degrees(nodes).tolist() == [
+        graph.get_degree(i) for i in nodes
+    ]
+    distances = graph.get_distances(nodes, nodes)
+    for (i, node_1), (j, node_2) in product(enumerate(nodes), repeat=2):
+        report = graph.get_shortest_path(node_1, node_2)
+        expected = report.distance if report.is_possible else np.inf
+        assert distances[i, j] == expected
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+def test_weighted_distances_match_all_distances(adjacency_class, is_directed):
+    graph, nodes = get_random_graph(adjacency_class, is_directed, 0, True)
+    distances = graph.get_distances(nodes + nodes[:2])
+    assert distances.shape == (len(nodes) + 2, len(nodes))
+    for row, node in zip(distances, nodes + nodes[:2]):
+        assert row.tolist() == graph.get_all_distances(node).tolist()
+
+
+def test_batch_queries_take_id_arrays():
+    graph = Graph.from_edge_list([(1, 2), (2, 3), (4, 4)], is_directed=True)
+    assert graph.batch_are_neighbours(
+        np.array([1, 2, 3, 4, 9]), np.array([2, 1, 1, 4, 1])
+    ).tolist() == [True, False, False, True, False]
+    assert graph.batch_get_degrees(np.array([1, 2, 3, 4, 9])).tolist() == [
+        1,
+        1,
+        0,
+        0,
+        0,
+    ]
+    assert graph.batch_get_neighbourhoods(np.array([2, 9])) == [{Node(3)}, set()]
+    offsets, neighbour_ids = graph.batch_get_neighbour_ids(np.array([1, 9, 2]))
+    assert offsets.tolist() == [0, 1, 1, 2]
+    assert neighbour_ids.tolist() == [2, 3]
+    assert graph.batch_is_reachable(
+        np.array([1, 3, 9, 9]), np.array([3, 1, 9, 1])
+    ).tolist() == [True, False, False, False]
+    assert graph.get_distances(np.array([1, 9]), np.array([3, 1])).tolist() == [
+        [2, 0],
+        [np.inf, np.inf],
+    ]
+
+
+def test_batch_queries_skip_nodes_outside_graph():
+    n1, n2, n3, outside = Node(1), Node(2), Node(3), Node(5)
+    graph = Graph([n1, n2, n3], [Link(n1, n2), Link(n2, outside)], CSRAdjacency)
+    assert graph.batch_are_neighbours([n2], [outside]).tolist() == [False]
+    assert graph.batch_get_degrees([n2, outside]).tolist() == [1, 0]
+    assert graph.get_distances([n1]).tolist() == [[0, 1, np.inf]]
+
+
+def test_multi_source_bfs_matches_separate_searches():
+    rng = np.random.default_rng(0)
+    n = 200
+    graph = Graph.from_numpy(
+        rng.integers(0, n, 400), rng.integers(0, n, 400), is_directed=True
+    )
+    csr = graph.adjacency
+    sources = rng.integers(0, len(csr.node_ids), 300)
+    targets = rng.integers(0, len(csr.node_ids), 300)
+    reports = [
+        graph.get_shortest_path(csr.node_at(i), csr.node_at(j))
+        for i, j in zip(sources.tolist(), targets.tolist())
+    ]
+    expected = [i.distance if i.is_possible else np.inf for i in reports]
+    rows = (csr.indptr, csr.indices, csr.reverse_indptr, csr.reverse_indices)
+    for max_sources in [1, 3, 64, 256]:
+        levels = multi_source_bfs(*rows, sources, targets, max_sources)
+        assert levels.tolist() == expected
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from graphs import Graph, Node, Link
+from graphs.exceptions import InvalidFileException, UnsupportedNodeIdsException
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_and_load(tmp_path, directed_graph, mmap):
+    path = tmp_path / "graph.bin"
+    directed_graph.save(path)
+    graph = Graph.load(path, mmap)
+    assert isinstance(graph.adjacency.indices, np.memmap) == mmap
+    assert graph.is_directed
+    assert graph.nodes == directed_graph.nodes
+    assert graph.links == directed_graph.links
+    assert graph.dependency_chain[-1] == directed_graph.dependency_chain[-1]
+
+
+def test_save_string_ids_and_outside_endpoints(tmp_path):
+    a, b, c = Node("a"), Node("bb"), Node("ccc")
+    original = Graph([a, b], [Link(a, b), Link(b, c)])
+    path = tmp_path / "graph.bin"
+    original.save(path)
+    graph = Graph.load(path)
+    assert not graph.is_directed
+    assert graph.nodes == {a, b}
+    assert graph.links == original.links
+    assert graph.get_neighbourhood(b) == {a}
+
+
+def test_save_empty_graph(tmp_path):
+    path = tmp_path / "graph.bin"
+    Graph.from_coo([], [], True, (3, 3)).save(path)
+    graph = Graph.load(path)
+    assert graph.order == 3
+    assert graph.size == 0
+
+
+def test_invalid_files(tmp_path):
+    path = tmp_path / "graph.bin"
+    path.write_bytes(b"not a graph")
+    with pytest.raises(InvalidFileException):
+        Graph.load(path)
+    n1, n2 = Node(1), Node("a")
+    with pytest.raises(UnsupportedNodeIdsException):
+        Graph([n1, n2], [Link(n1, n2)]).save(path)
@@ -0,0 +1,162 @@
+import random
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from graphs import Graph, Node, Link
+from graphs.data_structures.adjacency import AdjacencyIndex
+from graphs.data_structures.bitset import BitsetAdjacency, popcount, bit_indices
+from graphs.data_structures.csr import CSRAdjacency
+from graphs.exceptions import InvalidMutationException
+
+
+def get_random_links(nodes, is_directed, count, seed, is_weighted=False):
+    rng = random.Random(seed)
+    return [
+        Link(
+            rng.choice(nodes),
+            rng.choice(nodes),
+            is_directed,
+            rng.randint(1, 3) if is_weighted else None,
+        )
+        for _ in range(count)
+    ]
+
+
+def assert_same_storage(adjacency, expected, nodes):
+    assert adjacency.nodes == expected.nodes
+    assert adjacency.links == expected.links
+    assert (adjacency.order, adjacency.size) == (expected.order, expected.size)
+    for node in nodes:
+        assert adjacency.get_neighbourhood(node) == expected.get_neighbourhood(node)
+        assert adjacency.get_predecessors(node) == expected.get_predecessors(node)
+        assert adjacency.get_incident_links(node) == expected.get_incident_links(node)
+        assert adjacency.get_degree(node) == expected.get_degree(node)
+        for other in nodes:
+            assert adjacency.find_link(node, other) == expected.find_link(node, other)
+
+
+def test_bit_helpers():
+    words = np.array([0b1011, 1 << 63], dtype=np.uint64)
+    assert popcount(words) == 4
+    assert popcount(np.array([words, words])).tolist() == [4, 4]
+    assert bit_indices(words).tolist() == [0, 1, 3, 127]
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_adjacency_index(is_directed, seed):
+    nodes = [Node() for _ in range(90)]
+    # Some link endpoints are not graph nodes
+    links = get_random_links(nodes, is_directed, 400, seed, is_weighted=True)
+    bitset = BitsetAdjacency.from_links(nodes[:80], links, is_directed)
+    expected = AdjacencyIndex.from_links(nodes[:80], links, is_directed)
+    assert_same_storage(bitset, expected, nodes)
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+def test_mutations_match_adjacency_index(is_directed):
+    rng = random.Random(0)
+    nodes = [Node() for _ in range(70)]
+    bitset = BitsetAdjacency.from_links([], [], is_directed)
+    expected = AdjacencyIndex.from_links([], [], is_directed)
+    for link in get_random_links(nodes, is_directed, 300, 1, is_weighted=True):
+        bitset.add_link(link)
+        expected.add_link(link)
+    assert len(bitset.rows) == 128
+    for link in rng.sample(sorted(expected.links, key=str), 50):
+        bitset.remove_link(link)
+        expected.remove_link(link)
+    for node in rng.sample(nodes, 10):
+        bitset.remove_node(node)
+        expected.remove_node(node)
+    bitset.add_node(nodes[0])
+    expected.add_node(nodes[0])
+    assert_same_storage(bitset, expected, nodes)
+    with pytest.raises(InvalidMutationException):
+        bitset.remove_link(Link(nodes[0], nodes[1], is_directed, 9))
+    with pytest.raises(InvalidMutationException):
+        bitset.add_link(Link(nodes[0], nodes[1], not is_directed))
+
+
+def test_mutations_update_versions():
+    n1, n2 = Node(), Node()
+    adjacency = BitsetAdjacency.from_links([n1], [], True)
+    adjacency.add_link(Link(n1, n2, True, 2))
+    versions = adjacency.node_version, adjacency.link_version
+    adjacency.add_link(Link(n1, n2, True, 2))
+    assert (adjacency.node_version, adjacency.link_version) == versions
+    adjacency.add_link(Link(n1, n2, True, 1))
+    assert adjacency.link_version == versions[1] + 1
+    assert adjacency.links == {Link(n1, n2, True, 1)}
+
+
+@pytest.mark.parametrize("is_weighted", [True, False])
+def test_to_csr(is_weighted):
+    nodes = [Node(i) for i in range(20)]
+    links = get_random_links(nodes + [Node(99)], True, 60, 0, is_weighted)
+    bitset = BitsetAdjacency.from_links(nodes, links, True)
+    csr = bitset.to_csr()
+    expected = CSRAdjacency.from_links(nodes, links, True)
+    assert csr.links == expected.links
+    assert csr.nodes == expected.nodes
+    assert csr.node_ids.tolist() == expected.node_ids.tolist()
+
+
+def brute_force_triangles(graph, nodes):
+    return sum(
+        all(
+            graph.find_link(i, j) or graph.find_link(j, i)
+            for i, j in combinations(triple, 2)
+        )
+        for triple in combinations(nodes, 3)
+    )
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+def test_dense_operations(adjacency_class, is_directed):
+    nodes = [Node() for _ in range(16)]
+    links = get_random_links(nodes, is_directed, 70, 2)
+    graph = Graph(nodes[:14], links, adjacency_class)
+    members = nodes[:14]
+    assert graph.count_triangles() == brute_force_triangles(graph, members)
+    for node_1, node_2 in combinations(nodes, 2):
+        common = graph.get_neighbourhood(node_1) & graph.get_neighbourhood(node_2)
+        assert graph.get_common_neighbours(node_1, node_2) == common
+        assert graph.count_common_neighbours(node_1, node_2) == len(common)
+    for triple in combinations(members[:8], 3):
+        assert graph.is_clique(triple) == brute_force_triangles(graph, triple)
+
+
+def test_count_triangles_on_many_nodes():
+    # Keys packing two node indices overflow int32 past 46340 nodes
+    n = 2**16 + 10
+    rng = np.random.default_rng(0)
+    touched = rng.choice(n, 30, replace=False)
+    sources, targets = rng.choice(touched, (2, 120))
+    graph = Graph.from_numpy(sources, targets, False, np.arange(n))
+    nodes = [Node(int(i)) for i in touched]
+    assert graph.count_triangles() == brute_force_triangles(graph, nodes) > 0
+
+
+def test_is_clique(complete_graph, line_graph, nodes):
+    assert complete_graph.is_clique(nodes)
+    assert complete_graph.is_clique([])
+    assert not complete_graph.is_clique(nodes + [Node()])
+    assert line_graph.is_clique(nodes[:2])
+    assert not line_graph.is_clique(nodes[:3])
+    assert complete_graph.count_triangles() == 10
+    assert line_graph.count_triangles() == 0
+
+
+def test_graph_chooses_bitset_for_dense_graphs():
+    nodes = [Node() for _ in range(64)]
+    dense = Graph(nodes, [Link(i, j) for i, j in combinations(nodes, 2)])
+    assert isinstance(dense.adjacency, BitsetAdjacency)
+    sparse = Graph(nodes, [Link(i, j) for i, j in zip(nodes, nodes[1:])])
+    assert isinstance(sparse.adjacency, AdjacencyIndex)
+    small = Graph(nodes[:10], [Link(i, j) for i, j in combinations(nodes[:10], 2)])
+    assert isinstance(small.adjacency, AdjacencyIndex)
+    chosen = Graph(nodes, [Link(nodes[0], nodes[1])], BitsetAdjacency)
+    assert isinstance(chosen.adjacency, BitsetAdjacency)
@@ -0,0 +1,42 @@
+def test_properties_are_cached(directed_graph):
+    chain = directed_graph.dependency_chain
+    misses = directed_graph.cache.misses
+    assert directed_graph.dependency_chain == chain
+    assert directed_graph.is_dag
+    assert directed_graph.cache.misses == misses
+    assert {"dependency_chain", "find_cycle"} <= directed_graph.cache.cached_names
+
+
+def test_cached_values_are_copied(directed_graph):
+    chain, levels = directed_graph.dependency_chain, directed_graph.dependency_levels
+    degrees = directed_graph.degree_sequence
+    components = directed_graph.connected_components
+    chain.clear()
+    levels[0].clear()
+    degrees.clear()
+    components.clear()
+    assert directed_graph.dependency_chain
+    assert all(directed_graph.dependency_levels)
+    assert directed_graph.degree_sequence
+    assert directed_graph.connected_components
+
+
+def test_version_changes_invalidate_dependents(line_graph):
+    line_graph.degree_sequence
+    line_graph.is_cyclic
+    line_graph.adjacency.node_version += 1
+    assert line_graph.cache.cached_names == {"find_cycle"}
+    line_graph.adjacency.link_version += 1
+    assert line_graph.cache.cached_names == set()
+    misses = line_graph.cache.misses
+    line_graph.degree_sequence
+    assert line_graph.cache.misses == misses + 2
+
+
+def test_clear_cache(complete_graph):
+    complete_graph.connected_components
+    complete_graph.is_eulerian
+    complete_graph.cache.clear("is_eulerian")
+    assert complete_graph.cache.cached_names == {"connected_components"}
+    complete_graph.clear_cache()
+    assert complete_graph.cache.cached_names == set()
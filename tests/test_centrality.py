@@ -0,0 +1,103 @@
+import random
+from collections import deque
+from itertools import product
+
+import numpy as np
+import pytest
+
+from graphs import Graph, Node, Link
+
+
+def count_shortest_paths(graph, source):
+    distances, counts = {source: 0}, {source: 1}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbour in graph.get_neighbourhood(node):
+            if neighbour not in distances:
+                distances[neighbour] = distances[node] + 1
+                counts[neighbour] = 0
+                queue.append(neighbour)
+            if distances[neighbour] == distances[node] + 1:
+                counts[neighbour] += counts[node]
+    return distances, counts
+
+
+def get_expected_betweenness(graph, nodes):
+    searches = {i: count_shortest_paths(graph, i) for i in nodes}
+    betweenness = {i: 0.0 for i in nodes}
+    for source, target, node in product(nodes, repeat=3):
+        distances, counts = searches[source]
+        if len({source, target, node}) < 3 or target not in distances:
+            continue
+        node_distances, node_counts = searches[node]
+        if (
+            node in distances
+            and target in node_distances
+            and distances[node] + node_distances[target] == distances[target]
+        ):
+            share = counts[node] * node_counts[target] / counts[target]
+            betweenness[node] += share
+    if not graph.is_directed:
+        betweenness = {i: j / 2 for i, j in betweenness.items()}
+    return betweenness
+
+
+def get_random_graph(adjacency_class, is_directed, seed, is_weighted=False):
+    rng = random.Random(seed)
+    nodes = [Node() for _ in range(9)]
+    links = [
+        Link(
+            rng.choice(nodes),
+            rng.choice(nodes),
+            is_directed,
+            rng.randint(1, 9) if is_weighted else None,
+        )
+        for _ in range(16)
+    ]
+    return Graph(nodes, links, adjacency_class), nodes
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+@pytest.mark.parametrize("seed", range(4))
+def test_betweenness_matches_path_counts(adjacency_class, is_directed, seed):
+    graph, nodes = get_random_graph(adjacency_class, is_directed, seed)
+    expected = get_expected_betweenness(graph, nodes)
+    positions = {j: i for i, j in enumerate(graph.node_ids.tolist())}
+    betweenness = graph.get_betweenness()
+    for node in nodes:
+        assert betweenness[positions[node.id]] == pytest.approx(expected[node])
+
+
+@pytest.mark.parametrize("is_weighted", [True, False])
+@pytest.mark.parametrize("is_directed", [True, False])
+def test_eccentricities_match_distances(adjacency_class, is_directed, is_weighted):
+    for seed in range(4):
+        graph, nodes = get_random_graph(adjacency_class, is_directed, seed, is_weighted)
+        distances = graph.get_distances(graph.node_ids)
+        assert graph.get_eccentricities().tolist() == distances.max(axis=1).tolist()
+
+
+def test_eccentricities_of_cycle():
+    n = 600
+    graph = Graph.from_numpy(np.arange(n), (np.arange(n) + 1) % n, is_directed=False)
+    assert graph.get_eccentricities().tolist() == [n // 2] * n
+    directed = Graph.from_numpy(np.arange(n), (np.arange(n) + 1) % n, True)
+    assert directed.get_eccentricities().tolist() == [n - 1] * n
+
+
+@pytest.mark.parametrize("is_weighted", [True, False])
+def test_workers_give_the_same_results(is_weighted):
+    rng = np.random.default_rng(0)
+    n = 300
+    weights = rng.integers(1, 5, 4 * n).astype(float) if is_weighted else None
+    graph = Graph.from_numpy(
+        rng.integers(0, n, 4 * n), rng.integers(0, n, 4 * n), False, weights=weights
+    )
+    sources = graph.node_ids[::3]
+    for method in [
+        lambda workers: graph.get_distances(sources, workers=workers),
+        lambda workers: graph.get_eccentricities(workers),
+        lambda workers: graph.get_betweenness(workers),
+    ]:
+        assert np.array_equal(method(1), method(2))
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from graphs import Graph, Node, Link
+from graphs.data_structures.csr import CSRAdjacency, component_labels
+from graphs.data_structures.union_find import UnionFind
+
+
+@pytest.fixture
+def named_nodes():
+    return [Node("a"), Node("b"), Node("c")]
+
+
+def test_round_trip_links(nodes, directed_links):
+    adjacency = CSRAdjacency.from_links(nodes, directed_links, True)
+    assert adjacency.links == set(directed_links)
+    assert adjacency.nodes == set(nodes)
+    assert adjacency.size == len(directed_links)
+
+
+def test_object_ids(named_nodes):
+    a, b, c = named_nodes
+    graph = Graph(named_nodes, [Link(a, b), Link(c, b)], CSRAdjacency)
+    assert graph.adjacency.node_ids.dtype == object
+    assert graph.get_neighbourhood(b) == {a, c}
+    assert graph.find_link(b, c) == Link(c, b)
+    assert not graph.is_in_graph(Node("d"))
+
+
+def test_endpoint_outside_nodes(named_nodes):
+    a, b, c = named_nodes
+    graph = Graph([a, b], [Link(a, b), Link(a, c)], CSRAdjacency)
+    assert graph.order == 2
+    assert graph.get_neighbourhood(a) == {b}
+    assert graph.find_link(a, c) == Link(a, c)
+    assert not graph.is_in_graph(c)
+
+
+def test_from_arrays_deduplicates():
+    adjacency = CSRAdjacency.from_arrays(
+        np.array([10, 20, 30]), np.array([0, 0, 1, 0]), np.array([1, 2, 2, 1]), True
+    )
+    np.testing.assert_array_equal(adjacency.indptr, [0, 2, 3, 3])
+    np.testing.assert_array_equal(adjacency.indices, [1, 2, 2])
+    np.testing.assert_array_equal(adjacency.reverse_indices, [0, 0, 1])
+    assert adjacency.find_link(Node(10), Node(20)) == Link(Node(10), Node(20), True)
+    assert adjacency.index_of(25) is None
+
+
+def test_component_labels_match_union_find():
+    rng = np.random.default_rng(0)
+    n = 200
+    sources, targets = rng.integers(0, n, 150), rng.integers(0, n, 150)
+    labels = component_labels(sources, targets, n)
+    components = UnionFind(range(n))
+    for i, j in zip(sources.tolist(), targets.tolist()):
+        components.union(i, j)
+    for group in components.groups:
+        assert {labels[i] for i in group} == {min(group)}
@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+import pytest
+
+from graphs import Graph, Node, Link
+
+
+def test_directed_degrees(directed_graph, nodes):
+    distribution = directed_graph.degree_distribution
+    degrees = dict(zip(distribution.nodes, distribution.out_degrees.tolist()))
+    assert degrees == {node: directed_graph.get_degree(node) for node in nodes}
+    in_degrees = dict(zip(distribution.nodes, distribution.in_degrees.tolist()))
+    assert in_degrees == dict(zip(nodes, [0, 1, 1, 1, 1]))
+    assert distribution.total_degrees.tolist() == [
+        i + j for i, j in zip(distribution.out_degrees, distribution.in_degrees)
+    ]
+    assert distribution.maximum("total") == 2
+    assert distribution.histogram("in").tolist() == [1, 4]
+    assert distribution.is_k_regular(1, "in") is False
+
+
+def test_undirected_degrees_count_neighbours_once(adjacency_class):
+    n1, n2, n3 = nodes = [Node(), Node(), Node()]
+    links = [Link(n1, n2), Link(n2, n1), Link(n2, n3), Link(n3, n3)]
+    graph = Graph(nodes, links, adjacency_class)
+    distribution = graph.degree_distribution
+    assert sorted(distribution.degrees.tolist()) == [1, 1, 2]
+    assert distribution.in_degrees.tolist() == distribution.out_degrees.tolist()
+    assert distribution.total_degrees.tolist() == distribution.degrees.tolist()
+    assert distribution.nodes_with_degree(2) == [n2]
+
+
+def test_degrees_skip_nodes_outside_the_graph(adjacency_class):
+    n1, n2, n3 = Node(), Node(), Node()
+    graph = Graph([n1, n2], [Link(n1, n2), Link(n2, n3)], adjacency_class)
+    assert graph.degree_distribution.degrees.tolist() == [1, 1]
+
+
+def test_histogram_and_percentile(line_graph):
+    distribution = line_graph.degree_distribution
+    assert distribution.histogram().tolist() == [0, 2, 3]
+    assert distribution.percentile(50) == 2
+    assert distribution.percentile([0, 100]).tolist() == [1, 2]
+    with pytest.raises(ValueError):
+        distribution.get_degrees("sideways")
+
+
+def test_assortativity(adjacency_class):
+    centre, *leaves = nodes = [Node() for _ in range(5)]
+    star = Graph(nodes, [Link(centre, leaf) for leaf in leaves], adjacency_class)
+    assert star.degree_distribution.assortativity() == pytest.approx(-1)
+    cycle = Graph(
+        nodes,
+        [Link(i, j) for i, j in zip(nodes, nodes[1:] + nodes[:1])],
+        adjacency_class,
+    )
+    assert math.isnan(cycle.degree_distribution.assortativity())
+
+
+def test_large_graph_degrees():
+    sources = np.arange(10**5)
+    graph = Graph.from_numpy(sources, (sources + 1) % 10**5, True)
+    assert graph.is_k_regular(1)
+    assert graph.degree_distribution.histogram("total").tolist() == [0, 0, 10**5]
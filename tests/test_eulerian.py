@@ -0,0 +1,125 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+from pytest_cases import parametrize_plus, fixture_ref
+
+from graphs import Graph, Node, Link, CSRAdjacency
+from tests.conftest import (
+    line_graph,
+    complete_graph,
+    disconnected_graph,
+    directed_graph,
+    cyclic_directed_graph,
+)
+
+
+def assert_is_trail(graph, path, is_circuit):
+    assert Counter(i.underlying_link for i in path) == Counter(graph.links)
+    for link_1, link_2 in zip(path, path[1:]):
+        assert link_1.node_2 == link_2.node_1
+    for i in path:
+        assert {i.node_1, i.node_2} == {*i.underlying_link.nodes}
+        if graph.is_directed:
+            assert i.node_1 == i.underlying_link.node_1
+    assert (path[0].node_1 == path[-1].node_2) == is_circuit
+
+
+@parametrize_plus(
+    "graph,expected_circuit,expected_path",
+    [
+        (fixture_ref(line_graph), False, True),
+        (fixture_ref(complete_graph), True, True),
+        (fixture_ref(disconnected_graph), False, False),
+        (fixture_ref(directed_graph), False, False),
+        (fixture_ref(cyclic_directed_graph), True, True),
+    ],
+)
+def test_eulerian_trails(graph, expected_circuit, expected_path):
+    assert graph.is_eulerian == expected_circuit
+    assert graph.has_eulerian_path == expected_path
+    circuit = graph.find_eulerian_circuit()
+    assert (circuit is not None) == expected_circuit
+    if circuit is not None:
+        assert_is_trail(graph, circuit, True)
+    path = graph.find_eulerian_path()
+    assert (path is not None) == expected_path
+    if path is not None:
+        assert_is_trail(graph, path, expected_circuit)
+
+
+def test_directed_balance(adjacency_class):
+    n1, n2, n3 = nodes = [Node(), Node(), Node()]
+    # Every node has an even number of links, but n1 has two out and none in
+    graph = Graph(
+        nodes,
+        [
+            Link(n1, n2, True),
+            Link(n1, n3, True),
+            Link(n2, n3, True),
+            Link(n3, n2, True),
+        ],
+        adjacency_class,
+    )
+    assert not graph.is_eulerian
+    assert not graph.has_eulerian_path
+
+
+def test_parallel_links_and_self_loops(adjacency_class):
+    n1, n2 = nodes = [Node(), Node()]
+    graph = Graph(nodes, [Link(n1, n2), Link(n2, n1), Link(n2, n2)], adjacency_class)
+    assert graph.is_eulerian
+    circuit = graph.find_eulerian_circuit()
+    assert len(circuit) == 3
+    assert_is_trail(graph, circuit, True)
+
+
+def test_graph_without_links():
+    no_links = np.array([], dtype=np.int64)
+    graph = Graph.from_numpy(no_links, no_links, False, np.arange(3))
+    assert graph.is_eulerian
+    assert graph.find_eulerian_circuit() == ()
+
+
+def test_eulerian_after_mutation(line_graph, nodes):
+    if isinstance(line_graph.adjacency, CSRAdjacency):
+        pytest.skip("CSR storage is read only")
+    assert not line_graph.is_eulerian
+    line_graph.add_link(Link(nodes[4], nodes[0]))
+    assert line_graph.is_eulerian
+    assert_is_trail(line_graph, line_graph.find_eulerian_circuit(), True)
+
+
+def test_long_circuit():
+    n = 10**5
+    sources = np.arange(n)
+    graph = Graph.from_numpy(
+        np.concatenate([sources, sources]),
+        np.concatenate([(sources + 1) % n, (sources + 2) % n]),
+        True,
+    )
+    circuit = graph.find_eulerian_circuit()
+    assert len(circuit) == 2 * n
+    assert circuit[0].node_1 == circuit[-1].node_2
+    node_ids = graph.find_eulerian_node_ids(circuit=True)
+    assert node_ids.tolist() == [circuit[0].node_1.id] + [i.node_2.id for i in circuit]
+
+
+def test_eulerian_node_ids(line_graph, nodes):
+    node_ids = line_graph.find_eulerian_node_ids()
+    expected = [i.id for i in nodes]
+    assert node_ids.tolist() in (expected, expected[::-1])
+    assert line_graph.find_eulerian_node_ids(circuit=True) is None
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+def test_weighted_links_kept(adjacency_class, is_directed):
+    n1, n2, n3 = Node(), Node(), Node()
+    links = [
+        Link(n1, n2, is_directed, 2.5),
+        Link(n2, n3, is_directed, 4.0),
+        Link(n3, n1, is_directed, 1.5),
+    ]
+    graph = Graph([n1, n2, n3], links, adjacency_class)
+    circuit = graph.find_eulerian_circuit()
+    assert {i.underlying_link for i in circuit} == set(links) == graph.links
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from benchmarks.suite import compare, run_suite
+from graphs import Graph, generators
+from graphs.data_structures.adjacency import AdjacencyIndex
+from graphs.data_structures.csr import CSRAdjacency
+
+
+def get_links(graph):
+    return {(i.node_1.id, i.node_2.id) for i in graph.links}
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+def test_erdos_renyi_graph(is_directed):
+    graph = Graph.from_base_graph(generators.erdos_renyi_graph(300, 0.1, is_directed))
+    pairs = 300 * 299 if is_directed else 300 * 299 // 2
+    assert graph.order == 300
+    assert abs(graph.size - 0.1 * pairs) < 5 * np.sqrt(0.1 * pairs)
+    assert all(i != j for i, j in get_links(graph))
+    if not is_directed:
+        assert all(i < j for i, j in get_links(graph))
+    full = generators.erdos_renyi_graph(20, 1.0, is_directed)
+    assert full.adjacency.size == (20 * 19 if is_directed else 190)
+
+
+@pytest.mark.parametrize(
+    "generate",
+    [
+        lambda seed, storage: generators.erdos_renyi_graph(
+            50, 0.2, True, seed, storage
+        ),
+        lambda seed, storage: generators.barabasi_albert_graph(
+            50, 3, False, seed, storage
+        ),
+        lambda seed, storage: generators.random_dag(50, 0.2, seed, storage),
+    ],
+)
+def test_generators_are_seeded(generate):
+    links = get_links(generate(1, CSRAdjacency))
+    assert links == get_links(generate(1, CSRAdjacency))
+    assert links == get_links(generate(1, AdjacencyIndex))
+    assert links != get_links(generate(2, CSRAdjacency))
+
+
+def test_barabasi_albert_graph():
+    graph = Graph.from_base_graph(generators.barabasi_albert_graph(500, 3))
+    assert graph.size == 3 * 497
+    assert graph.is_connected
+    # Early nodes gather links, so the degrees spread far beyond m
+    assert graph.maximum_degree > 20
+    assert graph.minimum_degree == 3
+
+
+def test_random_dag():
+    graph = Graph.from_base_graph(generators.random_dag(200, 0.05))
+    assert graph.is_dag
+    assert len(graph.dependency_chain) == 200
+
+
+def test_fixed_graphs():
+    grid = Graph.from_base_graph(generators.grid_graph(3, 4))
+    assert (grid.order, grid.size) == (12, 3 * 3 + 2 * 4)
+    assert sorted(grid.degree_sequence) == [2] * 4 + [3] * 6 + [4] * 2
+    complete = Graph.from_base_graph(generators.complete_graph(6, True))
+    assert complete.size == 30
+    path = Graph.from_base_graph(generators.path_graph(5, True))
+    assert get_links(path) == {(0, 1), (1, 2), (2, 3), (3, 4)}
+    assert generators.path_graph(1).adjacency.size == 0
+
+
+def test_benchmark_suite_compares_with_baseline():
+    results = run_suite([30], ["csr"], 1, ["degree_sequence", "is_cyclic"])
+    assert {i["benchmark"] for i in results["results"]} == {
+        "degree_sequence",
+        "is_cyclic",
+    }
+    slower = {
+        "results": [
+            {**i, "min_seconds": i["min_seconds"] + 1} for i in results["results"]
+        ]
+    }
+    comparisons = compare(slower, results, 0.5)
+    assert len(comparisons) == len(results["results"])
+    assert all(i["is_regression"] for i in comparisons)
+    assert not any(i["is_regression"] for i in compare(results, slower, 0.5))
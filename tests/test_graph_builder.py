@@ -1,9 +1,11 @@
 import re
 
+import numpy as np
 import pytest
 
 import graphs
-from graphs.exceptions import InvalidDictionaryException
+from graphs.data_structures.csr import CSRAdjacency
+from graphs.exceptions import InvalidDictionaryException, InvalidEdgesException
 
 
 @pytest.fixture
@@ -12,8 +14,9 @@ def bad_graph_dict():
 
 
 @pytest.fixture
-def line_graph_dict():
-    return {0: {1}, 1: {2}, 2: {3}, 3: {4}, 4: set()}
+def line_graph_dict(nodes):
+    ids = [node.id for node in nodes]
+    return {**{i: {j} for i, j in zip(ids, ids[1:])}, ids[-1]: set()}
 
 
 def test_incorrect_graph_dict(bad_graph_dict):
@@ -23,7 +26,61 @@ def test_incorrect_graph_dict(bad_graph_dict):
     assert re.match(".*Found node.*not present.*keys.*", str(exc.value)) is not None
 
 
-def test_matching_graphs(line_graph, line_graph_dict):
-    graph = graphs.Graph.from_graph_dictionary(line_graph_dict, False)
+def test_matching_graphs(line_graph, line_graph_dict, adjacency_class):
+    graph = graphs.Graph.from_graph_dictionary(line_graph_dict, False, adjacency_class)
     assert graph.nodes == line_graph.nodes
     assert graph.links == line_graph.links
+
+
+def test_from_edge_list(line_graph, nodes):
+    ids = [node.id for node in nodes]
+    graph = graphs.Graph.from_edge_list(zip(ids, ids[1:]), False)
+    assert isinstance(graph.adjacency, CSRAdjacency)
+    assert graph.nodes == line_graph.nodes
+    assert graph.links == line_graph.links
+
+
+def test_from_edge_list_mixed_ids():
+    graph = graphs.Graph.from_edge_list(
+        [(1, "a"), ("a", (2, 3))], True, [1, "a", (2, 3), 4]
+    )
+    assert graph.order == 4
+    assert graph.dependency_chain[-2:] == [graphs.Node("a"), graphs.Node(1)]
+
+
+def test_from_numpy():
+    graph = graphs.Graph.from_numpy(
+        np.array([10, 20, 10]), np.array([20, 30, 30]), True, np.arange(10, 50, 10)
+    )
+    assert graph.order == 4
+    assert graph.size == 3
+    assert graph.get_neighbourhood(graphs.Node(10)) == {
+        graphs.Node(20),
+        graphs.Node(30),
+    }
+    assert graph.get_degree(graphs.Node(40)) == 0
+
+
+@pytest.mark.parametrize(
+    "sources,targets,node_ids",
+    [
+        ([1, 2], [2, 5], [1, 2, 3]),
+        (["a"], [1], [1, 2]),
+        ([1, 2], [2], None),
+    ],
+)
+def test_invalid_numpy_edges(sources, targets, node_ids):
+    with pytest.raises(InvalidEdgesException):
+        graphs.Graph.from_numpy(np.array(sources), np.array(targets), True, node_ids)
+
+
+def test_from_coo():
+    graph = graphs.Graph.from_coo([0, 1, 2], [1, 2, 0], True, (4, 4))
+    assert graph.order == 4
+    assert graph.is_cyclic
+    assert graph.strongly_connected_components == {
+        frozenset(map(graphs.Node, [0, 1, 2])),
+        frozenset({graphs.Node(3)}),
+    }
+    with pytest.raises(InvalidEdgesException):
+        graphs.Graph.from_coo([0, -1], [1, 2], True)
@@ -1,8 +1,10 @@
-from itertools import combinations
+from itertools import combinations, permutations
 
+import pytest
 from pytest_cases import parametrize_plus, fixture_ref
 
-from graphs import Link, PathLink
+from graphs import Graph, Node, Link, PathLink
+from graphs.exceptions import ImmutableGraphException, InvalidMutationException
 from tests.conftest import (
     line_graph,
     complete_graph,
@@ -192,7 +194,7 @@ def test_is_path_possible(
         (fixture_ref(complete_graph), True, True, True, False),
         (fixture_ref(disconnected_graph), False, False, False, False),
         (fixture_ref(directed_graph), True, False, False, True),
-        (fixture_ref(cyclic_directed_graph), False, True, False, False),
+        (fixture_ref(cyclic_directed_graph), False, True, True, False),
     ],
 )
 def test_global_properties(
@@ -263,3 +265,243 @@ def test_directed_graph(directed_graph, nodes):
     path = directed_graph.get_paths(n2, n1)
     assert path.paths == []
     assert directed_graph.get_connected_component(n1) == set(nodes)
+
+
+@parametrize_plus(
+    "graph,node_1_index,node_2_index,expected_link_indices",
+    [
+        (fixture_ref(line_graph), 0, 1, (0, 1)),
+        (fixture_ref(line_graph), 1, 0, (0, 1)),
+        (fixture_ref(line_graph), 0, 2, None),
+        (fixture_ref(directed_graph), 0, 1, (0, 1)),
+        (fixture_ref(directed_graph), 1, 0, None),
+        (fixture_ref(cyclic_directed_graph), 2, 0, (2, 0)),
+    ],
+)
+def test_find_link(nodes, graph, node_1_index, node_2_index, expected_link_indices):
+    link = graph.find_link(nodes[node_1_index], nodes[node_2_index])
+    if expected_link_indices is None:
+        assert link is None
+    else:
+        i, j = expected_link_indices
+        assert link == Link(nodes[i], nodes[j], graph.is_directed)
+
+
+@parametrize_plus(
+    "graph",
+    [
+        fixture_ref(line_graph),
+        fixture_ref(complete_graph),
+        fixture_ref(disconnected_graph),
+        fixture_ref(directed_graph),
+        fixture_ref(cyclic_directed_graph),
+    ],
+)
+def test_shortest_paths_match_path_enumeration(nodes, graph):
+    for node_1, node_2 in permutations(nodes, 2):
+        report = graph.get_paths(node_1, node_2)
+        shortest = graph.get_shortest_path(node_1, node_2)
+        assert shortest.is_possible == report.is_possible
+        assert graph.is_reachable(node_1, node_2) == report.is_possible
+        assert shortest.distance == report.distance
+        assert len(shortest.paths) == min(1, len(report.paths))
+        assert set(graph.iter_paths(node_1, node_2)) == set(report.paths)
+
+
+def test_shortest_path_links(line_graph, nodes):
+    path = line_graph.get_shortest_path(nodes[3], nodes[1]).paths[0]
+    assert [i.node_1 for i in path] == [nodes[3], nodes[2]]
+    assert [i.underlying_link for i in path] == [
+        Link(nodes[2], nodes[3]),
+        Link(nodes[1], nodes[2]),
+    ]
+    assert line_graph.get_shortest_path(nodes[0], nodes[0]).distance == 0
+
+
+def test_iter_paths_max_length(complete_graph, nodes):
+    paths = complete_graph.iter_paths(nodes[0], nodes[1], max_length=2)
+    assert sorted(len(i) for i in paths) == [1, 2, 2, 2]
+    assert next(complete_graph.iter_paths(nodes[0], nodes[1]))[-1].node_2 == nodes[1]
+
+
+@parametrize_plus(
+    "graph,expected_cycle_length",
+    [
+        (fixture_ref(line_graph), None),
+        (fixture_ref(complete_graph), 3),
+        (fixture_ref(disconnected_graph), None),
+        (fixture_ref(directed_graph), None),
+        (fixture_ref(cyclic_directed_graph), 3),
+    ],
+)
+def test_find_cycle(graph, expected_cycle_length):
+    cycle = graph.find_cycle()
+    if expected_cycle_length is None:
+        assert cycle is None
+    else:
+        assert len(cycle) == expected_cycle_length
+        assert cycle[0].node_1 == cycle[-1].node_2
+        assert all(i.node_2 == j.node_1 for i, j in zip(cycle, cycle[1:]))
+        assert all(i.underlying_link in graph.links for i in cycle)
+
+
+def test_cycle_of_parallel_links(nodes, adjacency_class):
+    n1, n2, *_ = nodes
+    assert Graph(
+        nodes, [Link(n1, n2, True), Link(n2, n1, True)], adjacency_class
+    ).is_cyclic
+    assert Graph(nodes, [Link(n1, n2), Link(n2, n1)], adjacency_class).is_cyclic
+    assert not Graph(nodes, [Link(n1, n2)], adjacency_class).is_cyclic
+
+
+def test_deep_graph_cycle_detection(adjacency_class):
+    deep_nodes = [Node(i) for i in range(5000)]
+    links = [Link(i, j, True) for i, j in zip(deep_nodes, deep_nodes[1:])]
+    graph = Graph(deep_nodes, links, adjacency_class)
+    assert graph.is_dag
+    links.append(Link(deep_nodes[-1], deep_nodes[0], True))
+    graph = Graph(deep_nodes, links, adjacency_class)
+    assert len(graph.find_cycle()) == 5000
+
+
+@parametrize_plus(
+    "graph,expected_levels",
+    [
+        (fixture_ref(line_graph), []),
+        (fixture_ref(directed_graph), [{2, 4}, {1, 3}, {0}]),
+        (fixture_ref(cyclic_directed_graph), []),
+    ],
+)
+def test_dag_dependency_levels(nodes, graph, expected_levels):
+    levels = graph.dependency_levels
+    assert [set(i) for i in levels] == [{nodes[j] for j in i} for i in expected_levels]
+    assert list(graph.iter_dependency_chain()) == graph.dependency_chain
+
+
+def test_dependency_chain_predecessors(directed_graph, nodes):
+    assert directed_graph.neighbouring_graph_properties.get_predecessors(nodes[1]) == {
+        nodes[0]
+    }
+    assert (
+        directed_graph.neighbouring_graph_properties.get_predecessors(nodes[0]) == set()
+    )
+
+
+@parametrize_plus(
+    "graph,expected_components",
+    [
+        (fixture_ref(line_graph), [{0, 1, 2, 3, 4}]),
+        (fixture_ref(disconnected_graph), [{0, 1}, {2, 3}, {4}]),
+        (fixture_ref(directed_graph), [{0}, {1}, {2}, {3}, {4}]),
+        (fixture_ref(cyclic_directed_graph), [{0, 1, 2}, {3}, {4}]),
+    ],
+)
+def test_strongly_connected_components(nodes, graph, expected_components):
+    assert graph.strongly_connected_components == {
+        frozenset(nodes[i] for i in component) for component in expected_components
+    }
+
+
+def test_weakly_connected_components(nodes, adjacency_class):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n3, True), Link(n2, n3, True)], adjacency_class)
+    assert graph.connected_components == {
+        frozenset({n1, n2, n3}),
+        frozenset({n4}),
+        frozenset({n5}),
+    }
+    assert graph.get_connected_component(n1) == {n1, n3}
+
+
+def test_add_and_remove_links(nodes):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n2), Link(n2, n3)])
+    assert graph.get_degree(n2) == 2
+    assert graph.connected_components == {
+        frozenset({n1, n2, n3}),
+        frozenset({n4}),
+        frozenset({n5}),
+    }
+    graph.add_link(Link(n3, n4))
+    assert graph.get_degree(n3) == 2 and graph.get_degree(n4) == 1
+    assert graph.are_connected(n1, n4)
+    assert graph.connected_components == {frozenset({n1, n2, n3, n4}), frozenset({n5})}
+    graph.remove_link(Link(n2, n3))
+    assert graph.get_degree(n2) == 1
+    assert not graph.are_connected(n1, n4)
+    assert graph.connected_components == {
+        frozenset({n1, n2}),
+        frozenset({n3, n4}),
+        frozenset({n5}),
+    }
+    assert sorted(graph.degree_sequence) == [0, 1, 1, 1, 1]
+
+
+def test_remove_link_keeps_cycle_connected(nodes):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n2), Link(n2, n3), Link(n3, n1), Link(n3, n4)])
+    assert graph.is_cyclic
+    graph.remove_link(Link(n1, n2))
+    assert not graph.is_cyclic
+    assert graph.are_connected(n1, n2)
+    graph.remove_link(Link(n3, n4))
+    assert not graph.are_connected(n1, n4)
+
+
+def test_remove_directed_link_keeps_reverse_link(nodes):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n2, True), Link(n2, n1, True)])
+    graph.remove_link(Link(n1, n2, True))
+    assert graph.are_connected(n1, n2)
+    assert graph.get_degree(n1) == 0 and graph.get_degree(n2) == 1
+
+
+def test_add_and_remove_nodes(nodes):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n2), Link(n2, n3)])
+    assert graph.connected_components
+    n6 = Node()
+    graph.add_link(Link(n3, n6))
+    assert graph.is_in_graph(n6) and graph.order == 6
+    assert graph.are_connected(n1, n6)
+    graph.remove_node(n2)
+    assert not graph.is_in_graph(n2)
+    assert graph.size == 1
+    assert graph.get_degree(n1) == 0
+    assert graph.connected_components == {
+        frozenset({n1}),
+        frozenset({n3, n6}),
+        frozenset({n4}),
+        frozenset({n5}),
+    }
+
+
+def test_invalid_mutations(nodes):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n2)])
+    with pytest.raises(InvalidMutationException):
+        graph.remove_link(Link(n2, n3))
+    with pytest.raises(InvalidMutationException):
+        graph.add_link(Link(n2, n3, True))
+    with pytest.raises(InvalidMutationException):
+        graph.remove_node(Node())
+
+
+def test_rejected_link_changes_nothing(adjacency_class):
+    n1, n2, n3, n4 = Node(), Node(), Node(), Node()
+    graph = Graph([n1, n2], [Link(n1, n2)], adjacency_class)
+    versions = graph.adjacency.node_version, graph.adjacency.link_version
+    with pytest.raises(InvalidMutationException):
+        graph.add_link(Link(n3, n4, True))
+    assert graph.nodes == {n1, n2}
+    assert graph.connected_components == {frozenset({n1, n2})}
+    assert (graph.adjacency.node_version, graph.adjacency.link_version) == versions
+
+
+def test_csr_graph_is_immutable(nodes):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph.from_edge_list([(1, 2)], False)
+    with pytest.raises(ImmutableGraphException):
+        graph.add_link(Link(Node(1), Node(3)))
+    with pytest.raises(ImmutableGraphException):
+        graph.remove_node(Node(1))
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.import_time import get_lazy_modules_loaded
+
+SCRIPT = """
+import sys
+import graphs
+graph = graphs.Graph.from_edge_list([(1, 2), (2, 3)], is_directed=True)
+graph.get_shortest_path(graphs.Node(1), graphs.Node(3))
+graph.degree_sequence
+print(",".join(sys.modules))
+graph.plot_graph()
+print(",".join(sys.modules))
+"""
+
+
+def test_matplotlib_loads_on_first_plot():
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "MPLBACKEND": "Agg"},
+    ).stdout.splitlines()
+    before_plot, after_plot = (set(i.split(",")) for i in output)
+    assert get_lazy_modules_loaded(before_plot) == []
+    assert "matplotlib" in get_lazy_modules_loaded(after_plot)
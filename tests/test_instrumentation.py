@@ -0,0 +1,117 @@
+import json
+import threading
+
+import pytest
+
+from graphs import instrumentation
+from graphs.instrumentation import instrument, span, count, record_size
+
+
+def test_nothing_recorded_when_disabled(line_graph, nodes):
+    assert not instrumentation.is_enabled()
+    with instrument() as stats:
+        pass
+    line_graph.get_paths(nodes[0], nodes[-1])
+    assert stats.as_dict() == {"calls": {}, "seconds": {}, "sizes": {}}
+
+
+def test_get_paths_stats(line_graph, nodes):
+    with instrument() as stats:
+        report = line_graph.get_paths(nodes[0], nodes[-1])
+    assert not instrumentation.is_enabled()
+    assert stats.calls["get_paths"] == 1
+    assert stats.seconds["get_paths"] > 0
+    assert stats.sizes["get_paths.paths"].total == len(report.paths) == 1
+    assert stats.sizes["enumerate_paths.frontier"].count == len(nodes) - 1
+    assert stats.sizes["enumerate_paths.trie"].maximum == len(nodes) - 1
+
+
+def test_neighbourhood_steps_counted(line_graph, nodes):
+    with instrument() as stats:
+        line_graph.is_reachable(nodes[0], nodes[-1])
+        line_graph.find_link(nodes[0], nodes[1])
+    assert stats.calls["get_neighbourhood"] >= len(nodes) - 1
+    assert stats.calls["find_link"] == 1
+    assert stats.seconds["is_reachable"] >= stats.seconds["get_neighbourhood"] > 0
+
+
+def test_search_sizes(line_graph, nodes):
+    with instrument() as stats:
+        line_graph.get_shortest_path(nodes[0], nodes[-1])
+        line_graph.get_dijkstra_path(nodes[0], nodes[-1])
+        line_graph.get_distances([nodes[0]], [nodes[-1]])
+    assert stats.sizes["breadth_first_search.reached"].maximum == len(nodes)
+    assert stats.sizes["dijkstra.reached"].maximum == len(nodes)
+    assert stats.sizes["multi_source_bfs.frontier"].count > 0
+
+
+def test_cache_hits_counted(complete_graph):
+    with instrument() as stats:
+        complete_graph.connected_components
+        complete_graph.connected_components
+    assert stats.calls["connected_components"] == 2
+    assert stats.calls["cache.misses"] == 1
+    assert stats.calls["cache.hits"] == 1
+
+
+def test_callback_gets_each_query(line_graph, nodes):
+    queries = []
+    with instrument(callback=lambda name, stats: queries.append((name, stats))):
+        line_graph.get_shortest_path(nodes[0], nodes[2])
+        line_graph.is_reachable(nodes[0], nodes[-1])
+    assert [name for name, _ in queries] == ["get_shortest_path", "is_reachable"]
+    shortest_path, reachable = (stats for _, stats in queries)
+    assert shortest_path.calls["get_shortest_path"] == 1
+    assert "is_reachable" not in shortest_path.calls
+    assert reachable.sizes["breadth_first_search.reached"].total == len(nodes)
+    json.dumps(reachable.as_dict())
+
+
+def test_nested_contexts():
+    with instrument() as outer:
+        count("a")
+        with instrument() as inner:
+            count("a", 2)
+            record_size("b", 3)
+        count("a")
+    assert outer.calls["a"] == 4
+    assert inner.calls["a"] == 2
+    assert outer.sizes["b"].maximum == inner.sizes["b"].maximum == 3
+
+
+def test_spans_nest_into_one_query():
+    queries = []
+    with instrument(callback=lambda name, stats: queries.append(name)) as stats:
+        with span("outer"):
+            with span("inner"):
+                pass
+            with span("inner"):
+                pass
+    assert queries == ["outer"]
+    assert stats.calls == {"outer": 1, "inner": 2}
+    assert stats.seconds["outer"] >= stats.seconds["inner"]
+
+
+def test_span_recorded_when_raising():
+    with instrument() as stats:
+        with pytest.raises(ValueError):
+            with span("failing"):
+                raise ValueError
+    assert stats.calls["failing"] == 1
+
+
+def test_other_threads_not_recorded(line_graph, nodes):
+    started, finished = threading.Event(), threading.Event()
+
+    def query():
+        started.wait()
+        line_graph.get_shortest_path(nodes[0], nodes[-1])
+        finished.set()
+
+    thread = threading.Thread(target=query)
+    thread.start()
+    with instrument() as stats:
+        started.set()
+        finished.wait()
+    thread.join()
+    assert not stats.calls
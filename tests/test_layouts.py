@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from graphs.layouts import (
+    LAYOUTS,
+    SPECTRAL,
+    FORCE_DIRECTED,
+    get_layout,
+    spectral_layout,
+)
+from graphs import layouts
+
+
+def get_grid_links(side):
+    indices = np.arange(side * side).reshape(side, side)
+    sources = np.concatenate([indices[:, :-1].ravel(), indices[:-1].ravel()])
+    targets = np.concatenate([indices[:, 1:].ravel(), indices[1:].ravel()])
+    return side * side, sources, targets
+
+
+@pytest.mark.parametrize("method", LAYOUTS)
+@pytest.mark.parametrize("n", [0, 1, 2, 5])
+def test_layouts_fit_in_square(method, n):
+    sources, targets = np.arange(n - 1), np.arange(1, n)
+    positions = get_layout(method, n, sources, targets)
+    assert positions.shape == (n, 2)
+    assert np.isfinite(positions).all()
+    assert (np.abs(positions) <= 1 + 1e-9).all()
+
+
+def test_unknown_layout():
+    with pytest.raises(ValueError):
+        get_layout("random", 2, np.array([0]), np.array([1]))
+
+
+def test_spectral_layout_orders_a_path():
+    n = 30
+    positions = spectral_layout(n, np.arange(n - 1), np.arange(1, n))
+    steps = np.diff(positions[:, 0])
+    assert (steps > 0).all() or (steps < 0).all()
+
+
+@pytest.mark.parametrize("method", [SPECTRAL, FORCE_DIRECTED])
+@pytest.mark.parametrize("is_large", [False, True])
+def test_linked_nodes_are_placed_close(monkeypatch, method, is_large):
+    if is_large:
+        # Take the iterative and grid approximations used for large graphs
+        monkeypatch.setattr(layouts, "MAX_DENSE_SPECTRAL_NODES", 10)
+        monkeypatch.setattr(layouts, "MAX_EXACT_REPULSION_NODES", 10)
+    n, sources, targets = get_grid_links(12)
+    positions = get_layout(method, n, sources, targets, seed=1)
+    link_lengths = np.linalg.norm(positions[sources] - positions[targets], axis=1)
+    pairs = np.linalg.norm(positions[:, np.newaxis] - positions, axis=2)
+    assert link_lengths.mean() < pairs.mean() / 3
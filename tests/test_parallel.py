@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from graphs import parallel
+from graphs.parallel import SharedArrays, get_chunks, get_workers, run_chunks
+
+
+def square_task(arrays, index, start, end):
+    arrays["squares"][start:end] = arrays["values"][start:end] ** 2
+    arrays["chunks"][start:end] = index
+
+
+@pytest.mark.parametrize("workers", [1, 3, None])
+def test_run_chunks_fills_outputs(workers):
+    values = np.arange(100)
+    outputs = {"squares": np.zeros(100, dtype=np.int64), "chunks": np.zeros(100)}
+    run_chunks(square_task, {"values": values}, outputs, get_chunks(100, 7), workers)
+    assert outputs["squares"].tolist() == (values**2).tolist()
+    assert outputs["chunks"].tolist() == (values // 7).tolist()
+
+
+def test_runs_in_process_without_shared_memory(monkeypatch):
+    monkeypatch.setattr(parallel, "HAS_SHARED_MEMORY", False)
+    monkeypatch.setattr(parallel, "SharedArrays", None)
+    values = np.arange(20)
+    outputs = {"squares": np.zeros(20, dtype=np.int64), "chunks": np.zeros(20)}
+    run_chunks(square_task, {"values": values}, outputs, get_chunks(20, 7), 3)
+    assert outputs["squares"].tolist() == (values**2).tolist()
+
+
+def test_get_chunks():
+    assert get_chunks(5, 2) == [(0, 2), (2, 4), (4, 5)]
+    assert get_chunks(0, 2) == []
+    assert get_workers(0) == 1
+    assert get_workers(None) >= 1
+
+
+def test_shared_arrays_are_freed():
+    shared_memory = pytest.importorskip("multiprocessing.shared_memory")
+    with SharedArrays({"values": np.arange(10), "empty": np.zeros(0)}) as shared:
+        assert shared.arrays["values"].tolist() == list(range(10))
+        names = [i[0] for i in shared.specs.values()]
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
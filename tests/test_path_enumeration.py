@@ -0,0 +1,138 @@
+import random
+from itertools import permutations
+
+import pytest
+
+from graphs import Graph, Node, Link
+from graphs.exceptions import PathLimitException
+from graphs.path_enumeration import TRIE_ENTRY_BYTES
+
+
+def get_random_graph(adjacency_class, is_directed, seed):
+    rng = random.Random(seed)
+    nodes = [Node() for _ in range(7)]
+    links = [Link(rng.choice(nodes), rng.choice(nodes), is_directed) for _ in range(14)]
+    return Graph(nodes, links, adjacency_class), nodes
+
+
+def to_node_paths(paths):
+    return sorted([path[0].node_1.id] + [i.node_2.id for i in path] for path in paths)
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_depth_first_paths(adjacency_class, is_directed, seed):
+    graph, nodes = get_random_graph(adjacency_class, is_directed, seed)
+    for node_1, node_2 in permutations(nodes, 2):
+        paths = list(graph.iter_paths(node_1, node_2, shortest_first=True))
+        assert to_node_paths(paths) == to_node_paths(graph.iter_paths(node_1, node_2))
+        assert [len(i) for i in paths] == sorted(len(i) for i in paths)
+        for path in paths:
+            for step, next_step in zip(path, path[1:]):
+                assert step.node_2 == next_step.node_1
+            for step in path:
+                link = step.underlying_link
+                assert {link.node_1, link.node_2} == {step.node_1, step.node_2}
+
+
+def test_max_length(complete_graph, nodes):
+    paths = list(
+        complete_graph.iter_paths(nodes[0], nodes[1], max_length=2, shortest_first=True)
+    )
+    assert [len(i) for i in paths] == [1, 2, 2, 2]
+    expected = complete_graph.iter_paths(nodes[0], nodes[1], max_length=3)
+    paths = complete_graph.iter_paths(
+        nodes[0], nodes[1], max_length=3, shortest_first=True
+    )
+    assert to_node_paths(paths) == to_node_paths(expected)
+
+
+def test_max_paths_stops_early(complete_graph, nodes):
+    paths = list(
+        complete_graph.iter_paths(nodes[0], nodes[1], max_paths=3, shortest_first=True)
+    )
+    assert [len(i) for i in paths] == [1, 2, 2]
+    assert (
+        len(list(complete_graph.iter_paths(nodes[0], nodes[1], shortest_first=True)))
+        == 16
+    )
+
+
+def test_depth_first_limits(complete_graph, nodes):
+    paths = complete_graph.iter_paths(nodes[0], nodes[1], max_paths=5)
+    assert len(list(paths)) == 5
+    with pytest.raises(ValueError):
+        complete_graph.iter_paths(nodes[0], nodes[1], max_memory=10**6)
+
+
+def test_max_memory(complete_graph, nodes):
+    with pytest.raises(PathLimitException):
+        list(
+            complete_graph.iter_paths(
+                nodes[0], nodes[1], max_memory=0, shortest_first=True
+            )
+        )
+    # The first level of three partial paths is over the limit of two entries
+    paths = complete_graph.iter_paths(
+        nodes[0], nodes[1], max_memory=2 * TRIE_ENTRY_BYTES, shortest_first=True
+    )
+    assert len(next(paths)) == 1
+    with pytest.raises(PathLimitException):
+        list(paths)
+    paths = complete_graph.iter_paths(
+        nodes[0], nodes[1], max_memory=16 * TRIE_ENTRY_BYTES, shortest_first=True
+    )
+    assert len(list(paths)) == 16
+
+
+def test_dead_ends_not_stored(adjacency_class):
+    # Paths into the long tail off node 0 can never reach node 2
+    tail = [(i, i + 1) for i in range(3, 50)]
+    graph = Graph.from_graph_dictionary(
+        {0: {1, 3}, 1: {2}, 2: set(), **{i: {j} for i, j in tail}, 50: set()},
+        is_directed=True,
+        adjacency_class=adjacency_class,
+    )
+    paths = graph.iter_paths(
+        Node(0), Node(2), max_memory=3 * TRIE_ENTRY_BYTES, shortest_first=True
+    )
+    assert to_node_paths(paths) == [[0, 1, 2]]
+
+
+def test_no_paths(directed_graph, nodes):
+    assert (
+        list(directed_graph.iter_paths(nodes[1], nodes[0], shortest_first=True)) == []
+    )
+    assert (
+        list(directed_graph.iter_paths(nodes[0], nodes[0], shortest_first=True)) == []
+    )
+    assert list(directed_graph.iter_paths(nodes[0], Node(), shortest_first=True)) == []
+    assert (
+        list(
+            directed_graph.iter_paths(
+                nodes[0], nodes[2], max_length=1, shortest_first=True
+            )
+        )
+        == []
+    )
+
+
+def test_two_way_links_give_simple_paths():
+    n1, n2, n3 = Node(), Node(), Node()
+    links = [Link(n1, n2, True), Link(n2, n1, True), Link(n1, n3, True)]
+    graph = Graph([n1, n2, n3], links)
+    assert to_node_paths(graph.get_paths(n2, n3).paths) == [[n2.id, n1.id, n3.id]]
+
+
+def test_negative_weights():
+    n1, n2 = Node(), Node()
+    graph = Graph([n1, n2], [Link(n1, n2, weight=-1.0)])
+    assert graph.get_paths(n1, n2).distance == -1.0
+
+
+def test_view(complete_graph, nodes):
+    view = complete_graph.subgraph_view(nodes[:3])
+    assert to_node_paths(view.iter_paths(nodes[0], nodes[1], shortest_first=True)) == [
+        [nodes[0].id, nodes[1].id],
+        [nodes[0].id, nodes[2].id, nodes[1].id],
+    ]
@@ -1,4 +1,7 @@
 import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.collections import LineCollection, PolyCollection
 from pytest_cases import parametrize_plus, fixture_ref
 
 from tests.conftest import (
@@ -8,6 +11,8 @@ from tests.conftest import (
     directed_graph,
     cyclic_directed_graph,
 )
+from graphs import Graph
+from graphs.layouts import LAYOUTS
 
 
 @parametrize_plus(
@@ -23,3 +28,29 @@ from tests.conftest import (
 def test_graph_plot(graph,):
     res = graph.plot_graph()
     assert isinstance(res, plt.Figure)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_plot_draws_one_artist_per_kind(layout):
+    rng = np.random.default_rng(0)
+    graph = Graph.from_numpy(rng.integers(0, 50, 200), rng.integers(0, 50, 200), True)
+    figure = graph.plot_graph(layout)
+    _, lines, heads = figure.axes[0].collections
+    assert isinstance(lines, LineCollection)
+    assert isinstance(heads, PolyCollection)
+    assert len(lines.get_segments()) == graph.size
+    assert not lines.get_rasterized()
+    plt.close(figure)
+
+
+def test_plot_downsamples_and_rasterises(directed_graph):
+    figure = directed_graph.plot_graph(max_links=2, rasterized=True)
+    lines = figure.axes[0].collections[1]
+    assert len(lines.get_segments()) == 2
+    assert lines.get_rasterized()
+    plt.close(figure)
+
+
+def test_get_layout_lines_up_with_node_ids(line_graph):
+    positions = line_graph.get_layout("spectral")
+    assert positions.shape == (len(line_graph.node_ids), 2)
@@ -0,0 +1,88 @@
+import random
+from itertools import product
+
+import numpy as np
+import pytest
+
+from graphs import Graph, Node, Link
+from graphs.reachability import (
+    CLOSURE,
+    INTERVALS,
+    ReachabilityIndex,
+    strongly_connected_labels,
+)
+
+
+def get_random_graph(adjacency_class, is_directed, seed):
+    rng = random.Random(seed)
+    nodes = [Node() for _ in range(12)]
+    links = [Link(rng.choice(nodes), rng.choice(nodes), is_directed) for _ in range(14)]
+    return Graph(nodes, links, adjacency_class), nodes
+
+
+@pytest.mark.parametrize("method", [CLOSURE, INTERVALS])
+@pytest.mark.parametrize("is_directed", [True, False])
+@pytest.mark.parametrize("seed", range(5))
+def test_index_matches_search(adjacency_class, method, is_directed, seed):
+    graph, nodes = get_random_graph(adjacency_class, is_directed, seed)
+    index = ReachabilityIndex(graph, method)
+    nodes_1, nodes_2 = zip(*product(nodes, nodes))
+    expected = [graph.is_reachable(i, j) for i, j in zip(nodes_1, nodes_2)]
+    assert [index.is_reachable(i, j) for i, j in zip(nodes_1, nodes_2)] == expected
+    assert index.batch_is_reachable(nodes_1, nodes_2).tolist() == expected
+
+
+def test_index_on_large_dag():
+    rng = np.random.default_rng(0)
+    n = 3000
+    sources, targets = rng.integers(0, n, 4000), rng.integers(0, n, 4000)
+    graph = Graph.from_numpy(
+        np.minimum(sources, targets), np.maximum(sources, targets), True
+    )
+    closure, intervals = ReachabilityIndex(graph, CLOSURE), ReachabilityIndex(
+        graph, INTERVALS
+    )
+    nodes_1, nodes_2 = rng.choice(graph.node_ids, 5000), rng.choice(
+        graph.node_ids, 5000
+    )
+    expected = graph.batch_is_reachable(nodes_1, nodes_2)
+    assert expected.any()
+    assert closure.batch_is_reachable(nodes_1, nodes_2).tolist() == expected.tolist()
+    assert intervals.batch_is_reachable(nodes_1, nodes_2).tolist() == expected.tolist()
+
+
+def test_method_chosen_by_memory(line_graph):
+    assert ReachabilityIndex(line_graph).method == CLOSURE
+    assert ReachabilityIndex(line_graph, max_closure_bytes=0).method == INTERVALS
+    with pytest.raises(ValueError):
+        ReachabilityIndex(line_graph, "matrix")
+
+
+def test_nodes_outside_graph_reach_nothing(nodes):
+    n1, n2, n3, n4, _ = nodes
+    graph = Graph([n1, n2], [Link(n1, n2, True)])
+    index = graph.reachability_index
+    assert index.is_reachable(n1, n2)
+    assert not index.is_reachable(n2, n1)
+    assert not index.is_reachable(n1, n3)
+    assert not index.is_reachable(n3, n3)
+    assert index.batch_is_reachable([n1, n3], [n1, n4]).tolist() == [True, False]
+
+
+def test_index_rebuilt_after_change(nodes):
+    n1, n2, n3, *_ = nodes
+    graph = Graph([n1, n2, n3], [Link(n1, n2, True)])
+    assert not graph.reachability_index.is_reachable(n1, n3)
+    graph.add_link(Link(n2, n3, True))
+    assert graph.reachability_index.is_reachable(n1, n3)
+
+
+def test_strongly_connected_labels_are_reverse_topological():
+    # 0 <-> 1 -> 2 <-> 3, 4 alone
+    indptr = np.array([0, 1, 3, 4, 5, 5])
+    indices = np.array([1, 0, 2, 3, 2])
+    labels, count = strongly_connected_labels(indptr, indices)
+    assert count == 3
+    assert labels[0] == labels[1] and labels[2] == labels[3]
+    assert labels[2] < labels[0]
+    assert len(set(labels.tolist())) == 3
@@ -0,0 +1,92 @@
+import gzip
+
+import pytest
+
+from graphs import Graph, Node
+from graphs.exceptions import InvalidFileException
+from graphs.readers import read_edge_list, read_adjacency_list, read_dimacs
+
+
+@pytest.fixture
+def edge_list_text():
+    return "# comment\n1 2\n2 3\n\n3 1\n4 5 0.5\n"
+
+
+def write(tmp_path, name, text, compress=False):
+    path = tmp_path / name
+    if compress:
+        with gzip.open(path, "wt") as file:
+            file.write(text)
+    else:
+        path.write_text(text)
+    return path
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_read_edge_list(tmp_path, edge_list_text, compress):
+    progress = []
+    path = write(tmp_path, "edges.txt", edge_list_text, compress)
+    graph = Graph.from_base_graph(
+        read_edge_list(
+            path, True, chunk_size=2, progress=lambda *args: progress.append(args)
+        )
+    )
+    assert graph.order == 5
+    assert graph.size == 4
+    assert graph.strongly_connected_components == {
+        frozenset(map(Node, [1, 2, 3])),
+        frozenset({Node(4)}),
+        frozenset({Node(5)}),
+    }
+    assert [i[1] for i in progress] == [2, 4, 4]
+    assert progress[-1][0] == len(edge_list_text)
+
+
+def test_read_csv_string_ids(tmp_path):
+    path = write(tmp_path, "edges.csv", "a, b\nb,c\n")
+    graph = Graph.from_base_graph(read_edge_list(path, False, ",", str))
+    assert graph.nodes == {Node("a"), Node("b"), Node("c")}
+    assert graph.get_neighbourhood(Node("b")) == {Node("a"), Node("c")}
+
+
+def test_read_adjacency_list(tmp_path):
+    path = write(tmp_path, "adjacency.txt", "1 2 3\n2 3\n3\n4\n")
+    graph = Graph.from_base_graph(read_adjacency_list(path, True))
+    assert graph.order == 4
+    assert graph.size == 3
+    assert set(graph.dependency_levels[0]) == {Node(3), Node(4)}
+
+
+@pytest.mark.parametrize(
+    "text,is_directed,expected_directed",
+    [
+        ("c comment\np sp 4 3\na 1 2 5\na 2 3 1\na 3 1 2\n", None, True),
+        ("p edge 4 3\ne 1 2\ne 2 3\ne 3 1\n", None, False),
+        ("p sp 4 3\na 1 2 5\na 2 3 1\na 3 1 2\n", False, False),
+    ],
+)
+def test_read_dimacs(tmp_path, text, is_directed, expected_directed):
+    path = write(tmp_path, "graph.dimacs", text)
+    graph = Graph.from_base_graph(read_dimacs(path, is_directed))
+    assert graph.is_directed == expected_directed
+    assert graph.order == 4
+    assert graph.size == 3
+    assert graph.get_degree(Node(4)) == 0
+
+
+def test_invalid_file(tmp_path):
+    with pytest.raises(InvalidFileException):
+        read_edge_list(write(tmp_path, "edges.txt", "1 2\n3\n"), True)
+    with pytest.raises(InvalidFileException):
+        read_edge_list(write(tmp_path, "edges.txt", "1 a\n"), True)
+
+
+def test_read_weighted_files(tmp_path):
+    path = write(tmp_path, "weighted.csv", "a,b,1.5\nb,c,2\na,c,4\n")
+    graph = Graph.from_base_graph(
+        read_edge_list(path, True, delimiter=",", id_type=str, weighted=True)
+    )
+    assert graph.get_dijkstra_path(Node("a"), Node("c")).distance == 3.5
+    path = write(tmp_path, "graph.gr", "c road\np sp 3 3\na 1 2 7\na 2 3 1\na 1 3 9\n")
+    graph = Graph.from_base_graph(read_dimacs(path, weighted=True, chunk_size=2))
+    assert graph.get_all_distances(Node(1)).tolist() == [0, 7, 8]
@@ -0,0 +1,183 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from graphs import Graph, Node, Link
+from graphs.exceptions import NegativeWeightException
+from graphs.shortest_paths import bucket_distances
+
+
+def get_expected_distances(nodes, links, is_directed):
+    distances = {(i, j): 0 if i == j else math.inf for i in nodes for j in nodes}
+    for link in links:
+        pairs = [(link.node_1, link.node_2)]
+        if not is_directed:
+            pairs.append((link.node_2, link.node_1))
+        for pair in pairs:
+            distances[pair] = min(distances[pair], link.cost)
+    for k in nodes:
+        for i in nodes:
+            for j in nodes:
+                distances[i, j] = min(
+                    distances[i, j], distances[i, k] + distances[k, j]
+                )
+    return distances
+
+
+def assert_is_path(report, node_1, node_2, distance, is_directed):
+    assert report.is_possible
+    (path,) = report.paths
+    assert report.distance == pytest.approx(distance)
+    if path:
+        assert path[0].node_1 == node_1 and path[-1].node_2 == node_2
+    for link_1, link_2 in zip(path, path[1:]):
+        assert link_1.node_2 == link_2.node_1
+    for i in path:
+        if is_directed:
+            assert (i.node_1, i.node_2) == tuple(i.underlying_link.nodes)
+        else:
+            assert {i.node_1, i.node_2} == set(i.underlying_link.nodes)
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+@pytest.mark.parametrize("seed", range(5))
+def test_shortest_paths_match_floyd_warshall(adjacency_class, is_directed, seed):
+    rng = random.Random(seed)
+    nodes = [Node() for _ in range(8)]
+    links = [
+        Link(rng.choice(nodes), rng.choice(nodes), is_directed, rng.randint(0, 9))
+        for _ in range(16)
+    ]
+    graph = Graph(nodes, links, adjacency_class)
+    expected = get_expected_distances(nodes, set(links), is_directed)
+    node_positions = {j: i for i, j in enumerate(graph.node_ids.tolist())}
+    for node_1 in nodes:
+        all_distances = graph.get_all_distances(node_1)
+        for node_2 in nodes:
+            distance = expected[node_1, node_2]
+            assert all_distances[node_positions[node_2.id]] == distance
+            reports = [
+                graph.get_dijkstra_path(node_1, node_2),
+                graph.get_bidirectional_dijkstra_path(node_1, node_2),
+                graph.get_a_star_path(node_1, node_2, lambda i, j: 0),
+            ]
+            for report in reports:
+                if distance == math.inf:
+                    assert not report.is_possible
+                else:
+                    assert_is_path(report, node_1, node_2, distance, is_directed)
+
+
+def test_unweighted_distance_is_hop_count(line_graph, nodes):
+    report = line_graph.get_dijkstra_path(nodes[0], nodes[4])
+    assert report.distance == 4
+    assert report.distance == line_graph.get_shortest_path(nodes[0], nodes[4]).distance
+
+
+def test_shortest_path_agrees_on_weighted_distance(adjacency_class):
+    n1, n2, n3 = nodes = [Node(), Node(), Node()]
+    links = [Link(n1, n3, weight=10.0), Link(n1, n2, weight=1.0), Link(n2, n3)]
+    graph = Graph(nodes, links, adjacency_class)
+    report = graph.get_shortest_path(n1, n3)
+    assert report.distance == 2.0
+    assert report.distance == graph.get_paths(n1, n3).distance
+    assert graph.get_distances([n1], [n3]).tolist() == [[2.0]]
+    assert [i.node_2 for i in report.paths[0]] == [n2, n3]
+
+
+def test_a_star_on_grid():
+    size = 30
+    edges = []
+    for x in range(size):
+        for y in range(size):
+            if x + 1 < size:
+                edges.append(((x, y), (x + 1, y), 1.0))
+            if y + 1 < size:
+                edges.append(((x, y), (x, y + 1), 1.0))
+    graph = Graph.from_edge_list(edges, False)
+
+    def manhattan(node, target):
+        return abs(node.id[0] - target.id[0]) + abs(node.id[1] - target.id[1])
+
+    report = graph.get_a_star_path(Node((0, 0)), Node((size - 1, size - 1)), manhattan)
+    assert report.distance == 2 * (size - 1)
+
+
+def test_weighted_links_are_kept(adjacency_class):
+    n1, n2, n3 = nodes = [Node(), Node(), Node()]
+    links = [Link(n1, n2, True, 2.5), Link(n2, n3, True, 0.5), Link(n1, n3, True, 4)]
+    graph = Graph(nodes, links, adjacency_class)
+    assert graph.links == set(links)
+    assert graph.find_link(n1, n2).weight == 2.5
+    report = graph.get_dijkstra_path(n1, n3)
+    assert report.distance == 3
+    assert [i.underlying_link for i in report.paths[0]] == links[:2]
+
+
+def test_unweighted_links_among_weighted_ones(adjacency_class, tmp_path):
+    n1, n2, n3 = nodes = [Node(1), Node(2), Node(3)]
+    links = [Link(n1, n2, True), Link(n2, n3, True, 0.5), Link(n1, n3, True, 2)]
+    graph = Graph(nodes, links + [Link(n1, n2, True, 1.5)], adjacency_class)
+    assert graph.links == set(links)
+    assert graph.find_link(n1, n2).weight is None
+    report = graph.get_shortest_path(n1, n3)
+    assert report.distance == 1.5
+    assert [i.underlying_link for i in report.paths[0]] == links[:2]
+    graph.save(tmp_path / "mixed.bin")
+    assert Graph.load(tmp_path / "mixed.bin").links == set(links)
+
+
+def test_weighted_builders_and_round_trip(tmp_path):
+    graph = Graph.from_edge_list([(1, 2, 1.5), (2, 3, 2.0), (1, 3, 5.0)], True)
+    assert graph.get_dijkstra_path(Node(1), Node(3)).distance == 3.5
+    path = tmp_path / "weighted.bin"
+    graph.save(path)
+    loaded = Graph.load(path)
+    assert loaded.links == graph.links
+    assert loaded.get_all_distances(Node(1)).tolist() == [0, 1.5, 3.5]
+    coo = Graph.from_coo(
+        np.array([0, 1]), np.array([1, 2]), False, data=np.array([3, 4])
+    )
+    assert coo.get_all_distances(Node(2)).tolist() == [7, 4, 0]
+
+
+def test_negative_weights():
+    graph = Graph.from_numpy(np.array([1]), np.array([2]), True, weights=np.array([-1]))
+    with pytest.raises(NegativeWeightException):
+        graph.get_dijkstra_path(Node(1), Node(2))
+
+
+@pytest.mark.parametrize("min_frontier", [0, 64, 10**6])
+def test_bucket_distances_match_dijkstra(min_frontier):
+    rng = np.random.default_rng(0)
+    sources = np.concatenate([np.arange(999), rng.integers(0, 1000, 500)])
+    targets = np.concatenate([np.arange(1, 1000), rng.integers(0, 1000, 500)])
+    weights = np.concatenate([rng.random(999), rng.random(500) * 50])
+    graph = Graph.from_numpy(sources, targets, True, weights=weights)
+    properties = graph.weighted_path_properties
+    arrays = properties.get_search_arrays(backwards=False)
+    expected = np.full(1000, np.inf)
+    reached, _ = properties._search(arrays, 0)
+    expected[list(reached)] = list(reached.values())
+    distances = bucket_distances(*arrays[:3], 0, min_frontier)
+    assert np.allclose(distances, expected)
+
+
+def test_parallel_links_keep_the_lightest(adjacency_class):
+    n1, n2 = nodes = [Node(), Node()]
+    graph = Graph(
+        nodes, [Link(n1, n2, True, 5), Link(n1, n2, True, 2)], adjacency_class
+    )
+    assert graph.links == {Link(n1, n2, True, 2)}
+    assert graph.get_dijkstra_path(n1, n2).distance == 2
+
+
+def test_add_link_replaces_weight(nodes):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n2, weight=5), Link(n2, n3, weight=1)])
+    assert graph.get_dijkstra_path(n1, n3).distance == 6
+    graph.add_link(Link(n1, n2, weight=1))
+    assert graph.size == 2
+    assert graph.get_dijkstra_path(n1, n3).distance == 2
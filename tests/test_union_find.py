@@ -0,0 +1,39 @@
+import pytest
+
+from graphs.data_structures.union_find import UnionFind, DynamicComponents
+
+
+def test_union_find():
+    components = UnionFind(range(6))
+    assert components.union(0, 1)
+    assert components.union(2, 1)
+    assert not components.union(0, 2)
+    components.union(4, 5)
+    assert components.are_connected(0, 2)
+    assert not components.are_connected(0, 3)
+    assert components.groups == {
+        frozenset({0, 1, 2}),
+        frozenset({3}),
+        frozenset({4, 5}),
+    }
+    assert components.sizes[components.find(0)] == 3
+    assert 5 in components and 6 not in components
+
+
+def test_dynamic_components():
+    components = DynamicComponents(range(5))
+    components.union(0, 1)
+    components.union(1, 2)
+    components.union(3, 4)
+    assert components.get_members(2) == {0, 1, 2}
+    components.split({2})
+    assert components.groups == {
+        frozenset({0, 1}),
+        frozenset({2}),
+        frozenset({3, 4}),
+    }
+    assert not components.are_connected(1, 2)
+    components.remove(2)
+    assert 2 not in components
+    with pytest.raises(ValueError):
+        components.remove(3)
@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+from graphs import Graph, Node, Link
+from graphs.exceptions import ImmutableGraphException
+
+
+def get_random_graph(adjacency_class, is_directed, seed):
+    rng = random.Random(seed)
+    nodes = [Node() for _ in range(12)]
+    links = [
+        Link(rng.choice(nodes), rng.choice(nodes), is_directed, rng.randint(1, 4))
+        for _ in range(30)
+    ]
+    return Graph(nodes, links, adjacency_class), nodes
+
+
+def assert_same_graph(view, expected, nodes):
+    assert view.nodes == expected.nodes
+    assert view.links == expected.links
+    assert (view.order, view.size) == (expected.order, expected.size)
+    assert view.connected_components == expected.connected_components
+    assert view.degree_sequence == expected.degree_sequence
+    assert view.node_ids.tolist() == expected.node_ids.tolist()
+    for node in nodes:
+        assert view.is_in_graph(node) == expected.is_in_graph(node)
+        assert view.get_neighbourhood(node) == expected.get_neighbourhood(node)
+        assert view.get_degree(node) == expected.get_degree(node)
+        if expected.is_in_graph(node):
+            assert (
+                view.get_all_distances(node).tolist()
+                == expected.get_all_distances(node).tolist()
+            )
+        for other in nodes:
+            assert view.find_link(node, other) == expected.find_link(node, other)
+            assert view.is_reachable(node, other) == expected.is_reachable(node, other)
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+@pytest.mark.parametrize("seed", range(3))
+def test_subgraph_view(adjacency_class, is_directed, seed):
+    graph, nodes = get_random_graph(adjacency_class, is_directed, seed)
+    subset = set(nodes[:8])
+    view = graph.subgraph_view(subset | {Node()})
+    links = [i for i in graph.links if i.node_1 in subset and i.node_2 in subset]
+    expected = Graph(list(subset), links, adjacency_class)
+    assert_same_graph(view, expected, nodes)
+
+
+@pytest.mark.parametrize("is_directed", [True, False])
+@pytest.mark.parametrize("seed", range(3))
+def test_link_filter_view(adjacency_class, is_directed, seed):
+    graph, nodes = get_random_graph(adjacency_class, is_directed, seed)
+    view = graph.link_filter_view(lambda link: link.weight <= 2)
+    links = [i for i in graph.links if i.weight <= 2]
+    expected = Graph(nodes, links, adjacency_class)
+    assert_same_graph(view, expected, nodes)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_reversed_view(adjacency_class, seed):
+    graph, nodes = get_random_graph(adjacency_class, True, seed)
+    view = graph.reversed_view()
+    links = [Link(i.node_2, i.node_1, True, i.weight) for i in graph.links]
+    expected = Graph(nodes, links, adjacency_class)
+    assert_same_graph(view, expected, nodes)
+    assert view.reversed_view().links == graph.links
+
+
+def test_reversed_view_needs_directed_graph(line_graph):
+    with pytest.raises(ValueError):
+        line_graph.reversed_view()
+
+
+def test_views_are_read_only(line_graph, nodes):
+    view = line_graph.subgraph_view(nodes[:3])
+    with pytest.raises(ImmutableGraphException):
+        view.add_link(Link(nodes[0], nodes[2]))
+    with pytest.raises(ImmutableGraphException):
+        view.remove_node(nodes[0])
+
+
+def test_views_follow_parent_changes(nodes):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n2), Link(n2, n3)])
+    view = graph.subgraph_view([n1, n2, n3])
+    assert view.size == 2
+    assert view.is_connected
+    graph.add_link(Link(n1, n3))
+    graph.remove_link(Link(n2, n3))
+    assert view.links == {Link(n1, n2), Link(n1, n3)}
+    assert view.count_triangles() == 0
+    graph.add_link(Link(n2, n3))
+    assert view.count_triangles() == 1
+    graph.remove_node(n3)
+    assert view.nodes == {n1, n2}
+
+
+@pytest.mark.parametrize("make_view", ["subgraph", "link_filter", "reversed"])
+def test_view_components_follow_parent_changes(nodes, make_view):
+    n1, n2, n3, n4, n5 = nodes
+    graph = Graph(nodes, [Link(n1, n2, True), Link(n3, n4, True)])
+    view = {
+        "subgraph": lambda: graph.subgraph_view([n1, n2, n3, n4]),
+        "link_filter": lambda: graph.link_filter_view(lambda link: True),
+        "reversed": graph.reversed_view,
+    }[make_view]()
+    assert not view.are_connected(n1, n3)
+    assert {n1, n2} in view.connected_components
+    graph.add_link(Link(n2, n3, True))
+    assert view.are_connected(n1, n4)
+    assert {n1, n2, n3, n4} in view.connected_components
+    graph.remove_link(Link(n1, n2, True))
+    assert not view.are_connected(n1, n2)
+    assert {n2, n3, n4} in view.connected_components